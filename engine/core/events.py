@@ -0,0 +1,242 @@
+"""
+Live match events for the SSE feed (core.views.live_feed).
+
+Ingestion publishes status/minute and metric deltas of live matches as LiveEvent rows
+inside its own transaction, so an event exists exactly when its write committed. The
+table is the pub/sub stand-in: each ASGI worker runs one LiveEventBroker whose single
+task polls it for rows past the last id seen and fans them out to in-process subscriber
+queues. A connection costs a coroutine and a queue, never a thread or a database
+connection, and the row id doubles as the SSE event id a client resumes from.
+"""
+import asyncio
+import json
+import logging
+from datetime import timedelta
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import LiveEvent
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_xact_lock key serializing publishers (see publish)
+PUBLISH_LOCK_KEY = 0x4C495645
+
+
+def is_live(status, utc_kickoff, now=None) -> bool:
+    """Whether changes to a match go to the feed: in play, or kicked off within settings.LIVE_ROUTING_WINDOW."""
+    from matches.models import IN_PLAY_STATUSES
+
+    if status in IN_PLAY_STATUSES:
+        return True
+    now = now or timezone.now()
+    return utc_kickoff is not None and now - timedelta(seconds=settings.LIVE_ROUTING_WINDOW) <= utc_kickoff <= now
+
+
+def match_event(match_id, competition_id, status, minute) -> LiveEvent:
+    return LiveEvent(
+        kind=LiveEvent.MATCH, match_id=match_id, competition_id=competition_id,
+        data={"status": status, "minute": minute},
+    )
+
+
+def metrics_event(match_id, competition_id, status, metrics: List[Dict]) -> LiveEvent:
+    """`metrics`: [{"metric_key", "team", "period", "value"}], the changed values only."""
+    return LiveEvent(
+        kind=LiveEvent.METRICS, match_id=match_id, competition_id=competition_id,
+        data={"status": status, "metrics": metrics},
+    )
+
+
+def publish(events: Iterable[LiveEvent]) -> None:
+    """
+    Write `events` in the caller's transaction. Call it last, just before commit: the
+    advisory lock it takes makes ids follow commit order, so a broker that has seen id
+    N can never have an uncommitted N-1 show up behind it.
+    """
+    events = list(events)
+    if not events:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [PUBLISH_LOCK_KEY])
+    LiveEvent.objects.bulk_create(events)
+
+
+def prune(now=None) -> int:
+    """Delete events older than settings.LIVE_EVENTS_RETENTION; returns the number deleted."""
+    cutoff = (now or timezone.now()) - timedelta(seconds=settings.LIVE_EVENTS_RETENTION)
+    return LiveEvent.objects.filter(created_at__lt=cutoff).delete()[0]
+
+
+def _as_dict(row) -> Dict:
+    id_, kind, match_id, competition_id, data = row
+    return {"id": id_, "kind": kind, "match": str(match_id), "competition": str(competition_id), **data}
+
+
+_FIELDS = ("id", "kind", "match_id", "competition_id", "data")
+
+
+def events_after(last_id: int, limit: int) -> List[Dict]:
+    """Up to `limit` events with an id above `last_id`, oldest first, as feed dicts."""
+    rows = LiveEvent.objects.filter(id__gt=last_id).order_by("id").values_list(*_FIELDS)[:limit]
+    return [_as_dict(row) for row in rows]
+
+
+def latest_id() -> int:
+    return LiveEvent.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def resumable(last_id: int) -> bool:
+    """Whether the feed still holds everything after event `last_id` (it is not pruned yet)."""
+    return last_id == 0 or LiveEvent.objects.filter(id=last_id).exists()
+
+
+class FeedFilter(NamedTuple):
+    """What one subscriber receives; None means no restriction."""
+    competitions: Optional[FrozenSet[str]] = None
+    matches: Optional[FrozenSet[str]] = None
+    statuses: Optional[FrozenSet[str]] = None
+    metric_keys: Optional[FrozenSet[str]] = None
+
+    def apply(self, event: Dict) -> Optional[Dict]:
+        """`event` as this subscriber sees it (metrics narrowed to metric_keys), or None."""
+        if self.competitions is not None and event["competition"] not in self.competitions:
+            return None
+        if self.matches is not None and event["match"] not in self.matches:
+            return None
+        if self.statuses is not None and event["status"] not in self.statuses:
+            return None
+        if self.metric_keys is not None and event["kind"] == LiveEvent.METRICS:
+            metrics = [m for m in event["metrics"] if m["metric_key"] in self.metric_keys]
+            if not metrics:
+                return None
+            event = {**event, "metrics": metrics}
+        return event
+
+
+def format_sse(event: Dict) -> str:
+    data = {k: v for k, v in event.items() if k not in ("id", "kind")}
+    return f"id: {event['id']}\nevent: {event['kind']}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class Subscription:
+    def __init__(self, feed_filter: FeedFilter, maxsize: int):
+        self.filter = feed_filter
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        # set when the client fell behind a full queue; the stream ends and the
+        # client resumes from its Last-Event-ID, which replays from the table
+        self.overflowed = False
+
+    def offer(self, event: Dict) -> None:
+        if self.overflowed:
+            return
+        event = self.filter.apply(event)
+        if event is None:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class LiveEventBroker:
+    """
+    Per-process fan-out of LiveEvent rows. The polling task starts with the first
+    subscriber and stops with the last, so an idle worker runs no queries.
+    """
+
+    def __init__(self, batch_size: int = 500):
+        self.batch_size = batch_size
+        self.subscribers = set()
+        self.last_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        # held while the poller starts, so clients arriving together start only one
+        self._starting = asyncio.Lock()
+
+    async def subscribe(self, feed_filter: FeedFilter) -> Subscription:
+        """
+        A subscription receiving every event after the current head. Anything older a
+        client asks for is replayed from the table after this returns (see stream).
+        """
+        async with self._starting:
+            if self._task is None or self._task.done():
+                # nobody heard what was published while the broker was idle: start at the head
+                self.last_id = await sync_to_async(latest_id)()
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            sub = Subscription(feed_filter, settings.LIVE_EVENTS_QUEUE_SIZE)
+            self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self.subscribers.discard(sub)
+
+    def dispatch(self, event: Dict) -> None:
+        for sub in list(self.subscribers):
+            sub.offer(event)
+
+    async def poll(self) -> int:
+        """Fan out every event past last_id; returns how many there were."""
+        events = await sync_to_async(events_after)(self.last_id, self.batch_size)
+        for event in events:
+            self.last_id = event["id"]
+            self.dispatch(event)
+        return len(events)
+
+    async def _run(self) -> None:
+        while self.subscribers:
+            try:
+                polled = await self.poll()
+            except Exception:
+                # keep the open streams; they get heartbeats until the database is back
+                logger.exception("Live feed poll failed")
+                polled = 0
+            if polled < self.batch_size:
+                await asyncio.sleep(settings.LIVE_EVENTS_POLL_INTERVAL)
+
+
+async def stream(broker: LiveEventBroker, feed_filter: FeedFilter, last_event_id: Optional[int] = None):
+    """
+    The SSE body of one subscriber to `broker`: the events after `last_event_id`
+    replayed from the table (or a `reset` event when they have been pruned and the
+    client must reload), then live events, with a comment line every
+    settings.LIVE_EVENTS_HEARTBEAT seconds of silence so proxies keep the connection
+    open. Ends when the subscriber overflows.
+    """
+    sub = await broker.subscribe(feed_filter)
+    try:
+        yield f"retry: {settings.LIVE_EVENTS_RETRY_MS}\n\n"
+        replayed = 0
+        if last_event_id is not None:
+            if not await sync_to_async(resumable)(last_event_id):
+                yield "event: reset\ndata: {}\n\n"
+            else:
+                replayed = last_event_id
+                while True:
+                    batch = await sync_to_async(events_after)(replayed, broker.batch_size)
+                    for event in batch:
+                        replayed = event["id"]
+                        event = sub.filter.apply(event)
+                        if event is not None:
+                            yield format_sse(event)
+                    if len(batch) < broker.batch_size:
+                        break
+
+        while not (sub.overflowed and sub.queue.empty()):
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), timeout=settings.LIVE_EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            # the replay already sent what was queued while it ran
+            if event["id"] > replayed:
+                yield format_sse(event)
+    finally:
+        broker.unsubscribe(sub)
+
+
+# one per worker process (the ASGI server runs a single event loop)
+broker = LiveEventBroker()
@@ -1,18 +1,87 @@
 import hashlib
-from django.utils.http import http_date
+from typing import NamedTuple, Optional
+from django.db.models import Max
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import versions
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: object            # datetime or None
+    versions: Optional[dict] = None  # data-version counters they were derived from, if any
+
 
 class ConditionalHeadersMixin:
     """
     Mixin to set Last-Modified (from latest updated_at in queryset)
     and a coarse ETag based on URL + latest timestamp.
+
+    Views call conditional_validators() before running the page query and return
+    not_modified_response() when the client's copy is current, so a revalidation
+    costs one query and no serialization. Given data-version scopes (core.versions)
+    that query is a counter read; MAX(updated_at) is the fallback while a scope has
+    no counter yet.
     """
-    def set_conditional_headers(self, request, response, queryset):
-        latest = queryset.order_by("-updated_at").values_list("updated_at", flat=True).first()
+    def conditional_validators(self, request, queryset, scopes=None, vary=""):
+        """
+        Validators for `queryset`, from the counters of `scopes` when they exist. `vary`
+        names inputs besides the URL that shape the response (e.g. the caller's time zone).
+        """
+        path = request.get_full_path() + (f"::{vary}" if vary else "")
+        # each representation (JSON, MessagePack, ...) gets its own validator
+        renderer = getattr(request, "accepted_renderer", None)
+        if renderer is not None and renderer.format != "json":
+            path += f"::{renderer.format}"
+        counters = versions.read(scopes) if scopes else None
+        if counters:
+            current, latest = counters
+            stamp = ",".join(f"{scope}={current[scope]}" for scope in sorted(current))
+            return Validators(hashlib.md5(f"{path}::v:{stamp}".encode()).hexdigest(), latest, current)
+
+        latest = queryset.order_by().aggregate(latest=Max("updated_at"))["latest"]
         if latest:
-            response["Last-Modified"] = http_date(latest.timestamp())
-            etag_seed = f"{request.get_full_path()}::{latest.timestamp()}"
+            etag_seed = f"{path}::{latest.timestamp()}"
         else:
-            etag_seed = f"{request.get_full_path()}::no-updates"
+            etag_seed = f"{path}::no-updates"
+        return Validators(hashlib.md5(etag_seed.encode()).hexdigest(), latest)
 
-        response["ETag"] = hashlib.md5(etag_seed.encode()).hexdigest()
+    def not_modified_response(self, request, validators):
+        """A 304 carrying the validators when If-None-Match/If-Modified-Since match them, else None."""
+        etag, latest, _ = validators
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match:
+            # If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)
+            if not _etag_matches(if_none_match, etag):
+                return None
+        else:
+            since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE") or "")
+            if since is None or latest is None or int(latest.timestamp()) > since:
+                return None
+        return self._apply_validators(Response(status=status.HTTP_304_NOT_MODIFIED), validators)
+
+    def set_conditional_headers(self, request, response, queryset, validators=None):
+        if validators is None:
+            validators = self.conditional_validators(request, queryset)
+        return self._apply_validators(response, validators)
+
+    def _apply_validators(self, response, validators):
+        etag, latest, _ = validators
+        if latest:
+            response["Last-Modified"] = http_date(latest.timestamp())
+        response["ETag"] = etag
         return response
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match list against our (unquoted) ETag."""
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
@@ -0,0 +1,33 @@
+import time
+import uuid
+from contextlib import contextmanager
+from django.core.cache import caches
+
+# attempts (10ms apart) a waiting cache_lock makes before giving up
+LOCK_SPINS = 100
+
+
+class LockTimeout(RuntimeError):
+    """A cache_lock could not be taken within its spins."""
+
+
+@contextmanager
+def cache_lock(name: str, timeout: float, cache=None, wait: bool = True):
+    """
+    Best-effort mutex in a shared cache. Yields True when held; with wait=False it
+    yields False at once if someone else holds it. Only the holder releases it, and a
+    crashed holder's lock expires after `timeout` seconds.
+    """
+    cache = cache if cache is not None else caches["shared"]
+    key, token = f"lock:{name}", uuid.uuid4().hex
+    held = cache.add(key, token, timeout=timeout)
+    spins = LOCK_SPINS if wait else 0
+    while not held and spins:
+        time.sleep(0.01)
+        held = cache.add(key, token, timeout=timeout)
+        spins -= 1
+    try:
+        yield held
+    finally:
+        if held and cache.get(key) == token:
+            cache.delete(key)
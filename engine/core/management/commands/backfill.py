@@ -0,0 +1,130 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.models import BackfillCheckpoint
+from providers.backfill import pending, plan_fixtures, plan_stats, run_chunk
+from providers.dedupe import enqueue_once
+from providers.tasks import backfill_chunk
+
+Phase = BackfillCheckpoint.Phase
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill fixtures and match stats for whole seasons. Work is split into chunks that are "
+        "checkpointed in the database, so a rerun resumes where the previous run stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--league", action="append", required=True, help="Provider league id (repeatable)")
+        parser.add_argument("--season", action="append", type=int, required=True, help="Season start year (repeatable)")
+        parser.add_argument("--provider", default="api_football")
+        parser.add_argument("--workers", type=int, default=min(4, multiprocessing.cpu_count()),
+                            help="Worker processes; 1 runs in this process")
+        parser.add_argument("--chunk-size", type=int, default=50, help="Matches per stats chunk")
+        parser.add_argument("--skip-stats", action="store_true", help="Only backfill fixture lists")
+        parser.add_argument("--reset", action="store_true", help="Forget existing checkpoints for these seasons")
+        parser.add_argument("--enqueue", action="store_true",
+                            help="Hand the pending chunks to Celery's backfill queue instead of running them here")
+
+    def handle(self, *args, **opts):
+        if opts["provider"] != "api_football":
+            raise CommandError(f"Unsupported provider: {opts['provider']}")
+        provider, leagues, seasons = opts["provider"], opts["league"], opts["season"]
+
+        if opts["reset"]:
+            deleted, _ = BackfillCheckpoint.objects.filter(
+                provider=provider, league__in=leagues, season__in=seasons,
+            ).delete()
+            self.stdout.write(f"Removed {deleted} checkpoints")
+
+        plan_fixtures(provider, leagues, seasons)
+        if opts["enqueue"]:
+            self._enqueue(provider, leagues, seasons, opts)
+            return
+        if not self._run_phase(Phase.FIXTURES, pending(provider, Phase.FIXTURES, leagues, seasons), opts["workers"]):
+            return
+        if opts["skip_stats"]:
+            return
+
+        done = BackfillCheckpoint.objects.filter(
+            provider=provider, phase=Phase.FIXTURES, league__in=leagues, season__in=seasons,
+            status=BackfillCheckpoint.Status.DONE,
+        ).values_list("league", "season")
+        for league, season in done:
+            plan_stats(provider, league, season, opts["chunk_size"])
+        self._run_phase(Phase.STATS, pending(provider, Phase.STATS, leagues, seasons), opts["workers"])
+
+    def _enqueue(self, provider, leagues, seasons, opts):
+        # fixtures chunks enqueue their season's stats chunks when they finish
+        phases = [Phase.FIXTURES] if opts["skip_stats"] else [Phase.FIXTURES, Phase.STATS]
+        total = 0
+        for phase in phases:
+            for cp_id in pending(provider, phase, leagues, seasons):
+                total += enqueue_once(backfill_chunk, args=(str(cp_id), opts["chunk_size"])) is not None
+        self.stdout.write(self.style.SUCCESS(f"Enqueued {total} chunks on the backfill queue"))
+
+    def _run_phase(self, phase, ids, workers) -> bool:
+        """Run the checkpoints in `ids`; False when the provider quota ran low and the run stopped early."""
+        total = len(ids)
+        if not total:
+            self.stdout.write(f"[{phase}] nothing to do")
+            return True
+
+        started = time.monotonic()
+        progress = {"chunks": 0, "items": 0, "failed": 0}
+        stopped = False
+
+        def report(result):
+            nonlocal stopped
+            progress["chunks"] += 1
+            progress["items"] += result.get("items", 0)
+            progress["failed"] += result["status"] != BackfillCheckpoint.Status.DONE
+            stopped = stopped or result.get("quota_low", False)
+
+            elapsed = time.monotonic() - started
+            eta = elapsed / progress["chunks"] * (total - progress["chunks"])
+            self.stdout.write(
+                f"[{phase}] {progress['chunks']}/{total} chunks, {progress['items']} items, "
+                f"{progress['items'] / elapsed if elapsed else 0:.1f} items/s, "
+                f"{progress['failed']} failed, ETA {_duration(eta)}"
+            )
+
+        queue = list(ids)
+        if workers <= 1:
+            while queue and not stopped:
+                report(run_chunk(queue.pop(0)))
+        else:
+            # children must open their own connections instead of sharing the parent's socket
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+                # keep a short queue in flight so a low quota stops the run quickly
+                in_flight = set()
+                while (queue and not stopped) or in_flight:
+                    while queue and not stopped and len(in_flight) < workers * 2:
+                        in_flight.add(pool.submit(run_chunk, queue.pop(0)))
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        report(fut.result())
+
+        elapsed = time.monotonic() - started
+        style = self.style.WARNING if stopped or progress["failed"] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"[{phase}] {progress['chunks']}/{total} chunks in {_duration(elapsed)}"
+            + (f", {progress['failed']} failed (rerun to retry)" if progress["failed"] else "")
+            + (", stopped: provider daily quota is low" if stopped else "")
+        ))
+        return not stopped
+
+
+def _duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from competitions.models import Competition
+from core.models import ProviderRef, ProviderRefKind
+from matches.models import Match
+from providers.ingest import REF_KEYS
+from teams.models import Team
+
+SOURCES = [
+    (ProviderRefKind.COMPETITION, Competition),
+    (ProviderRefKind.TEAM, Team),
+    (ProviderRefKind.MATCH, Match),
+]
+
+
+class Command(BaseCommand):
+    help = "Backfill the ProviderRef lookup table from provider_refs JSON (idempotent)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--kind", choices=[k for k, _ in SOURCES], help="Only backfill one entity kind")
+
+    def handle(self, *args, **opts):
+        batch_size = opts["batch_size"]
+        for kind, model in SOURCES:
+            if opts["kind"] and opts["kind"] != kind:
+                continue
+
+            ref_key = REF_KEYS[kind]
+            rows = (model.objects
+                    .exclude(provider_refs={})
+                    .values_list("id", "provider_refs")
+                    .iterator(chunk_size=batch_size))
+
+            pending, total = {}, 0
+            for obj_id, refs in rows:
+                for provider, info in (refs or {}).items():
+                    ext = (info or {}).get(ref_key) if isinstance(info, dict) else None
+                    if ext is not None:
+                        pending.setdefault(provider, {})[str(ext)] = obj_id
+                        total += 1
+                if sum(len(m) for m in pending.values()) >= batch_size:
+                    self._flush(kind, pending)
+                    pending = {}
+            self._flush(kind, pending)
+
+            self.stdout.write(self.style.SUCCESS(f"{kind}: {total} refs synced"))
+
+    def _flush(self, kind, pending):
+        with transaction.atomic():
+            for provider, mapping in pending.items():
+                ProviderRef.objects.register(provider, kind, mapping)
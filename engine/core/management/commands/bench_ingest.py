@@ -0,0 +1,143 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from core.models import ProviderRef, ProviderRefKind
+from matches.models import Match, FINISHED_STATUSES
+from providers.replay import Faults, build_source
+from providers.standin import StandInServer
+from providers.tasks import hydrate_match_stats, sync_fixtures_for_league
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark sync_fixtures_for_league and hydrate_match_stats against a local provider stand-in. "
+        "Writes synthetic leagues (provider ids >= 900000) to the configured database; a rerun measures "
+        "the unchanged-data path."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--leagues", type=int, default=2)
+        parser.add_argument("--teams", type=int, default=20, help="Teams per league (even)")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--http", action="store_true",
+                            help="Go through the real HTTP adapter and a local stand-in server instead of ReplayAdapter")
+        parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every provider call")
+        parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of calls answered with 429")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls failing with a 5xx")
+        parser.add_argument("--stats-limit", type=int, default=0, help="Hydrate at most this many matches (0 = all finished)")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    def handle(self, *args, **opts):
+        source_options = {"leagues": opts["leagues"], "teams": opts["teams"], "seed": opts["seed"]}
+        fault_options = {"latency": opts["latency"], "rate_limit_rate": opts["rate_limit_rate"],
+                         "error_rate": opts["error_rate"], "seed": opts["seed"]}
+        source = build_source("synthetic", **source_options)
+
+        server = None
+        if opts["http"]:
+            server = StandInServer(source, Faults(**fault_options)).start()
+            adapter_settings = {"PROVIDER_ADAPTER": "providers.standin.StandInAdapter", "PROVIDER_STANDIN_URL": server.url}
+        else:
+            adapter_settings = {
+                "PROVIDER_ADAPTER": "providers.replay.ReplayAdapter",
+                "PROVIDER_REPLAY": {"source": {"source": "synthetic", **source_options}, "faults": fault_options},
+            }
+
+        try:
+            with override_settings(**adapter_settings):
+                report = {"sync_fixtures_for_league": self._bench_sync(source)}
+                report["hydrate_match_stats"] = self._bench_hydrate(source, opts["stats_limit"])
+        finally:
+            if server:
+                server.stop()
+
+        if opts["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        sync, hydrate = report["sync_fixtures_for_league"], report["hydrate_match_stats"]
+        self.stdout.write(
+            f"sync_fixtures_for_league: {sync['tasks']} tasks, {sync['fixtures']} fixtures in {sync['seconds']}s -> "
+            f"{sync['fixtures_per_sec']} fixtures/s, {sync['queries_per_fixture']} queries/fixture, "
+            f"p95 {sync['p95_ms']} ms, {sync['failed']} failed"
+        )
+        self.stdout.write(
+            f"hydrate_match_stats: {hydrate['tasks']} tasks, {hydrate['metric_rows']} metric rows in {hydrate['seconds']}s -> "
+            f"{hydrate['metric_rows_per_sec']} rows/s, {hydrate['queries_per_match']} queries/match, "
+            f"p95 {hydrate['p95_ms']} ms, {hydrate['failed']} failed"
+        )
+
+    def _run(self, task, args):
+        """Run a task eagerly; (seconds, queries, result or None when it failed)."""
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            outcome = task.apply(args=args)
+            elapsed = time.perf_counter() - started
+        return elapsed, len(queries.captured_queries), (None if outcome.failed() else outcome.result)
+
+    def _summary(self, latencies, queries, failed, wall):
+        return {
+            "tasks": len(latencies),
+            "seconds": round(wall, 3),
+            "failed": failed,
+            "queries": queries,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        }
+
+    def _bench_sync(self, source):
+        latencies, queries, failed, fixtures = [], 0, 0, 0
+        wall = time.perf_counter()
+        for league, ids in source.by_league.items():
+            elapsed, n, result = self._run(sync_fixtures_for_league, (league,))
+            latencies.append(elapsed)
+            queries += n
+            if result is None:
+                failed += 1
+            else:
+                fixtures += len(ids)
+        wall = time.perf_counter() - wall
+        out = self._summary(latencies, queries, failed, wall)
+        out.update({
+            "fixtures": fixtures,
+            "fixtures_per_sec": round(fixtures / wall, 1) if wall else 0.0,
+            "queries_per_fixture": round(queries / fixtures, 3) if fixtures else 0.0,
+        })
+        return out
+
+    def _bench_hydrate(self, source, limit):
+        competitions = ProviderRef.objects.resolve("api_football", ProviderRefKind.COMPETITION, source.by_league.keys())
+        match_ids = Match.objects.filter(
+            competition_id__in=competitions.values(), status__in=FINISHED_STATUSES,
+        ).order_by("utc_kickoff", "id").values_list("id", flat=True)
+        if limit:
+            match_ids = match_ids[:limit]
+
+        latencies, queries, failed, rows = [], 0, 0, 0
+        wall = time.perf_counter()
+        for mid in match_ids:
+            elapsed, n, result = self._run(hydrate_match_stats, (str(mid),))
+            latencies.append(elapsed)
+            queries += n
+            if result is None:
+                failed += 1
+            else:
+                rows += result.get("metrics", 0)
+        wall = time.perf_counter() - wall
+        out = self._summary(latencies, queries, failed, wall)
+        out.update({
+            "metric_rows": rows,
+            "metric_rows_per_sec": round(rows / wall, 1) if wall else 0.0,
+            "queries_per_match": round(queries / len(latencies), 3) if latencies else 0.0,
+        })
+        return out
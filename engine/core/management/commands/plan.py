@@ -1,20 +1,51 @@
+import re
+from zoneinfo import ZoneInfo
+
 from django.core.management.base import BaseCommand
 from django.db import connection
 from uuid import UUID
 
+from matches.filters import day_range
+
+# plan nodes that read matches_match without walking every row
+INDEX_NODE = re.compile(r"(Index Scan|Index Only Scan|Bitmap Index Scan) (?:Backward )?(?:using|on) (\w+)")
+
 class Command(BaseCommand):
     help = "Run EXPLAIN ANALYZE on hot queries"
 
-    def handle(self, *args, **kwargs):
-        # ---- Replace these with real values from your DB ----
-        date_yyyy_mm_dd = "2025-09-06"
-        home_id = UUID("00000000-0000-0000-0000-000000000000")   # e.g. Portugal team UUID
-        away_id = UUID("00000000-0000-0000-0000-000000000001")   # e.g. Spain team UUID
-        match_id = UUID("00000000-0000-0000-0000-000000000002")  # a specific match UUID
-        # ------------------------------------------------------
+    def add_arguments(self, parser):
+        parser.add_argument("--date", default="2025-09-06", help="Board day for query A (YYYY-MM-DD)")
+        parser.add_argument("--tz", default="Africa/Lagos", help="Time zone the board day is read in")
+        parser.add_argument("--home", default="00000000-0000-0000-0000-000000000000", help="Team UUID for query B")
+        parser.add_argument("--away", default="00000000-0000-0000-0000-000000000001", help="Team UUID for query B")
+        parser.add_argument("--match", default="00000000-0000-0000-0000-000000000002", help="Match UUID for query C")
+
+    def handle(self, *args, **opts):
+        date_yyyy_mm_dd = opts["date"]
+        # the board's ?date= filter: a half-open kickoff range for the day in --tz
+        day_start, day_end = day_range(date_yyyy_mm_dd, ZoneInfo(opts["tz"]))
+        home_id = UUID(opts["home"])
+        away_id = UUID(opts["away"])
+        match_id = UUID(opts["match"])
 
         queries = [
             # A) Live/FT board for a date + selected metric keys
+            (
+                """
+                SELECT mm.match_id, mm.team_id, mt.key, mm.value
+                FROM matches_match m
+                JOIN metrics_matchmetric mm
+                  ON mm.match_id = m.id AND mm.period = 'FT'
+                JOIN metrics_metrictype mt
+                  ON mt.id = mm.metric_type_id
+                WHERE m.utc_kickoff >= %s AND m.utc_kickoff < %s
+                  AND m.status IN ('LIVE','FT')
+                  AND mt.key IN ('corners','cards_total');
+                """,
+                (day_start, day_end)
+            ),
+
+            # A, before) the same board with the column cast to a date: no kickoff index applies
             (
                 """
                 SELECT mm.match_id, mm.team_id, mt.key, mm.value
@@ -68,6 +99,9 @@ class Command(BaseCommand):
             for i, (sql, params) in enumerate(queries, start=1):
                 self.stdout.write(self.style.MIGRATE_HEADING(f"[Query {i}]"))
                 cur.execute("EXPLAIN ANALYZE " + sql, params)
-                for row in cur.fetchall():
-                    print(row[0])
+                lines = [row[0] for row in cur.fetchall()]
+                for line in lines:
+                    print(line)
+                indexes = sorted({m.group(2) for line in lines for m in INDEX_NODE.finditer(line)})
+                print(f"-> indexes used: {', '.join(indexes) if indexes else 'none (sequential scans)'}")
                 print()
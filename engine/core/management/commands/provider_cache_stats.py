@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from providers.breaker import ProviderCircuitBreaker
+from providers.cache import ResponseCache
+
+# endpoints whose circuit state is reported
+ENDPOINTS = ("fixtures", "fixtures/statistics")
+
+
+class Command(BaseCommand):
+    help = "Report provider response-cache hit ratios per cache class and circuit-breaker states (shared across workers)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--provider", default="api_football")
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after reporting")
+
+    def handle(self, *args, **opts):
+        cache = ResponseCache(opts["provider"])
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{'cache class':<28}{'ttl':>8}{'hit':>10}{'revalid.':>10}{'miss':>10}{'stale':>8}{'ratio':>8}"
+        ))
+        for cache_class, row in cache.stats().items():
+            ttl = cache.ttl(cache_class)
+            self.stdout.write(
+                f"{cache_class:<28}{'forever' if ttl is None else ttl:>8}"
+                f"{row['hit']:>10}{row['revalidated']:>10}{row['miss']:>10}{row['stale']:>8}{row['hit_ratio']:>8.2%}"
+            )
+        breaker = ProviderCircuitBreaker(opts["provider"])
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{'circuit':<28}{'state':>10}{'failures':>10}{'retry in':>10}"))
+        for endpoint in ENDPOINTS:
+            state = breaker.status(endpoint)
+            self.stdout.write(f"{endpoint:<28}{state['state']:>10}{state['failures']:>10}{state['retry_after']:>9.0f}s")
+        if opts["reset"]:
+            cache.reset_stats()
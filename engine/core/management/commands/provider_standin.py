@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from providers.replay import Faults, build_source
+from providers.standin import StandInServer
+
+
+class Command(BaseCommand):
+    help = "Serve synthetic or archived API-Football responses over HTTP, with injected latency, 429s and errors"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8099)
+        parser.add_argument("--source", choices=["synthetic", "archive"], default="synthetic")
+        parser.add_argument("--root", help="Archive root for --source archive (defaults to PROVIDER_ARCHIVE_ROOT)")
+        parser.add_argument("--leagues", type=int, default=2, help="Synthetic leagues")
+        parser.add_argument("--teams", type=int, default=20, help="Teams per synthetic league (even)")
+        parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+        parser.add_argument("--jitter", type=float, default=0.0)
+        parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of calls answered with 429")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls answered with 500")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **opts):
+        if opts["source"] == "archive":
+            source = build_source("archive", root=opts["root"])
+        else:
+            source = build_source("synthetic", leagues=opts["leagues"], teams=opts["teams"], seed=opts["seed"])
+        faults = Faults(opts["latency"], opts["jitter"], opts["rate_limit_rate"], opts["error_rate"], seed=opts["seed"])
+        server = StandInServer(source, faults, host=opts["host"], port=opts["port"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Provider stand-in on {server.url} (use PROVIDER_ADAPTER=providers.standin.StandInAdapter "
+            f"PROVIDER_STANDIN_URL={server.url})"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
@@ -0,0 +1,65 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from providers.archive import RawArchive, decode_partition, replay_partition, write_partition
+
+
+class Command(BaseCommand):
+    help = "Replay the raw provider archive through the mappers and bulk writers (no network)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--provider", default="api_football")
+        parser.add_argument("--root", default=None, help="Archive root (defaults to PROVIDER_ARCHIVE_ROOT)")
+        parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="First partition (YYYY-MM-DD)")
+        parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Last partition (YYYY-MM-DD)")
+        parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+                            help="Worker processes; 1 replays in this process")
+        parser.add_argument("--skip-stats", action="store_true", help="Only replay fixture lists")
+
+    def handle(self, *args, **opts):
+        root = opts["root"] or getattr(settings, "PROVIDER_ARCHIVE_ROOT", None)
+        if not root:
+            raise CommandError("No archive root: pass --root or set PROVIDER_ARCHIVE_ROOT")
+
+        archive = RawArchive(root, opts["provider"])
+        paths = archive.partitions(opts["date_from"], opts["date_to"])
+        if not paths:
+            self.stdout.write(self.style.WARNING("No archive partitions in range"))
+            return
+
+        # fixtures first so that every statistics record can find its match
+        phases = ["fixtures"] if opts["skip_stats"] else ["fixtures", "stats"]
+        for phase in phases:
+            started = time.monotonic()
+            totals = self._run_phase(phase, paths, opts["provider"], opts["workers"])
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"[{phase}] {len(paths)} partitions in {elapsed:.1f}s: {totals}"
+            ))
+
+    def _run_phase(self, phase, paths, provider, workers):
+        totals = {}
+
+        def add(result):
+            for k, v in result.items():
+                totals[k] = totals.get(k, 0) + v
+
+        if workers <= 1:
+            for path in paths:
+                add(replay_partition(path, provider, phase))
+            return totals
+
+        # workers only decode and normalize; this process writes the partitions in date
+        # order, so a fixture archived on several days ends with its newest snapshot and
+        # no two writers insert the same new match at once
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            for decoded in pool.map(decode_partition, paths, [phase] * len(paths)):
+                add(write_partition(decoded, provider, phase))
+        return totals
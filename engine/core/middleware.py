@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:  # optional encoders
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+
+def _gzip(body: bytes, level: int) -> bytes:
+    # mtime=0 keeps the output a function of the body, so it can be cached and compared
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def _brotli(body: bytes, level: int) -> bytes:
+    return brotli.compress(body, quality=level)
+
+
+def _zstd(body: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(body)
+
+
+def available_encodings():
+    """{content-coding: compress(body, level)} for the encoders installed, best first."""
+    encoders = {}
+    if brotli is not None:
+        encoders["br"] = _brotli
+    if zstandard is not None:
+        encoders["zstd"] = _zstd
+    encoders["gzip"] = _gzip
+    return encoders
+
+
+def negotiate_encoding(accept_encoding: str, offered):
+    """
+    The content-coding in `offered` (in order of preference) that an Accept-Encoding
+    header rates highest, or None for identity. q=0 refuses a coding; `*` covers the
+    codings the header does not name.
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    best, best_q = None, 0.0
+    for coding in offered:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses API responses with the best coding the client accepts: brotli or zstd when
+    their packages are installed, else gzip (settings.RESPONSE_COMPRESSION).
+
+    Only bodies of MIN_SIZE bytes or more with one of CONTENT_TYPES are compressed, so
+    HTML pages carrying CSRF tokens are left alone (BREACH). Compressed bytes are kept
+    in CACHE keyed by the body's digest: a board served from the response cache is
+    compressed once per TTL, not once per request.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.encoders = available_encodings()
+
+    def process_response(self, request, response):
+        if not self.should_compress(response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""), self.encoders)
+        if encoding is None:
+            return response
+
+        response.content = self.compress(encoding, response.content)
+        response["Content-Length"] = str(len(response.content))
+        response["Content-Encoding"] = encoding
+        # the bytes differ per coding, so a strong validator would be wrong (RFC 9110 8.8.1)
+        etag = response.get("ETag")
+        if etag and not etag.startswith("W/"):
+            response["ETag"] = f"W/{etag}"
+        return response
+
+    def should_compress(self, response) -> bool:
+        config = settings.RESPONSE_COMPRESSION
+        if response.streaming or response.status_code != 200 or response.has_header("Content-Encoding"):
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        return content_type in config["CONTENT_TYPES"] and len(response.content) >= config["MIN_SIZE"]
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        config = settings.RESPONSE_COMPRESSION
+        cache = caches[config["CACHE"]] if config["CACHE"] else None
+        key = f"compressed:{encoding}:{hashlib.blake2b(body, digest_size=20).hexdigest()}"
+        if cache is not None:
+            compressed = cache.get(key)
+            if compressed is not None:
+                return compressed
+        compressed = self.encoders[encoding](body, config["LEVELS"][encoding])
+        if cache is not None:
+            cache.set(key, compressed, timeout=config["CACHE_TTL"])
+        return compressed
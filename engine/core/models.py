@@ -1,5 +1,6 @@
 import uuid
 from django.db import models
+from django.utils import timezone
 
 class TimeStampedModel(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -7,4 +8,121 @@ class TimeStampedModel(models.Model):
     updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
-        abstract = True
\ No newline at end of file
+        abstract = True
+
+class ProviderRefKind(models.TextChoices):
+    COMPETITION = "competition", "Competition"
+    TEAM = "team", "Team"
+    MATCH = "match", "Match"
+
+
+class ProviderRefManager(models.Manager):
+    def resolve(self, provider: str, kind: str, external_ids) -> dict:
+        """Map many provider ids to our UUIDs in one indexed query: {external_id: uuid}."""
+        external_ids = {str(i) for i in external_ids}
+        if not external_ids:
+            return {}
+        rows = self.filter(provider=provider, kind=kind, external_id__in=external_ids)
+        return dict(rows.values_list("external_id", "object_id"))
+
+    def register(self, provider: str, kind: str, mapping: dict) -> None:
+        """Upsert {external_id: uuid} pairs (an existing external id is re-pointed)."""
+        if not mapping:
+            return
+        self.bulk_create(
+            [ProviderRef(provider=provider, kind=kind, external_id=str(ext), object_id=oid)
+             for ext, oid in mapping.items()],
+            update_conflicts=True,
+            unique_fields=["provider", "kind", "external_id"],
+            update_fields=["object_id", "updated_at"],
+        )
+
+
+class ProviderRef(TimeStampedModel):
+    """
+    Indexed mirror of the provider_refs JSON on Competition/Team/Match:
+    (provider, kind, external id) -> our UUID.
+    """
+    provider = models.CharField(max_length=32)     # e.g., "api_football"
+    kind = models.CharField(max_length=16, choices=ProviderRefKind.choices)
+    external_id = models.CharField(max_length=64)
+    object_id = models.UUIDField()
+
+    objects = ProviderRefManager()
+
+    class Meta:
+        unique_together = (("provider", "kind", "external_id"),)
+        indexes = [models.Index(fields=["kind", "object_id"])]
+
+    def __str__(self) -> str:
+        return f"{self.provider}:{self.kind}:{self.external_id} → {self.object_id}"
+
+
+class BackfillCheckpoint(TimeStampedModel):
+    """
+    One unit of work of the `backfill` command: the fixture list of a league season, or
+    a chunk of its finished matches whose stats still need hydrating. A rerun skips the
+    chunks that are already done.
+    """
+
+    class Phase(models.TextChoices):
+        FIXTURES = "fixtures", "Fixtures"
+        STATS = "stats", "Stats"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    provider = models.CharField(max_length=32)
+    league = models.CharField(max_length=64)       # provider league id
+    season = models.IntegerField()
+    phase = models.CharField(max_length=16, choices=Phase.choices)
+    chunk = models.PositiveIntegerField(default=0)
+    items = models.JSONField(default=list, blank=True)  # stats phase: our Match ids
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = (("provider", "league", "season", "phase", "chunk"),)
+
+    def __str__(self) -> str:
+        return f"{self.provider}:{self.league}/{self.season} {self.phase}#{self.chunk} ({self.status})"
+
+
+class DataVersion(models.Model):
+    """
+    Change counter for one slice of the match data ("matches", "date:2025-08-16",
+    "competition:<uuid>", "match:<uuid>"). Ingestion bumps the counters of every slice
+    it writes, so ETags and cache keys come from one indexed read (see core.versions).
+    """
+    scope = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.scope}@{self.version}"
+
+
+class LiveEvent(models.Model):
+    """
+    One change pushed to the live feed (core.events): a match's status/minute or a batch
+    of its metric values. The auto-increment id is the SSE event id clients resume from;
+    rows older than settings.LIVE_EVENTS_RETENTION are pruned by the live loop.
+    """
+    MATCH = "match"
+    METRICS = "metrics"
+
+    kind = models.CharField(max_length=16)
+    # plain ids: events are a log and outlive the rows they describe
+    match_id = models.UUIDField()
+    competition_id = models.UUIDField()
+    data = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self) -> str:
+        return f"#{self.id} {self.kind} {self.match_id}"
@@ -0,0 +1,99 @@
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+try:  # optional fast encoder
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+_drf_default = encoders.JSONEncoder().default
+
+
+def _plain_floats(data) -> bool:
+    """
+    Whether every float in `data` is finite and one Python prints without an exponent
+    (zero, or 1e-4 <= |x| < 1e16): orjson writes those with the same digits.
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            # NaN fails both comparisons, infinities the upper bound
+            if value != 0.0 and not 1e-4 <= abs(value) < 1e16:
+                return False
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return True
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed. The bytes match
+    JSONRenderer's compact UTF-8 output: datetimes, decimals and other non-JSON types
+    go through DRF's own encoder, and U+2028/U+2029 are escaped the same way. Payloads
+    with floats orjson would print differently (exponent form, NaN and infinities)
+    fall back to JSONRenderer, as do pretty-printing (an `indent`), ASCII-only output
+    and values orjson refuses.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (orjson is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+                or not _plain_floats(data)):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data, default=_drf_default, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    application/msgpack, the JSON payload's values in MessagePack: datetimes, UUIDs and
+    decimals become the same strings they are in JSON. Needs the msgpack package.
+    """
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_drf_default, use_bin_type=True)
+
+
+# the defaults with JSONRenderer swapped for FastJSONRenderer, set by the fast-path views
+FAST_RENDERERS = [FastJSONRenderer if r is JSONRenderer else r for r in api_settings.DEFAULT_RENDERER_CLASSES]
+
+# offered next to the defaults by views with BinaryRenderersMixin, when installed
+BINARY_RENDERERS = [MessagePackRenderer] if msgpack is not None else []
+
+
+class BinaryRenderersMixin:
+    """
+    Also serve BINARY_RENDERERS, picked by the Accept header (or ?format=msgpack). Put it
+    before the DRF base class so its renderer_classes and finalize_response apply.
+    """
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, *BINARY_RENDERERS]
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # shared caches must not hand a JSON body to a MessagePack client
+        patch_vary_headers(response, ("Accept",))
+        return response
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from django.core.cache import caches
+
+from .locks import cache_lock
+
+# seconds an expired entry may still be served while one request recomputes it
+STALE_GRACE = 30
+# seconds a recompute may hold the lock before another request takes over
+RECOMPUTE_LOCK_TTL = 30
+
+
+class VersionedResponseCache:
+    """
+    Cache of API response payloads in settings.CACHES["responses"] (local memory or
+    files), keyed by the endpoint, its normalized query params and the data versions
+    (core.versions) the payload was built from. A write bumps the versions, so the
+    next request misses on its own; TTLs only bound how long an entry lives.
+
+    Stampede protection: on a miss a single request recomputes under a lock while the
+    others wait for its result; an entry that just expired is served for STALE_GRACE
+    seconds more while one request refreshes it.
+    """
+
+    def __init__(self, prefix: str, cache=None, clock=time.time):
+        self.prefix = prefix
+        self.cache = cache if cache is not None else caches["responses"]
+        self.clock = clock
+
+    def key(self, request, versions: Dict[str, int], set_params: Iterable[str] = (), vary: str = "") -> str:
+        """
+        Params are sorted, empty ones dropped, and comma lists named in `set_params`
+        (where order does not matter, e.g. ?status=FT,LIVE) sorted and deduplicated.
+        `vary` carries inputs besides the URL that shape the payload.
+        """
+        set_params = set(set_params)
+        params = {}
+        for name in request.query_params:
+            values = [v.strip() for v in request.query_params.getlist(name) if v.strip()]
+            if name in set_params:
+                values = sorted({part.strip() for v in values for part in v.split(",") if part.strip()})
+            if values:
+                params[name] = values
+        canonical = json.dumps(
+            # pagination links embed the host, so it is part of the payload
+            [request.get_host(), request.path, params, vary, sorted(versions.items())], sort_keys=True,
+        )
+        return f"responses:{self.prefix}:{hashlib.sha1(canonical.encode()).hexdigest()}"
+
+    def fetch(self, key: str, compute: Callable[[], Tuple[Any, int]]) -> Any:
+        """The cached payload for `key`, or compute() -> (payload, ttl seconds) stored under it."""
+        entry = self.cache.get(key)
+        if entry and entry["fresh_until"] > self.clock():
+            return entry["data"]
+
+        # an expired entry covers for everyone but the one request refreshing it
+        with cache_lock(key, RECOMPUTE_LOCK_TTL, self.cache, wait=entry is None) as held:
+            if not held and entry:
+                return entry["data"]
+            if held:
+                entry = self.cache.get(key)
+                if entry and entry["fresh_until"] > self.clock():
+                    # computed by the request we waited for
+                    return entry["data"]
+            data, ttl = compute()
+            self.store(key, data, ttl)
+            return data
+
+    def store(self, key: str, data: Any, ttl: Optional[int]) -> None:
+        if not ttl:
+            return
+        entry = {"data": data, "fresh_until": self.clock() + ttl}
+        self.cache.set(key, entry, timeout=ttl + STALE_GRACE)
+
+
+
+class CachedPayloadMixin:
+    """
+    For views using ConditionalHeadersMixin: serve a payload from a VersionedResponseCache
+    named `payload_cache_prefix` whenever the request's validators came from data versions.
+    """
+    payload_cache_prefix = "api"
+    # comma-list params whose order does not change the payload
+    payload_set_params = ()
+
+    def cached_payload(self, request, validators, compute: Callable[[], Tuple[Any, int]], vary: str = ""):
+        """compute() -> (payload, ttl), or the payload cached for the same params, vary and data versions."""
+        if validators.versions is None:
+            return compute()[0]
+        cache = VersionedResponseCache(self.payload_cache_prefix)
+        return cache.fetch(cache.key(request, validators.versions, self.payload_set_params, vary), compute)
@@ -0,0 +1,18 @@
+"""Test doubles shared by the test suites of several apps."""
+import uuid
+from django.core.cache.backends.locmem import LocMemCache
+
+
+class FakeClock:
+    """A clock callable whose time only moves when a test sets or advances `now`."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def local_cache(name="test"):
+    """A private, empty local-memory cache, so tests never share state through caches."""
+    return LocMemCache(f"{name}-{uuid.uuid4()}", {})
@@ -0,0 +1,143 @@
+import json
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from io import StringIO
+from unittest import mock
+
+from ..models import BackfillCheckpoint, ProviderRef, ProviderRefKind
+from competitions.models import Competition
+from matches.models import Match
+from providers.base import ProviderError, RateLimitError
+from providers.resolver import identities
+from providers.tasks import backfill_chunk
+from providers.tests.test_ingest import fixture
+from teams.models import Team
+
+
+class BackfillProviderRefsCommandTests(TestCase):
+    def test_backfills_refs_from_json_and_is_idempotent(self):
+        comp = Competition.objects.create(name="EPL", country="England", provider_refs={"api_football": {"league_id": 39}})
+        team = Team.objects.create(name="Arsenal", country="England", provider_refs={"api_football": {"team_id": "42"}})
+        Team.objects.create(name="No Refs", country="England")
+
+        call_command("backfill_provider_refs", stdout=StringIO())
+        call_command("backfill_provider_refs", stdout=StringIO())
+
+        self.assertEqual(ProviderRef.objects.count(), 2)
+        self.assertEqual(
+            ProviderRef.objects.resolve("api_football", ProviderRefKind.COMPETITION, ["39"]), {"39": comp.id}
+        )
+        self.assertEqual(ProviderRef.objects.resolve("api_football", ProviderRefKind.TEAM, ["42"]), {"42": team.id})
+
+
+class FakeBackfillAdapter:
+    name = "api_football"
+
+    def __init__(self, fixtures, broken=()):
+        self.fixtures = fixtures
+        self.broken = set(broken)
+        self.quota = {"daily_remaining": 10000}
+        self.calls = []
+
+    def iter_fixtures(self, league, season=None, **kwargs):
+        self.calls.append(("fixtures", league, season))
+        return iter(self.fixtures)
+
+    def fetch_match_stats(self, fixture_id, final=False):
+        self.calls.append(("stats", fixture_id))
+        if fixture_id in self.broken:
+            raise ProviderError("status 500")
+        return []
+
+
+class RateLimitedBackfillAdapter(FakeBackfillAdapter):
+    def iter_fixtures(self, league, season=None, **kwargs):
+        self.calls.append(("fixtures", league, season))
+        raise RateLimitError("rate limited", retry_after=7)
+
+
+class BackfillCommandTests(TestCase):
+    def setUp(self):
+        identities.clear()
+        self.fixtures = [fixture(i, 10 + i, 20 + i, ts=1725634800 + i * 3600, status="FT") for i in range(1, 6)]
+
+    def tearDown(self):
+        identities.clear()
+
+    def run_backfill(self, adapter, *args):
+        out = StringIO()
+        with mock.patch("providers.backfill.get_adapter", return_value=adapter):
+            call_command("backfill", "--league", "39", "--season", "2024", "--workers", "1",
+                         "--chunk-size", "2", *args, stdout=out)
+        return out.getvalue()
+
+    def test_checkpoints_chunks_and_resumes_failed_ones(self):
+        first = FakeBackfillAdapter(self.fixtures, broken={"3"})
+        output = self.run_backfill(first)
+
+        self.assertEqual(Match.objects.count(), 5)
+        self.assertIn("items/s", output)
+        self.assertIn("ETA", output)
+        stats = BackfillCheckpoint.objects.filter(phase="stats").order_by("chunk")
+        self.assertEqual([len(cp.items) for cp in stats], [2, 2, 1])
+        self.assertEqual([cp.status for cp in stats], ["done", "failed", "done"])
+
+        # the rerun skips the season's fixture list and every finished chunk
+        second = FakeBackfillAdapter(self.fixtures)
+        self.run_backfill(second)
+        fetched = {c[1] for c in second.calls if c[0] == "stats"}
+        self.assertNotIn("fixtures", [c[0] for c in second.calls])
+        self.assertEqual(len(fetched), 2)
+        self.assertIn("3", fetched)
+        self.assertFalse(BackfillCheckpoint.objects.exclude(status="done").exists())
+
+    def test_enqueue_hands_pending_chunks_to_celery(self):
+        with mock.patch.object(backfill_chunk, "apply_async") as enqueue:
+            call_command("backfill", "--league", "39", "--league", "140", "--season", "2024", "--enqueue",
+                         stdout=StringIO())
+        self.assertEqual(enqueue.call_count, 2)
+        self.assertEqual(BackfillCheckpoint.objects.filter(phase="fixtures", status="pending").count(), 2)
+
+    def test_task_retries_a_rate_limited_chunk_instead_of_sleeping(self):
+        cp = BackfillCheckpoint.objects.create(provider="api_football", league="39", season=2024, phase="fixtures")
+        adapter = RateLimitedBackfillAdapter(self.fixtures)
+        with mock.patch("providers.backfill.get_adapter", return_value=adapter), \
+                mock.patch("providers.backfill.time.sleep") as sleep, \
+                mock.patch.object(backfill_chunk, "retry", side_effect=RuntimeError("retry")) as retry:
+            with self.assertRaisesMessage(RuntimeError, "retry"):
+                backfill_chunk.run(str(cp.id))
+
+        sleep.assert_not_called()
+        self.assertEqual(len(adapter.calls), 1)
+        self.assertEqual(retry.call_args.kwargs["countdown"], 7)
+        cp.refresh_from_db()
+        self.assertEqual(cp.status, "pending")
+
+    def test_stops_handing_out_chunks_when_quota_is_low(self):
+        adapter = FakeBackfillAdapter(self.fixtures)
+        adapter.quota = {"daily_remaining": 10}
+        with override_settings(BACKFILL_QUOTA_RESERVE=100):
+            output = self.run_backfill(adapter)
+        self.assertIn("quota is low", output)
+        self.assertFalse(BackfillCheckpoint.objects.filter(phase="stats").exists())
+
+
+class BenchIngestCommandTests(TestCase):
+    def setUp(self):
+        identities.clear()
+
+    def tearDown(self):
+        identities.clear()
+
+    def test_reports_throughput_for_both_tasks(self):
+        out = StringIO()
+        call_command("bench_ingest", "--leagues", "1", "--teams", "4", "--json", stdout=out)
+        report = json.loads(out.getvalue())
+
+        sync, hydrate = report["sync_fixtures_for_league"], report["hydrate_match_stats"]
+        self.assertEqual((sync["tasks"], sync["fixtures"], sync["failed"]), (1, 12, 0))
+        self.assertGreater(sync["queries_per_fixture"], 0)
+        finished = Match.objects.filter(status="FT").count()
+        self.assertEqual(hydrate["tasks"], finished)
+        self.assertEqual(hydrate["metric_rows"], finished * 6)
+        self.assertIn("p95_ms", hydrate)
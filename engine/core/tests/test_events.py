@@ -0,0 +1,210 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import events
+from core.events import FeedFilter, LiveEventBroker
+from core.models import LiveEvent
+from django.contrib.auth import get_user_model
+from matches.models import Match
+from providers.ingest import upsert_fixtures, upsert_match_metrics
+from providers.mapper import normalize_fixture_api_football
+from providers.tests.test_ingest import fixture
+from users.models import UserView
+
+COMP, OTHER = "00000000-0000-0000-0000-0000000000c1", "00000000-0000-0000-0000-0000000000c2"
+
+
+def event(id_, kind="match", competition=COMP, match="m1", **data):
+    return {"id": id_, "kind": kind, "match": match, "competition": competition, "status": "LIVE", **data}
+
+
+class FeedFilterTests(SimpleTestCase):
+    def test_filters_by_competition_match_and_status(self):
+        self.assertIsNotNone(FeedFilter().apply(event(1)))
+        self.assertIsNone(FeedFilter(competitions=frozenset([OTHER])).apply(event(1)))
+        self.assertIsNone(FeedFilter(matches=frozenset(["m2"])).apply(event(1)))
+        self.assertIsNone(FeedFilter(statuses=frozenset(["FT"])).apply(event(1)))
+
+    def test_metric_keys_narrow_metrics_events(self):
+        metrics = [{"metric_key": "corners", "value": 5}, {"metric_key": "xg", "value": 1.2}]
+        narrowed = FeedFilter(metric_keys=frozenset(["corners"])).apply(event(1, "metrics", metrics=metrics))
+        self.assertEqual(narrowed["metrics"], metrics[:1])
+        self.assertIsNone(FeedFilter(metric_keys=frozenset(["cards_total"])).apply(event(1, "metrics", metrics=metrics)))
+
+    def test_full_subscriber_overflows(self):
+        async def run():
+            sub = events.Subscription(FeedFilter(), maxsize=1)
+            sub.offer(event(1))
+            sub.offer(event(2))
+            return sub
+
+        sub = asyncio.run(run())
+        self.assertTrue(sub.overflowed)
+        self.assertEqual(sub.queue.qsize(), 1)
+
+
+class PublishFromIngestionTests(TestCase):
+    def live_fixture(self, elapsed, status="1H"):
+        return normalize_fixture_api_football(
+            fixture(1, 10, 11, ts=int(time.time()) - elapsed * 60, status=status, elapsed=elapsed)
+        )
+
+    def test_status_and_minute_changes_of_live_matches(self):
+        upsert_fixtures("api_football", [self.live_fixture(10)])
+        upsert_fixtures("api_football", [self.live_fixture(10)])
+        upsert_fixtures("api_football", [self.live_fixture(11)])
+        match = Match.objects.get()
+        self.assertEqual(
+            list(LiveEvent.objects.order_by("id").values_list("kind", "match_id", "data")),
+            [("match", match.id, {"status": "LIVE", "minute": 10}), ("match", match.id, {"status": "LIVE", "minute": 11})],
+        )
+
+    def test_old_matches_are_not_published(self):
+        # 2024 fixtures, e.g. a backfill
+        upsert_fixtures("api_football", [normalize_fixture_api_football(fixture(1, 10, 11, status="FT"))])
+        match = Match.objects.get()
+        upsert_match_metrics("api_football", {match.id: [
+            {"metric_key": "corners", "team_provider_id": "10", "value": 5.0, "period": "FT"},
+        ]})
+        self.assertFalse(LiveEvent.objects.exists())
+
+    def test_changed_metric_values(self):
+        upsert_fixtures("api_football", [self.live_fixture(30)])
+        match = Match.objects.get()
+        rows = {match.id: [
+            {"metric_key": "corners", "team_provider_id": "10", "value": 5.0, "period": "FT"},
+            {"metric_key": "corners", "team_provider_id": "11", "value": 2.0, "period": "FT"},
+        ]}
+        upsert_match_metrics("api_football", rows)
+        rows[match.id][1] = {**rows[match.id][1], "value": 3.0}
+        upsert_match_metrics("api_football", rows)
+
+        deltas = [e.data["metrics"] for e in LiveEvent.objects.filter(kind=LiveEvent.METRICS).order_by("id")]
+        self.assertEqual([len(d) for d in deltas], [2, 1])
+        self.assertEqual(deltas[1][0]["value"], 3.0)
+        self.assertEqual(deltas[1][0]["team"], str(match.away_id))
+
+    def test_prune_drops_events_past_retention(self):
+        upsert_fixtures("api_football", [self.live_fixture(10)])
+        LiveEvent.objects.update(created_at=timezone.now() - timedelta(hours=2))
+        upsert_fixtures("api_football", [self.live_fixture(11)])
+        with override_settings(LIVE_EVENTS_RETENTION=3600):
+            self.assertEqual(events.prune(), 1)
+        self.assertEqual(LiveEvent.objects.count(), 1)
+
+
+@override_settings(LIVE_EVENTS_POLL_INTERVAL=0.01, LIVE_EVENTS_HEARTBEAT=5)
+class LiveFeedTests(TestCase):
+    def setUp(self):
+        self.broker = LiveEventBroker()
+        patcher = mock.patch.object(events, "broker", self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse("live")
+
+    def publish(self, competition=COMP, minute=1):
+        events.publish([events.match_event(
+            "00000000-0000-0000-0000-00000000000a", competition, "LIVE", minute,
+        )])
+        return LiveEvent.objects.order_by("-id").values_list("id", flat=True).first()
+
+    @asynccontextmanager
+    async def open_feed(self, *args, **kwargs):
+        response = await self.async_client.get(self.url, *args, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = aiter(response.streaming_content)
+        try:
+            self.assertTrue((await anext(body)).startswith(b"retry:"))
+            yield body
+        finally:
+            await body.aclose()
+
+    async def next_chunk(self, body):
+        chunk = await asyncio.wait_for(anext(body), timeout=2)
+        return chunk.decode()
+
+    async def test_pushes_new_events_matching_the_filter(self):
+        async with self.open_feed({"competition": COMP}) as body:
+            chunk = asyncio.ensure_future(self.next_chunk(body))
+            await sync_to_async(self.publish)(competition=OTHER)
+            event_id = await sync_to_async(self.publish)(minute=2)
+            text = await chunk
+        self.assertTrue(text.startswith(f"id: {event_id}\nevent: match\n"))
+        self.assertIn('"minute":2', text)
+
+    async def test_closing_the_stream_unsubscribes(self):
+        body = events.stream(self.broker, FeedFilter())
+        await anext(body)
+        self.assertEqual(len(self.broker.subscribers), 1)
+        await body.aclose()
+        self.assertEqual(self.broker.subscribers, set())
+
+    async def test_resumes_after_last_event_id(self):
+        first = await sync_to_async(self.publish)(minute=1)
+        second = await sync_to_async(self.publish)(minute=2)
+        async with self.open_feed(headers={"Last-Event-ID": str(first)}) as body:
+            self.assertTrue((await self.next_chunk(body)).startswith(f"id: {second}\n"))
+
+        # a pruned id cannot be resumed: the client has to reload
+        async with self.open_feed({"last_event_id": str(first - 1)}) as body:
+            self.assertTrue((await self.next_chunk(body)).startswith("event: reset\n"))
+
+    async def test_idle_broker_restarts_at_the_head(self):
+        sub = await self.broker.subscribe(FeedFilter())
+        self.broker.unsubscribe(sub)
+        await asyncio.wait_for(self.broker._task, timeout=2)
+
+        # published while nobody was listening
+        for minute in range(5):
+            latest = await sync_to_async(self.publish)(minute=minute)
+        sub = await self.broker.subscribe(FeedFilter())
+        try:
+            self.assertEqual(self.broker.last_id, latest)
+            await asyncio.sleep(0.05)
+            self.assertTrue(sub.queue.empty())
+        finally:
+            self.broker.unsubscribe(sub)
+
+    async def test_clients_arriving_together_start_one_poller(self):
+        with mock.patch.object(events, "latest_id", wraps=events.latest_id) as head:
+            subs = await asyncio.gather(*(self.broker.subscribe(FeedFilter()) for _ in range(2)))
+        try:
+            self.assertEqual(head.call_count, 1)
+            event_id = await sync_to_async(self.publish)()
+            for sub in subs:
+                self.assertEqual((await asyncio.wait_for(sub.queue.get(), timeout=2))["id"], event_id)
+            await asyncio.sleep(0.05)
+            self.assertTrue(all(sub.queue.empty() for sub in subs))
+        finally:
+            for sub in subs:
+                self.broker.unsubscribe(sub)
+
+    @override_settings(LIVE_EVENTS_HEARTBEAT=0.01)
+    async def test_heartbeat_while_idle(self):
+        async with self.open_feed() as body:
+            self.assertEqual(await self.next_chunk(body), ": heartbeat\n\n")
+
+    async def test_saved_view_needs_its_owner(self):
+        user = await get_user_model().objects.acreate(username="u")
+        view = await UserView.objects.acreate(user=user, name="v", filters={"competition_ids": [OTHER]})
+        response = await self.async_client.get(self.url, {"view": str(view.id)})
+        self.assertEqual(response.status_code, 401)
+        await self.async_client.aforce_login(user)
+        async with self.open_feed({"view": str(view.id)}) as body:
+            chunk = asyncio.ensure_future(self.next_chunk(body))
+            await sync_to_async(self.publish)(competition=COMP)
+            event_id = await sync_to_async(self.publish)(competition=OTHER)
+            self.assertTrue((await chunk).startswith(f"id: {event_id}\n"))
+
+    async def test_rejects_malformed_params(self):
+        response = await self.async_client.get(self.url, {"match": "nope"})
+        self.assertEqual(response.status_code, 400)
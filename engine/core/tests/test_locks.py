@@ -0,0 +1,17 @@
+from django.test import SimpleTestCase
+
+from ..locks import cache_lock
+from .helpers import local_cache
+
+
+class CacheLockTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = local_cache("locks")
+
+    def test_lock_is_exclusive_and_released(self):
+        with cache_lock("sync:39", 10, self.cache) as held:
+            self.assertTrue(held)
+            with cache_lock("sync:39", 10, self.cache, wait=False) as again:
+                self.assertFalse(again)
+        with cache_lock("sync:39", 10, self.cache, wait=False) as after:
+            self.assertTrue(after)
@@ -0,0 +1,90 @@
+import gzip
+import json
+from unittest import mock, skipIf
+
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core import middleware
+from core.middleware import CompressionMiddleware, negotiate_encoding
+
+BODY = json.dumps({"columns": {"id": [f"match-{i}" for i in range(200)]}}).encode()
+
+
+def json_response(body=BODY, **headers):
+    response = HttpResponse(body, content_type="application/json")
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+class NegotiateEncodingTests(SimpleTestCase):
+    def test_picks_highest_q_then_server_preference(self):
+        self.assertEqual(negotiate_encoding("gzip, br", ["br", "gzip"]), "br")
+        self.assertEqual(negotiate_encoding("gzip;q=1.0, br;q=0.5", ["br", "gzip"]), "gzip")
+        self.assertEqual(negotiate_encoding("deflate", ["br", "gzip"]), None)
+
+    def test_q_zero_and_wildcard(self):
+        self.assertEqual(negotiate_encoding("*;q=0.1, br;q=0", ["br", "gzip"]), "gzip")
+        self.assertEqual(negotiate_encoding("gzip;q=0", ["gzip"]), None)
+        self.assertEqual(negotiate_encoding("", ["gzip"]), None)
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        caches["responses"].clear()
+
+    def run_middleware(self, response, accept="gzip"):
+        request = self.factory.get("/api/v1/board", HTTP_ACCEPT_ENCODING=accept)
+        mw = CompressionMiddleware(lambda request: response)
+        # only gzip, whatever else is installed here
+        mw.encoders = {"gzip": mw.encoders["gzip"]}
+        return mw(request)
+
+    def test_gzips_json_and_weakens_etag(self):
+        resp = self.run_middleware(json_response(ETag="abc123"))
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(resp.content), BODY)
+        self.assertEqual(resp["Content-Length"], str(len(resp.content)))
+        self.assertEqual(resp["ETag"], "W/abc123")
+        self.assertIn("Accept-Encoding", resp["Vary"])
+
+    def test_identity_when_not_accepted(self):
+        resp = self.run_middleware(json_response(ETag="abc123"), accept="identity")
+        self.assertFalse(resp.has_header("Content-Encoding"))
+        self.assertEqual(resp.content, BODY)
+        self.assertEqual(resp["ETag"], "abc123")
+        self.assertIn("Accept-Encoding", resp["Vary"])
+
+    def test_skips_small_bodies_html_and_errors(self):
+        small = self.run_middleware(json_response(b'{"ok":true}'))
+        self.assertFalse(small.has_header("Content-Encoding"))
+        html = self.run_middleware(HttpResponse(b"<p>x</p>" * 500))
+        self.assertFalse(html.has_header("Content-Encoding"))
+        error = json_response()
+        error.status_code = 500
+        self.assertFalse(self.run_middleware(error).has_header("Content-Encoding"))
+
+    def test_compressed_bytes_are_cached_by_body(self):
+        with mock.patch.object(middleware, "_gzip", wraps=middleware._gzip) as compress:
+            first = self.run_middleware(json_response()).content
+            second = self.run_middleware(json_response()).content
+        self.assertEqual(first, second)
+        self.assertEqual(compress.call_count, 1)
+
+    @override_settings(RESPONSE_COMPRESSION={
+        "MIN_SIZE": 10, "CONTENT_TYPES": ("application/json",), "LEVELS": {"gzip": 1},
+        "CACHE": "", "CACHE_TTL": 0,
+    })
+    def test_without_cache(self):
+        resp = self.run_middleware(json_response(b'{"ok":true,"n":12345}'))
+        self.assertEqual(gzip.decompress(resp.content), b'{"ok":true,"n":12345}')
+
+    @skipIf(middleware.brotli is None, "brotli is not installed")
+    def test_brotli_preferred_when_installed(self):
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+        resp = CompressionMiddleware(lambda request: json_response())(request)
+        self.assertEqual(resp["Content-Encoding"], "br")
+        self.assertEqual(middleware.brotli.decompress(resp.content), BODY)
@@ -1,9 +1,10 @@
+import uuid
 from django.test import TestCase
 from django.test.utils import isolate_apps
 from django.utils import timezone
 from django.db import connection
 
-from ..models import TimeStampedModel
+from ..models import TimeStampedModel, ProviderRef, ProviderRefKind
 
 
 @isolate_apps("core")
@@ -39,4 +40,26 @@ class TimeStampedModelTests(TestCase):
         # small wait not required; auto_now will still bump on save
         obj.save()
         obj.refresh_from_db()
-        self.assertGreaterEqual(obj.updated_at, first_updated)
\ No newline at end of file
+        self.assertGreaterEqual(obj.updated_at, first_updated)
+
+
+class ProviderRefTests(TestCase):
+    def test_resolve_many_ids_in_one_query(self):
+        a, b = uuid.uuid4(), uuid.uuid4()
+        ProviderRef.objects.register("api_football", ProviderRefKind.TEAM, {"33": a, 34: b})
+
+        with self.assertNumQueries(1):
+            found = ProviderRef.objects.resolve("api_football", ProviderRefKind.TEAM, ["33", "34", "35"])
+        self.assertEqual(found, {"33": a, "34": b})
+
+        # scoped by provider and kind
+        self.assertEqual(ProviderRef.objects.resolve("other", ProviderRefKind.TEAM, ["33"]), {})
+        self.assertEqual(ProviderRef.objects.resolve("api_football", ProviderRefKind.MATCH, ["33"]), {})
+
+    def test_register_repoints_existing_ref(self):
+        old, new = uuid.uuid4(), uuid.uuid4()
+        ProviderRef.objects.register("api_football", ProviderRefKind.MATCH, {"1": old})
+        ProviderRef.objects.register("api_football", ProviderRefKind.MATCH, {"1": new})
+
+        self.assertEqual(ProviderRef.objects.count(), 1)
+        self.assertEqual(ProviderRef.objects.resolve("api_football", ProviderRefKind.MATCH, ["1"]), {"1": new})
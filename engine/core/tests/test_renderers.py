@@ -0,0 +1,70 @@
+import datetime
+import json
+import uuid
+from decimal import Decimal
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+from core import renderers
+from core.renderers import FAST_RENDERERS, FastJSONRenderer, MessagePackRenderer
+from h2h.views import H2HView
+from matches.views import MatchViewSet
+
+
+@skipIf(renderers.orjson is None, "orjson is not installed")
+class FastJSONRendererTests(SimpleTestCase):
+    def test_bytes_match_json_renderer(self):
+        data = {
+            "id": uuid.uuid4(),
+            "at": datetime.datetime(2025, 9, 6, 15, 0, 0, 123456, tzinfo=datetime.timezone.utc),
+            "day": datetime.date(2025, 9, 6),
+            "value": Decimal("1.50"),
+            "floats": [0.1, 2.5, 1.0, -3.25],
+            "text": "Stade  de France   é",
+            "none": None,
+            "nested": [{"a": 1, "b": [True, False]}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_pretty_printing_falls_back(self):
+        data = {"a": [1, 2]}
+        context = {"indent": 2}
+        self.assertEqual(
+            FastJSONRenderer().render(data, "application/json", context),
+            JSONRenderer().render(data, "application/json", context),
+        )
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_floats_orjson_prints_differently_fall_back(self):
+        for value in (1e-07, 1e-05, 1e16, 1.5e20, -2e-300):
+            data = {"rows": [{"value": value}, {"value": 0.5}]}
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        for value in (float("nan"), float("inf")):
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render({"value": value})
+
+
+class FastRenderersTests(SimpleTestCase):
+    def test_only_the_fast_path_views_use_it(self):
+        self.assertEqual(FAST_RENDERERS[0], FastJSONRenderer)
+        self.assertIs(api_settings.DEFAULT_RENDERER_CLASSES[0], JSONRenderer)
+        self.assertEqual(H2HView.renderer_classes, FAST_RENDERERS)
+        self.assertEqual(MatchViewSet.renderer_classes[:len(FAST_RENDERERS)], FAST_RENDERERS)
+
+
+@skipIf(renderers.msgpack is None, "msgpack is not installed")
+class MessagePackRendererTests(SimpleTestCase):
+    def test_values_match_the_json_payload(self):
+        data = {
+            "id": uuid.uuid4(),
+            "at": datetime.datetime(2025, 9, 6, 15, 0, tzinfo=datetime.timezone.utc),
+            "value": 2.5,
+            "rows": [{"k": "corners", "v": 5}],
+        }
+        unpacked = renderers.msgpack.unpackb(MessagePackRenderer().render(data), raw=False)
+        self.assertEqual(unpacked, json.loads(JSONRenderer().render(data)))
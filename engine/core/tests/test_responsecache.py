@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ..responsecache import VersionedResponseCache
+from .helpers import FakeClock, local_cache
+
+
+class VersionedResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = VersionedResponseCache("test", cache=local_cache("responses"), clock=self.clock)
+        self.factory = APIRequestFactory()
+        self.calls = 0
+
+    def request(self, query):
+        return Request(self.factory.get(f"/api/v1/matches/?{query}"))
+
+    def compute(self, ttl=60):
+        self.calls += 1
+        return {"n": self.calls}, ttl
+
+    def test_key_normalizes_params_and_follows_versions(self):
+        key = self.cache.key(self.request("status=FT,LIVE&metrics=corners&offset="), {"date:x": 1}, ["status"])
+        same = self.cache.key(self.request("metrics=corners&status=LIVE, FT,FT"), {"date:x": 1}, ["status"])
+        bumped = self.cache.key(self.request("metrics=corners&status=LIVE,FT"), {"date:x": 2}, ["status"])
+        self.assertEqual(key, same)
+        self.assertNotEqual(key, bumped)
+
+    def test_entry_is_reused_until_it_expires(self):
+        self.assertEqual(self.cache.fetch("k", self.compute), {"n": 1})
+        self.assertEqual(self.cache.fetch("k", self.compute), {"n": 1})
+        self.clock.now += 61
+        self.assertEqual(self.cache.fetch("k", self.compute), {"n": 2})
+
+    def test_expired_entry_covers_while_another_request_refreshes(self):
+        self.cache.fetch("k", self.compute)
+        self.clock.now += 61
+        self.cache.cache.add("lock:k", "other", timeout=30)
+        self.assertEqual(self.cache.fetch("k", self.compute), {"n": 1})
+        self.assertEqual(self.calls, 1)
+
+    def test_zero_ttl_is_not_stored(self):
+        self.cache.fetch("k", lambda: self.compute(ttl=0))
+        self.cache.fetch("k", lambda: self.compute(ttl=0))
+        self.assertEqual(self.calls, 2)
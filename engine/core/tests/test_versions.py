@@ -0,0 +1,32 @@
+from datetime import datetime, timezone as dt_timezone
+from django.test import TestCase
+
+from ..models import DataVersion
+from ..versions import ALL_MATCHES, bump, date_scopes, match_scopes, read
+
+
+class DataVersionTests(TestCase):
+    def test_bump_creates_then_increments(self):
+        bump({"date:2025-08-16", ALL_MATCHES})
+        bump({ALL_MATCHES})
+        current, latest = read({"date:2025-08-16", ALL_MATCHES})
+        self.assertEqual(current, {"date:2025-08-16": 1, ALL_MATCHES: 2})
+        self.assertEqual(latest, DataVersion.objects.get(scope=ALL_MATCHES).updated_at)
+
+    def test_read_needs_every_scope(self):
+        bump({ALL_MATCHES})
+        self.assertIsNone(read({ALL_MATCHES, "competition:unknown"}))
+
+    def test_match_scopes_use_the_local_date(self):
+        # 23:30 UTC is already the next day in Africa/Lagos (UTC+1)
+        kickoff = datetime(2025, 8, 16, 23, 30, tzinfo=dt_timezone.utc)
+        self.assertIn("date:2025-08-17", match_scopes("m1", kickoff, "c1"))
+        self.assertIn("competition:c1", match_scopes("m1", kickoff, "c1"))
+
+    def test_date_scopes_cover_a_foreign_day(self):
+        # a New York day (UTC-4 in May) runs 05:00 to 05:00 the next day in Lagos
+        start = datetime(2030, 5, 10, 4, 0, tzinfo=dt_timezone.utc)
+        end = datetime(2030, 5, 11, 4, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(date_scopes(start, end), {"date:2030-05-10", "date:2030-05-11"})
+        lagos_day = (datetime(2030, 5, 9, 23, 0, tzinfo=dt_timezone.utc), datetime(2030, 5, 10, 23, 0, tzinfo=dt_timezone.utc))
+        self.assertEqual(date_scopes(*lagos_day), {"date:2030-05-10"})
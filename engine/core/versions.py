@@ -0,0 +1,87 @@
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from django.db import connection
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import DataVersion
+
+# bumped by every match write; versions unfiltered match lists
+ALL_MATCHES = "matches"
+
+
+def match_scopes(match_id, utc_kickoff=None, competition_id=None) -> Set[str]:
+    """
+    Scopes a write to one match invalidates. Dates are local dates in
+    settings.TIME_ZONE, whatever zone a request reads them in (see date_scopes).
+    """
+    scopes = {ALL_MATCHES, f"match:{match_id}"}
+    if utc_kickoff is not None:
+        scopes.add(f"date:{timezone.localdate(utc_kickoff, timezone.get_default_timezone()).isoformat()}")
+    if competition_id is not None:
+        scopes.add(f"competition:{competition_id}")
+    return scopes
+
+
+def date_scopes(start, end) -> Set[str]:
+    """The date scopes covering kickoffs in [start, end), e.g. a day in another time zone spans two."""
+    tz = timezone.get_default_timezone()
+    day, last = timezone.localdate(start, tz), timezone.localdate(end - timedelta(microseconds=1), tz)
+    scopes = set()
+    while day <= last:
+        scopes.add(f"date:{day.isoformat()}")
+        day += timedelta(days=1)
+    return scopes
+
+
+def bump(scopes: Iterable[str]) -> None:
+    """Increment the counters of `scopes` in one INSERT ... ON CONFLICT (missing ones start at 1)."""
+    # a fixed order keeps concurrent bumps from deadlocking on each other's rows
+    scopes = sorted(set(scopes))
+    if not scopes:
+        return
+    table = connection.ops.quote_name(DataVersion._meta.db_table)
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (scope, version, updated_at) VALUES "
+            + ", ".join(["(%s, 1, %s)"] * len(scopes))
+            + f" ON CONFLICT (scope) DO UPDATE SET version = {table}.version + 1, updated_at = EXCLUDED.updated_at",
+            [v for scope in scopes for v in (scope, now)],
+        )
+
+
+def read(scopes: Iterable[str]) -> Optional[Tuple[Dict[str, int], Any]]:
+    """
+    ({scope: version}, latest bump time) for `scopes`, or None when one of them has
+    never been bumped: data written before counters existed must be dated another way.
+    """
+    scopes = set(scopes)
+    rows = DataVersion.objects.filter(scope__in=scopes).values_list("scope", "version", "updated_at")
+    versions = {scope: (version, updated_at) for scope, version, updated_at in rows}
+    if not scopes or versions.keys() != scopes:
+        return None
+    return {s: v for s, (v, _) in versions.items()}, max(ts for _, ts in versions.values())
+
+
+def _bump_match(sender, instance, **kwargs):
+    # single-row saves (admin, shell, fixtures); ingestion bumps its batches itself
+    bump(match_scopes(instance.pk, instance.utc_kickoff, instance.competition_id))
+
+
+def _bump_metric(sender, instance, **kwargs):
+    from matches.models import Match
+
+    # the match may already be gone when its metrics are cascade-deleted
+    row = Match.objects.filter(pk=instance.match_id).values_list("utc_kickoff", "competition_id").first()
+    bump(match_scopes(instance.match_id, *(row or ())))
+
+
+def connect_signals():
+    from matches.models import Match
+    from metrics.models import MatchMetric
+
+    post_save.connect(_bump_match, sender=Match, dispatch_uid="data-version-save-match")
+    post_delete.connect(_bump_match, sender=Match, dispatch_uid="data-version-delete-match")
+    post_save.connect(_bump_metric, sender=MatchMetric, dispatch_uid="data-version-save-metric")
+    post_delete.connect(_bump_metric, sender=MatchMetric, dispatch_uid="data-version-delete-metric")
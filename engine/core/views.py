@@ -1,3 +1,71 @@
-from django.shortcuts import render
+import uuid
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from . import events
+from users.models import UserView
+
+
+def _id_set(request, name):
+    """?name=<uuid>[,<uuid>...] as a frozenset of canonical strings, or None when absent."""
+    value = request.GET.get(name)
+    if not value:
+        return None
+    return frozenset(str(uuid.UUID(part.strip())) for part in value.split(",") if part.strip())
+
+
+def _narrow(base, extra):
+    if base is None or extra is None:
+        return extra if base is None else base
+    return base & extra
+
+
+@require_GET
+async def live_feed(request):
+    """
+    GET /api/v1/live[?competition=<uuid,...>][&match=<uuid,...>][&view=<UserView id>]
+
+    Server-Sent Events of live match changes (core.events): `match` events carry status
+    and minute, `metrics` events the changed metric values. A saved UserView applies its
+    filters ({"competition_ids": [...], "status": ...}) and metric_keys; the query
+    params narrow them further. Reconnecting clients send Last-Event-ID (or
+    ?last_event_id=) and get what they missed. Needs the ASGI entry point (engine/asgi.py):
+    under WSGI every open feed holds a worker thread.
+    """
+    try:
+        competitions = _id_set(request, "competition")
+        matches = _id_set(request, "match")
+        last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+        last_event_id = int(last_event_id) if last_event_id else None
+        view_id = request.GET.get("view")
+        view_id = uuid.UUID(view_id) if view_id else None
+    except ValueError:
+        return JsonResponse(
+            {"detail": "competition, match and view take UUIDs, Last-Event-ID an event id."}, status=400,
+        )
+
+    statuses = metric_keys = None
+    if view_id:
+        user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+        view = await UserView.objects.filter(pk=view_id, user=user).values("metric_keys", "filters").afirst()
+        if view is None:
+            return JsonResponse({"detail": "No such view."}, status=404)
+        filters = view["filters"] or {}
+        if filters.get("competition_ids"):
+            competitions = _narrow(frozenset(str(c) for c in filters["competition_ids"]), competitions)
+        status = filters.get("status")
+        if status:
+            statuses = frozenset([status] if isinstance(status, str) else status)
+        if view["metric_keys"]:
+            metric_keys = frozenset(view["metric_keys"])
+
+    feed_filter = events.FeedFilter(competitions, matches, statuses, metric_keys)
+    response = StreamingHttpResponse(
+        events.stream(events.broker, feed_filter, last_event_id), content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # nginx would otherwise buffer the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
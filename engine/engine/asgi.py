@@ -5,6 +5,13 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Serve it with an ASGI server for the live feed (GET /api/v1/live, core.views.live_feed):
+
+    uvicorn engine.asgi:application --workers 4
+
+Each open feed is a coroutine on its worker's event loop, so a worker holds thousands
+of idle connections; the REST views still run in its thread pool.
 """
 
 import os
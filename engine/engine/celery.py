@@ -0,0 +1,58 @@
+"""
+Celery application for the ingestion workers.
+
+Three queues, each meant for its own worker pool so a long backfill never sits in
+front of live updates:
+
+    celery -A engine worker -Q live -n live@%h
+    celery -A engine worker -Q hydration -n hydration@%h
+    celery -A engine worker -Q backfill -n backfill@%h
+
+A worker consuming exactly one of them picks up that queue's concurrency, prefetch
+and time limits from settings.TASK_QUEUE_PROFILES (command-line flags still win).
+Tasks are routed by providers.routing.route_task.
+"""
+
+import os
+
+from celery import Celery
+from celery.signals import celeryd_init
+from kombu import Exchange, Queue
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "engine.settings")
+
+LIVE, HYDRATION, BACKFILL = "live", "hydration", "backfill"
+
+app = Celery("engine")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.conf.task_queues = [Queue(name, Exchange(name), routing_key=name) for name in (LIVE, HYDRATION, BACKFILL)]
+app.autodiscover_tasks()
+
+# worker setting -> key in a TASK_QUEUE_PROFILES entry
+PROFILE_SETTINGS = {
+    "worker_concurrency": "concurrency",
+    "worker_prefetch_multiplier": "prefetch_multiplier",
+    "task_soft_time_limit": "soft_time_limit",
+    "task_time_limit": "time_limit",
+    "task_acks_late": "acks_late",
+}
+
+
+def queue_profile(queues):
+    """The TASK_QUEUE_PROFILES entry for a worker consuming `queues`, or {} unless it is exactly one known queue."""
+    from django.conf import settings
+
+    if isinstance(queues, str):
+        queues = queues.split(",")
+    names = {q.name if isinstance(q, Queue) else str(q).strip() for q in (queues or [])}
+    if len(names) != 1:
+        return {}
+    return settings.TASK_QUEUE_PROFILES.get(names.pop(), {})
+
+
+@celeryd_init.connect
+def apply_queue_profile(sender=None, conf=None, options=None, **kwargs):
+    profile = queue_profile((options or {}).get("queues"))
+    for setting, key in PROFILE_SETTINGS.items():
+        if key in profile:
+            conf[setting] = profile[key]
@@ -17,8 +17,9 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from core.views import live_feed
 from competitions.views import CompetitionViewSet, SeasonViewSet
-from matches.views import MatchViewSet
+from matches.views import BoardView, MatchViewSet
 from users.views import UserViewViewSet
 from h2h.views import H2HView
 
@@ -32,4 +33,6 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/", include(router.urls)),
     path("api/v1/h2h", H2HView.as_view(), name="h2h"),
+    path("api/v1/board", BoardView.as_view(), name="board"),
+    path("api/v1/live", live_feed, name="live"),
 ]
@@ -1,4 +1,6 @@
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 
 from ..models import H2HCache
@@ -51,3 +53,15 @@ class H2HViewTests(APITestCase):
         self.assertEqual(resp.data["metric"], "corners")
         self.assertEqual(resp.data["window"], "5y")
         self.assertEqual(resp.data["payload"], row.payload)
+
+    def test_fast_path_matches_model_path(self):
+        H2HCache.objects.create(
+            home=self.home, away=self.away, metric_key="corners", window="5y",
+            payload={"meetings": 2, "avg": 9.5}, updated_at_source=timezone.now(),
+        )
+        params = {"home": str(self.home.id), "away": str(self.away.id)}
+        bodies = []
+        for fast in (False, True):
+            with override_settings(API_FAST_PATH=fast):
+                bodies.append(self.client.get(self.url, params).content)
+        self.assertEqual(bodies[0], bodies[1])
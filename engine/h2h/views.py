@@ -1,5 +1,7 @@
+from django.conf import settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from core.renderers import FAST_RENDERERS
 from .models import H2HCache
 
 class H2HView(APIView):
@@ -7,6 +9,8 @@ class H2HView(APIView):
     GET /h2h?home=&away=&metric=&window=5y
     Returns cached payload or 404 if not computed yet (MVP).
     """
+    renderer_classes = FAST_RENDERERS
+
     def get(self, request):
         home = request.query_params.get("home")
         away = request.query_params.get("away")
@@ -16,15 +20,23 @@ class H2HView(APIView):
         if not (home and away):
             return Response({"detail": "home and away are required"}, status=400)
 
+        fields = ("home_id", "away_id", "metric_key", "window", "payload", "updated_at_source")
         try:
-            cache = H2HCache.objects.get(home_id=home, away_id=away, metric_key=metric, window=window)
-            return Response({
-                "home": str(cache.home_id),
-                "away": str(cache.away_id),
-                "metric": cache.metric_key,
-                "window": cache.window,
-                "payload": cache.payload,
-                "updated_at_source": cache.updated_at_source,
-            })
+            if settings.API_FAST_PATH:
+                # one row's columns, no model instance
+                row = H2HCache.objects.values(*fields).get(
+                    home_id=home, away_id=away, metric_key=metric, window=window,
+                )
+            else:
+                cache = H2HCache.objects.get(home_id=home, away_id=away, metric_key=metric, window=window)
+                row = {field: getattr(cache, field) for field in fields}
         except H2HCache.DoesNotExist:
             return Response({"detail": "H2H not yet materialized"}, status=404)
+        return Response({
+            "home": str(row["home_id"]),
+            "away": str(row["away_id"]),
+            "metric": row["metric_key"],
+            "window": row["window"],
+            "payload": row["payload"],
+            "updated_at_source": row["updated_at_source"],
+        })
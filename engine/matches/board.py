@@ -0,0 +1,44 @@
+from typing import Any, Dict, List, Sequence
+from django.db.models import F, Max, Q
+
+from .models import Match
+
+# match columns of the board, in response order
+MATCH_COLUMNS = ("id", "utc_kickoff", "competition_id", "home_id", "away_id", "status", "minute")
+# metric keys one board may pivot (two columns each)
+MAX_BOARD_METRICS = 12
+
+
+def board_queryset(start, end, metric_keys: Sequence[str], period: str = "FT", competition=None, statuses=None):
+    """
+    Matches kicking off in [start, end) with `metric_keys` pivoted into m<i>_home /
+    m<i>_away columns. MAX(...) FILTER (WHERE ...) over the matches' metric rows does
+    the pivot, so the whole board is one grouped statement; a metric not recorded
+    yet is NULL.
+    """
+    pivot = {}
+    for i, key in enumerate(metric_keys):
+        for side in ("home", "away"):
+            pivot[f"m{i}_{side}"] = Max("metrics__value", filter=Q(
+                metrics__metric_type__key=key, metrics__period=period, metrics__team_id=F(f"{side}_id"),
+            ))
+    qs = Match.objects.filter(utc_kickoff__gte=start, utc_kickoff__lt=end)
+    if competition:
+        qs = qs.filter(competition_id=competition)
+    if statuses:
+        qs = qs.filter(status__in=statuses)
+    return qs.values(*MATCH_COLUMNS).annotate(**pivot).order_by("utc_kickoff", "id")
+
+
+def columnar(rows, metric_keys: Sequence[str]) -> Dict[str, List[Any]]:
+    """{column: [values...]}: match columns, then <key>_home / <key>_away per metric."""
+    names = {c: c[:-3] if c.endswith("_id") and c != "id" else c for c in MATCH_COLUMNS}
+    for i, key in enumerate(metric_keys):
+        for side in ("home", "away"):
+            names[f"m{i}_{side}"] = f"{key}_{side}"
+    columns = {name: [] for name in names.values()}
+    appenders = [(field, columns[name].append) for field, name in names.items()]
+    for row in rows:
+        for field, append in appenders:
+            append(row[field])
+    return columns
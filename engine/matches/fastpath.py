@@ -0,0 +1,91 @@
+"""
+Serializer-free encoding of the hot read endpoints. MatchSerializer and
+MatchMetricSerializer build a model instance and a set of field objects per row;
+these helpers read values() dicts instead and produce the same representation
+(keys, key order and value types), so FastJSONRenderer writes identical bytes.
+Views pick them when settings.API_FAST_PATH is on and render them with
+core.renderers.FAST_RENDERERS.
+"""
+from collections import defaultdict
+from django.utils import timezone
+
+from metrics.models import MatchMetric
+
+# columns a match row is built from, as values() names
+MATCH_FIELDS = (
+    "id", "competition_id", "season_id", "utc_kickoff", "home_id", "away_id",
+    "venue", "status", "minute", "freshness_ts",
+)
+METRIC_FIELDS = ("match_id", "metric_type__key", "team_id", "period", "value", "source", "confidence")
+
+
+def drf_datetime(value):
+    """A datetime as serializers.DateTimeField renders it: in the current time zone, UTC as Z."""
+    if value is None:
+        return None
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def metric_row(row):
+    """MatchMetricSerializer's representation of a METRIC_FIELDS values() row."""
+    return {
+        "metric_key": row["metric_type__key"],
+        "team": row["team_id"],
+        "period": row["period"],
+        "value": row["value"],
+        "source": row["source"],
+        "confidence": row["confidence"],
+    }
+
+
+def metric_rows(queryset):
+    """`queryset` of MatchMetric as MatchMetricSerializer(many=True) renders it, in its own order."""
+    return [metric_row(row) for row in queryset.values(*METRIC_FIELDS)]
+
+
+def selected_metrics(request, match_ids):
+    """
+    Like matches.serializers.selected_metrics_for, from values() rows: {match id: [metric
+    rows]} for ?metrics=&period=, or None when the request asks for none. The metric keys
+    are matched in the same query, so this is one query instead of two.
+    """
+    metrics_param = request.query_params.get("metrics") if request else None
+    if not metrics_param:
+        return None
+    keys = [k.strip() for k in metrics_param.split(",") if k.strip()]
+    if not keys:
+        return None
+    period = request.query_params.get("period", "FT")
+    rows = (MatchMetric.objects
+            .filter(match_id__in=match_ids, period=period, metric_type__key__in=keys)
+            .order_by("match_id", "team_id", "metric_type__key")
+            .values(*METRIC_FIELDS))
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[row["match_id"]].append(metric_row(row))
+    return grouped
+
+
+def match_rows(request, rows):
+    """MatchSerializer(many=True)'s representation of MATCH_FIELDS values() rows."""
+    rows = list(rows)
+    batch = selected_metrics(request, [row["id"] for row in rows]) or {}
+    return [
+        {
+            "id": str(row["id"]),
+            "competition": row["competition_id"],
+            "season": row["season_id"],
+            "utc_kickoff": drf_datetime(row["utc_kickoff"]),
+            "home": str(row["home_id"]),
+            "away": str(row["away_id"]),
+            "venue": row["venue"],
+            "status": row["status"],
+            "minute": row["minute"],
+            "freshness_ts": drf_datetime(row["freshness_ts"]),
+            "selected_metrics": batch.get(row["id"], []),
+        }
+        for row in rows
+    ]
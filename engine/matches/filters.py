@@ -0,0 +1,44 @@
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+
+def request_timezone(request):
+    """
+    The zone a request's dates are read in: ?tz=<IANA name>, else the caller's
+    UserProfile.timezone, else settings.TIME_ZONE.
+    """
+    name = request.query_params.get("tz")
+    if not name:
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            try:
+                name = user.profile.timezone
+            except ObjectDoesNotExist:
+                name = None
+    if not name:
+        return timezone.get_current_timezone()
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError({"tz": f"Unknown time zone: {name}"})
+
+
+def day_range(value: str, tz):
+    """
+    [start, end) in UTC of calendar day `value` (YYYY-MM-DD) in `tz`, for a plain range
+    filter on utc_kickoff that the kickoff indexes serve. Casting the column to a date
+    instead defeats them. DST days are 23 or 25 hours long.
+    """
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValidationError({"date": "Expected YYYY-MM-DD."})
+    start = datetime.combine(day, time.min, tzinfo=tz)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz)
+    return start.astimezone(ZoneInfo("UTC")), end.astimezone(ZoneInfo("UTC"))
@@ -11,9 +11,15 @@ class MatchStatus(models.TextChoices):
     AET = "AET", "After Extra Time"
     PEN = "PEN", "Penalties"
     POSTPONED = "PPD", "Postponed"
+    SUSPENDED = "SUSP", "Suspended"  # interrupted mid-match; may resume
     ABANDONED = "ABD", "Abandoned"
     CANCELLED = "CANC", "Cancelled"
 
+# statuses after which a match's data no longer changes
+FINISHED_STATUSES = (MatchStatus.FT, MatchStatus.AET, MatchStatus.PEN)
+# statuses the live loop keeps refreshing
+IN_PLAY_STATUSES = (MatchStatus.LIVE, MatchStatus.HT)
+
 class Match(TimeStampedModel):
     competition = models.ForeignKey(Competition, on_delete=models.PROTECT, related_name="matches")
     season = models.ForeignKey(Season, on_delete=models.PROTECT, related_name="matches")
@@ -28,11 +34,13 @@ class Match(TimeStampedModel):
 
     provider_refs = models.JSONField(default=dict, blank=True)  # {"api_football": {"fixture_id": 12345}}
     freshness_ts = models.DateTimeField(null=True, blank=True)  # last time any metric/status was refreshed
+    fingerprint = models.CharField(max_length=32, blank=True)  # hash of the last ingested content; unchanged syncs skip the write
 
     class Meta:
         unique_together = (("season", "home", "away", "utc_kickoff"),)
         indexes = [
-            models.Index(fields=["utc_kickoff"]),
+            # keyset pagination order (matches.pagination); also serves plain kickoff ranges
+            models.Index(fields=["utc_kickoff", "id"]),
             models.Index(fields=["competition", "utc_kickoff"]),
             models.Index(fields=["status", "utc_kickoff"]),
         ]
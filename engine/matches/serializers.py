@@ -1,8 +1,49 @@
+from collections import defaultdict
 from rest_framework import serializers
 from .models import Match
 from metrics.models import MatchMetric, MetricType
 from metrics.serializers import MatchMetricSerializer
 
+
+def selected_metrics_for(request, matches):
+    """
+    {match id: serialized metrics} for ?metrics=corners,cards_total[&period=FT], loaded
+    for every match in `matches` with one MetricType lookup and one MatchMetric query.
+    None when the request asks for no metrics.
+    """
+    metrics_param = request.query_params.get("metrics") if request else None
+    if not metrics_param:
+        return None
+
+    keys = [k.strip() for k in metrics_param.split(",") if k.strip()]
+    period = request.query_params.get("period", "FT")
+    if not keys:
+        return None
+
+    # Map keys → MetricType ids (bulk)
+    type_ids = list(MetricType.objects.filter(key__in=keys).values_list("id", flat=True))
+    if not type_ids:
+        return {}
+
+    rows = (MatchMetric.objects
+            .select_related("metric_type")
+            .filter(match__in=[m.pk for m in matches], period=period, metric_type_id__in=type_ids)
+            .order_by("match_id", "team_id", "metric_type__key"))
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[row.match_id].append(row)
+    return {match_id: MatchMetricSerializer(group, many=True).data for match_id, group in grouped.items()}
+
+
+class MatchListSerializer(serializers.ListSerializer):
+    """Loads the selected metrics for the whole page up front and hands them to each row via the context."""
+
+    def to_representation(self, data):
+        matches = list(data.all() if hasattr(data, "all") else data)
+        self.context["selected_metrics"] = selected_metrics_for(self.context.get("request"), matches)
+        return super().to_representation(matches)
+
+
 class MatchSerializer(serializers.ModelSerializer):
     home = serializers.UUIDField(source="home_id", read_only=True)
     away = serializers.UUIDField(source="away_id", read_only=True)
@@ -15,34 +56,18 @@ class MatchSerializer(serializers.ModelSerializer):
             "home", "away", "venue", "status", "minute",
             "freshness_ts", "selected_metrics",
         ]
+        list_serializer_class = MatchListSerializer
 
     def get_selected_metrics(self, obj):
         """
         If the request has ?metrics=corners,cards_total[&period=FT],
         embed only those metrics for this match. Otherwise return [].
+        Lists read them from the batch MatchListSerializer loaded.
         """
-        request = self.context.get("request")
-        if not request:
+        if "selected_metrics" in self.context:
+            batch = self.context["selected_metrics"]
+        else:
+            batch = selected_metrics_for(self.context.get("request"), [obj])
+        if not batch:
             return []
-
-        metrics_param = request.query_params.get("metrics")
-        if not metrics_param:
-            return []
-
-        keys = [k.strip() for k in metrics_param.split(",") if k.strip()]
-        period = request.query_params.get("period", "FT")
-
-        if not keys:
-            return []
-
-        # Map keys → MetricType ids (bulk)
-        type_map = dict(MetricType.objects.filter(key__in=keys).values_list("key", "id"))
-        if not type_map:
-            return []
-
-        # Fetch metrics for this match in one query
-        rows = (MatchMetric.objects
-                .select_related("metric_type")
-                .filter(match=obj, period=period, metric_type_id__in=type_map.values())
-                .order_by("team_id"))
-        return MatchMetricSerializer(rows, many=True).data
\ No newline at end of file
+        return batch.get(obj.pk, [])
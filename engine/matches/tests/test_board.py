@@ -0,0 +1,64 @@
+from datetime import datetime, timezone as dt_timezone
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from ..models import Match, MatchStatus
+from competitions.models import Competition, Season
+from teams.models import Team
+from metrics.models import MetricType, MatchMetric
+from users.models import UserProfile
+
+User = get_user_model()
+
+
+class BoardViewTests(APITestCase):
+    def setUp(self):
+        caches["responses"].clear()
+        comp = Competition.objects.create(name="EPL", country="England")
+        season = Season.objects.create(competition=comp, name="2024/25", year_start=2024, year_end=2025)
+        self.teams = [Team.objects.create(name=f"T{i}", country="England") for i in range(4)]
+        kickoff = datetime(2030, 5, 10, 14, 0, tzinfo=dt_timezone.utc)
+        self.m1 = Match.objects.create(competition=comp, season=season, home=self.teams[0], away=self.teams[1],
+                                       utc_kickoff=kickoff, status=MatchStatus.FT)
+        self.m2 = Match.objects.create(competition=comp, season=season, home=self.teams[2], away=self.teams[3],
+                                       utc_kickoff=kickoff.replace(hour=16), status=MatchStatus.LIVE, minute=60)
+        corners, _ = MetricType.objects.get_or_create(key="corners", defaults=dict(unit="count", display_name="Corners"))
+        cards, _ = MetricType.objects.get_or_create(key="cards_total", defaults=dict(unit="count", display_name="Cards"))
+        for team, mt, value in ((self.teams[0], corners, 6), (self.teams[1], corners, 4), (self.teams[1], cards, 2)):
+            MatchMetric.objects.create(match=self.m1, team=team, metric_type=mt, period="FT", value=value)
+        MatchMetric.objects.create(match=self.m1, team=self.teams[0], metric_type=corners, period="1H", value=3)
+        self.url = reverse("board")
+
+    def test_pivots_metrics_into_home_and_away_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            body = self.client.get(self.url, {"date": "2030-05-10", "metrics": "corners,cards_total"}).json()
+        # the data-version read and the board statement
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertEqual(body["count"], 2)
+        columns = body["columns"]
+        self.assertEqual(list(columns), [
+            "id", "utc_kickoff", "competition", "home", "away", "status", "minute",
+            "corners_home", "corners_away", "cards_total_home", "cards_total_away",
+        ])
+        self.assertEqual(columns["id"], [str(self.m1.id), str(self.m2.id)])
+        self.assertEqual(columns["corners_home"], [6, None])
+        self.assertEqual(columns["corners_away"], [4, None])
+        self.assertEqual(columns["cards_total_home"], [None, None])
+        self.assertEqual(columns["cards_total_away"], [2, None])
+
+    def test_period_status_and_profile_defaults(self):
+        body = self.client.get(self.url, {"date": "2030-05-10", "metrics": "corners", "period": "1H", "status": "FT"}).json()
+        self.assertEqual(body["columns"]["corners_home"], [3])
+
+        user = User.objects.create_user("board-user", password="x")
+        UserProfile.objects.create(user=user, default_metric_keys=["cards_total"])
+        self.client.force_authenticate(user)
+        body = self.client.get(self.url, {"date": "2030-05-10"}).json()
+        self.assertEqual(body["metrics"], ["cards_total"])
+
+    def test_requires_a_date(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
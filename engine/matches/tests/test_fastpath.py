@@ -0,0 +1,84 @@
+from contextlib import nullcontext
+from unittest import mock
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from ..models import Match, MatchStatus
+from core.renderers import FastJSONRenderer
+from competitions.models import Competition, Season
+from teams.models import Team
+from metrics.models import MetricType, MatchMetric
+
+
+class FastPathParityTests(APITestCase):
+    """The values() path and FastJSONRenderer must produce the serializers' JSONRenderer bytes, byte for byte."""
+
+    def setUp(self):
+        comp = Competition.objects.create(name="EPL", country="England")
+        season = Season.objects.create(competition=comp, name="2024/25", year_start=2024, year_end=2025)
+        self.home = Team.objects.create(name="Arsenal", country="England")
+        self.away = Team.objects.create(name="Chelsea", country="England")
+        kickoff = timezone.now().replace(hour=15, minute=0, second=0, microsecond=0)
+        self.m1 = Match.objects.create(
+            competition=comp, season=season, utc_kickoff=kickoff,
+            home=self.home, away=self.away, status=MatchStatus.FT,
+            venue="Emirates  Stadium", freshness_ts=timezone.now(),
+        )
+        self.m2 = Match.objects.create(
+            competition=comp, season=season, utc_kickoff=kickoff + timezone.timedelta(days=1),
+            home=self.away, away=self.home, status=MatchStatus.LIVE, minute=61,
+        )
+        corners = MetricType.objects.get_or_create(key="corners")[0]
+        cards = MetricType.objects.get_or_create(key="cards_total")[0]
+        for match in (self.m1, self.m2):
+            for team, value in ((self.home, 5), (self.away, 2.5)):
+                MatchMetric.objects.create(match=match, team=team, metric_type=corners, value=value, source="api")
+                MatchMetric.objects.create(
+                    match=match, team=team, metric_type=cards, value=1, confidence=0.75, source="api",
+                )
+            MatchMetric.objects.create(match=match, team=self.home, metric_type=corners, period="HT", value=3)
+
+    def both_paths(self, url, params=None):
+        bodies = []
+        for fast in (False, True):
+            caches["responses"].clear()
+            # the slow path is the serializers rendered by DRF's own JSONRenderer
+            renderer = nullcontext() if fast else mock.patch.object(FastJSONRenderer, "render", JSONRenderer.render)
+            with override_settings(API_FAST_PATH=fast), renderer:
+                resp = self.client.get(url, params or {})
+            self.assertEqual(resp.status_code, 200)
+            bodies.append(resp.content)
+        return bodies
+
+    def test_list_matches_serializer_output(self):
+        slow, fast = self.both_paths(reverse("matches-list"))
+        self.assertEqual(fast, slow)
+
+    def test_list_with_selected_metrics_and_cursor(self):
+        url = reverse("matches-list")
+        slow, fast = self.both_paths(url, {"metrics": "corners,cards_total,unknown", "limit": 1})
+        self.assertEqual(fast, slow)
+        self.assertIn(b'"metric_key":"cards_total"', fast)
+
+        slow, fast = self.both_paths(url, {"metrics": "corners", "period": "HT", "count": "exact"})
+        self.assertEqual(fast, slow)
+
+    def test_metrics_action_matches_serializer_output(self):
+        slow, fast = self.both_paths(reverse("matches-metrics", args=[self.m1.pk]))
+        self.assertEqual(fast, slow)
+        self.assertIn(b'"confidence":0.75', fast)
+
+    def test_floats_in_exponent_form_match_serializer_output(self):
+        for key, value in (("xg_tiny", 1e-07), ("xg_huge", 1.5e20), ("xg_small", 0.00001)):
+            MatchMetric.objects.create(
+                match=self.m1, team=self.home, metric_type=MetricType.objects.create(key=key),
+                value=value, source="api",
+            )
+        slow, fast = self.both_paths(reverse("matches-metrics", args=[self.m1.pk]))
+        self.assertEqual(fast, slow)
+        self.assertIn(b'"value":1e-07', fast)
+        self.assertIn(b'"value":1.5e+20', fast)
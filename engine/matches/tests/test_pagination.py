@@ -0,0 +1,68 @@
+import base64
+import json
+from django.core.cache import caches
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from ..models import Match, MatchStatus
+from competitions.models import Competition, Season
+from teams.models import Team
+
+
+class KickoffCursorPaginationTests(APITestCase):
+    def setUp(self):
+        caches["responses"].clear()
+        comp = Competition.objects.create(name="EPL", country="England")
+        season = Season.objects.create(competition=comp, name="2024/25", year_start=2024, year_end=2025)
+        teams = [Team.objects.create(name=f"T{i}", country="England") for i in range(10)]
+        kickoff = timezone.now().replace(microsecond=0)
+        # five matches share a kickoff, so ties must be broken on id
+        self.matches = [
+            Match.objects.create(
+                competition=comp, season=season, home=teams[i], away=teams[i + 5],
+                utc_kickoff=kickoff + timezone.timedelta(days=i // 5), status=MatchStatus.SCHEDULED,
+            )
+            for i in range(5)
+        ] + [
+            Match.objects.create(
+                competition=comp, season=season, home=teams[i + 5], away=teams[i],
+                utc_kickoff=kickoff + timezone.timedelta(days=1), status=MatchStatus.SCHEDULED,
+            )
+            for i in range(2)
+        ]
+        self.expected = [str(m.id) for m in sorted(self.matches, key=lambda m: (m.utc_kickoff, str(m.id)))]
+
+    def walk(self, url, key):
+        seen, pages = [], 0
+        while url:
+            body = self.client.get(url).json()
+            seen.extend(r["id"] for r in body["results"])
+            url = body[key]
+            pages += 1
+        return seen, pages, body
+
+    def test_walks_forward_and_back_without_gaps(self):
+        forward, pages, last = self.walk(reverse("matches-list") + "?limit=2", "next")
+        self.assertEqual(forward, self.expected)
+        self.assertEqual(pages, 4)
+        self.assertNotIn("count", last)
+
+        back = self.client.get(last["previous"]).json()
+        self.assertEqual([r["id"] for r in back["results"]], self.expected[4:6])
+        backward, _, _ = self.walk(back["previous"], "previous")
+        self.assertEqual(backward, self.expected[2:4] + self.expected[:2])
+
+    def test_counts_are_opt_in(self):
+        url = reverse("matches-list")
+        self.assertEqual(self.client.get(url, {"count": "exact"}).json()["count"], 7)
+        self.assertIsInstance(self.client.get(url, {"count": "estimate"}).json()["count"], int)
+
+    def test_invalid_cursor_is_404(self):
+        self.assertEqual(self.client.get(reverse("matches-list"), {"cursor": "bogus"}).status_code, 404)
+
+    def test_cursor_with_a_bad_id_is_404(self):
+        for pk in ("not-a-uuid", 42):
+            data = json.dumps({"k": "2025-01-01T00:00:00+00:00", "i": pk}).encode()
+            cursor = base64.urlsafe_b64encode(data).decode()
+            self.assertEqual(self.client.get(reverse("matches-list"), {"cursor": cursor}).status_code, 404)
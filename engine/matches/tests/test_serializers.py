@@ -27,3 +27,18 @@ class MatchSerializerTests(TestCase):
             match=self.match, team=home, metric_type=mt, period="FT",
             defaults=dict(value=5, source="test"),
         )
+
+    def test_selected_metrics_for_a_single_match(self):
+        request = self.factory.get("/api/v1/matches/", {"metrics": "corners"})
+        request.query_params = request.GET
+        data = MatchSerializer(self.match, context={"request": request}).data
+        self.assertEqual([(m["metric_key"], m["value"]) for m in data["selected_metrics"]], [("corners", 5)])
+
+    def test_list_loads_metrics_for_the_page_at_once(self):
+        request = self.factory.get("/api/v1/matches/", {"metrics": "corners,unknown"})
+        request.query_params = request.GET
+        matches = Match.objects.all()
+        # the match list, the metric types and the metrics
+        with self.assertNumQueries(3):
+            data = MatchSerializer(matches, many=True, context={"request": request}).data
+        self.assertEqual(len(data[0]["selected_metrics"]), 1)
@@ -1,17 +1,32 @@
+import gzip
+import time
+from unittest import skipIf
+from datetime import timezone as dt_timezone
 from uuid import uuid4
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework.test import APITestCase
 
 from ..models import Match, MatchStatus
+from core import renderers
 from competitions.models import Competition, Season
 from teams.models import Team
 from metrics.models import MetricType, MatchMetric
+from users.models import UserProfile
+
+User = get_user_model()
 
 
 
 class MatchViewSetTests(APITestCase):
     def setUp(self):
+        # cached payloads are keyed by data versions, which restart with every test
+        caches["responses"].clear()
         # Core refs
         self.comp = Competition.objects.create(name="EPL", country="England")
         self.season = Season.objects.create(
@@ -72,3 +87,123 @@ class MatchViewSetTests(APITestCase):
             match=self.m1, team=self.away, metric_type=self.mt_cards, period="FT",
             defaults=dict(value=3, source="test"),
         )
+
+    def test_list_embeds_selected_metrics(self):
+        resp = self.client.get(reverse("matches-list"), {"metrics": "corners,cards_total"})
+        self.assertEqual(resp.status_code, 200)
+        by_id = {row["id"]: row["selected_metrics"] for row in resp.json()["results"]}
+        self.assertEqual(len(by_id[str(self.m1.id)]), 4)
+        self.assertEqual(by_id[str(self.m2.id)], [])
+
+    def test_list_metric_queries_do_not_grow_with_page_size(self):
+        def queries(limit):
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(reverse("matches-list"), {"metrics": "corners,cards_total", "limit": limit})
+            return len(ctx.captured_queries)
+
+        self.assertEqual(queries(1), queries(3))
+
+    def test_revalidation_short_circuits_with_304(self):
+        url = reverse("matches-list")
+        first = self.client.get(url, {"date": self.kickoff_day1.date().isoformat()})
+        etag = first["ETag"]
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(
+                url, {"date": self.kickoff_day1.date().isoformat()}, HTTP_IF_NONE_MATCH=f'W/"{etag}"',
+            )
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp["ETag"], etag)
+        # only the MAX(updated_at) validator query
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        resp = self.client.get(url, {"date": self.kickoff_day1.date().isoformat()}, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(resp.status_code, 200)
+
+    def test_retrieve_honours_if_modified_since(self):
+        url = reverse("matches-detail", args=[self.m1.id])
+        last_modified = self.client.get(url)["Last-Modified"]
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        an_hour_ago = http_date(time.time() - 3600)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=an_hour_ago).status_code, 200)
+
+    def test_etag_follows_the_data_version(self):
+        url = reverse("matches-list")
+        params = {"date": timezone.localdate(self.kickoff_day2).isoformat()}
+        etag = self.client.get(url, params)["ETag"]
+
+        # a write to a match on another day leaves this day's version alone
+        self.m1.minute = 10
+        self.m1.save()
+        self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.m3.status = MatchStatus.POSTPONED
+        self.m3.save()
+        resp = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_list_is_served_from_the_response_cache_until_a_write(self):
+        url = reverse("matches-list")
+        params = {"date": timezone.localdate(self.kickoff_day1).isoformat(), "status": "FT,LIVE"}
+        first = self.client.get(url, params).json()
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.client.get(url, {**params, "status": "LIVE,FT"}).json()
+        self.assertEqual(again, first)
+        # only the data-version read
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        self.m2.minute = 80
+        self.m2.save()
+        rows = {r["id"]: r for r in self.client.get(url, params).json()["results"]}
+        self.assertEqual(rows[str(self.m2.id)]["minute"], 80)
+
+    def test_metrics_endpoint(self):
+        url = reverse("matches-metrics", args=[self.m1.id])
+        self.assertEqual(len(self.client.get(url).json()), 4)
+        self.assertEqual(self.client.get(reverse("matches-metrics", args=["not-a-uuid"])).status_code, 404)
+
+    def test_date_is_a_day_in_the_callers_time_zone(self):
+        # 23:30 UTC on the 10th is already the 11th in Lagos (UTC+1)
+        late = Match.objects.create(
+            competition=self.comp, season=self.season, home=self.away, away=self.away2,
+            utc_kickoff=timezone.datetime(2030, 5, 10, 23, 30, tzinfo=dt_timezone.utc),
+        )
+        url = reverse("matches-list")
+
+        def ids(**params):
+            return [r["id"] for r in self.client.get(url, params).json()["results"]]
+
+        self.assertEqual(ids(date="2030-05-11"), [str(late.id)])
+        self.assertEqual(ids(date="2030-05-10", tz="UTC"), [str(late.id)])
+        self.assertEqual(ids(date="2030-05-11", tz="UTC"), [])
+
+        user = User.objects.create_user("tz-user", password="x")
+        UserProfile.objects.create(user=user, timezone="America/New_York")
+        self.client.force_authenticate(user)
+        self.assertEqual(ids(date="2030-05-10"), [str(late.id)])
+
+        self.assertEqual(self.client.get(url, {"date": "2030-05-10", "tz": "Mars/Olympus"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"date": "10/05/2030"}).status_code, 400)
+
+    def test_list_is_gzipped_when_accepted(self):
+        url = reverse("matches-list")
+        plain = self.client.get(url, {"metrics": "corners,cards_total"})
+        resp = self.client.get(url, {"metrics": "corners,cards_total"}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(resp.content), plain.content)
+        self.assertIn("Accept-Encoding", resp["Vary"])
+        # the weak ETag still revalidates
+        resp = self.client.get(
+            url, {"metrics": "corners,cards_total"}, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=resp["ETag"],
+        )
+        self.assertEqual(resp.status_code, 304)
+
+    @skipIf(renderers.msgpack is None, "msgpack is not installed")
+    def test_metrics_as_msgpack(self):
+        url = reverse("matches-metrics", args=[self.m1.id])
+        as_json = self.client.get(url)
+        resp = self.client.get(url, HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(resp["Content-Type"], "application/msgpack")
+        self.assertEqual(renderers.msgpack.unpackb(resp.content, raw=False), as_json.json())
+        self.assertIn("Accept", resp["Vary"])
+        self.assertNotEqual(resp["ETag"], as_json["ETag"])
@@ -1,25 +1,43 @@
+import uuid
+from django.conf import settings
+from django.http import Http404
+from django.core.exceptions import ObjectDoesNotExist
 from rest_framework.decorators import action
 from rest_framework import viewsets, mixins
-from .models import Match
+from rest_framework.exceptions import ValidationError
+from rest_framework.views import APIView
+from . import fastpath
+from .board import MAX_BOARD_METRICS, board_queryset, columnar
+from .filters import day_range, request_timezone
+from .models import Match, FINISHED_STATUSES, IN_PLAY_STATUSES
+from .pagination import KickoffCursorPagination
 from .serializers import MatchSerializer
 from metrics.models import MatchMetric
 from rest_framework.response import Response
 from metrics.serializers import MatchMetricSerializer
 from core.http import ConditionalHeadersMixin
+from core.renderers import BINARY_RENDERERS, FAST_RENDERERS, BinaryRenderersMixin
+from core.responsecache import CachedPayloadMixin
+from core.versions import ALL_MATCHES, date_scopes
 
 
-class MatchViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet, ConditionalHeadersMixin):
+class MatchViewSet(BinaryRenderersMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                   viewsets.GenericViewSet, ConditionalHeadersMixin, CachedPayloadMixin):
     serializer_class = MatchSerializer
+    pagination_class = KickoffCursorPagination
+    renderer_classes = [*FAST_RENDERERS, *BINARY_RENDERERS]
+    payload_cache_prefix = "matches"
+    payload_set_params = ("metrics", "status")
 
     def get_queryset(self):
         qs = (Match.objects
               .select_related("competition", "season")
-              .order_by("utc_kickoff"))
+              .order_by("utc_kickoff", "id"))
 
-        # Filters: ?date=YYYY-MM-DD
-        date = self.request.query_params.get("date")
-        if date:
-            qs = qs.filter(utc_kickoff__date=date)
+        # Filters: ?date=YYYY-MM-DD[&tz=Area/City], a calendar day in the caller's time zone
+        day = self.kickoff_range()
+        if day:
+            qs = qs.filter(utc_kickoff__gte=day[0], utc_kickoff__lt=day[1])
 
         # ?competition=<uuid>
         comp = self.request.query_params.get("competition")
@@ -33,24 +51,169 @@ class MatchViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.Ge
             qs = qs.filter(status__in=statuses)
 
         return qs
+
+    def kickoff_range(self):
+        """[start, end) of ?date= in the caller's time zone (see matches.filters), or None."""
+        if not hasattr(self, "_kickoff_range"):
+            date = self.request.query_params.get("date")
+            self._kickoff_range = day_range(date, self.caller_timezone()) if date else None
+        return self._kickoff_range
+
+    def caller_timezone(self):
+        if not hasattr(self, "_timezone"):
+            self._timezone = request_timezone(self.request)
+        return self._timezone
+
+    def version_scopes(self):
+        """The data-version scopes (core.versions) that cover every row this request can return."""
+        if self.kwargs.get("pk"):
+            return {f"match:{self.kwargs['pk']}"}
+        # the narrowest filter wins: any write to a row it matches bumps that scope
+        day = self.kickoff_range()
+        if day:
+            return date_scopes(*day)
+        comp = self.request.query_params.get("competition")
+        if comp:
+            return {f"competition:{comp}"}
+        return {ALL_MATCHES}
     
+    def vary(self) -> str:
+        # a profile time zone shapes ?date= results without showing in the URL
+        return str(self.caller_timezone()) if self.request.query_params.get("date") else ""
+
+    def _match_pk(self):
+        try:
+            return uuid.UUID(str(self.kwargs["pk"]))
+        except ValueError:
+            raise Http404
+
     def list(self, request, *args, **kwargs):
-        response = super().list(request, *args, **kwargs)
+        # validators first: a revalidating client gets its 304 before the page query runs
         qs = self.get_queryset()
-        return self.set_conditional_headers(request, response, qs)
+        validators = self.conditional_validators(request, qs, self.version_scopes(), self.vary())
+        not_modified = self.not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        def compute():
+            if settings.API_FAST_PATH:
+                page = self.paginate_queryset(qs.values(*fastpath.MATCH_FIELDS))
+                data = self.get_paginated_response(fastpath.match_rows(request, page)).data
+            else:
+                data = super(MatchViewSet, self).list(request, *args, **kwargs).data
+            rows = data["results"] if isinstance(data, dict) else data
+            return data, board_ttl(row["status"] for row in rows)
+
+        response = Response(self.cached_payload(request, validators, compute, self.vary()))
+        return self.set_conditional_headers(request, response, qs, validators)
 
     def retrieve(self, request, *args, **kwargs):
-        response = super().retrieve(request, *args, **kwargs)
         # for retrieve, use a QS limited to that object to compute headers
-        obj_qs = self.get_queryset().filter(pk=kwargs["pk"])
-        return self.set_conditional_headers(request, response, obj_qs)
+        obj_qs = self.get_queryset().filter(pk=self._match_pk())
+        validators = self.conditional_validators(request, obj_qs, self.version_scopes())
+        # no timestamp means no such match: let retrieve() answer 404
+        not_modified = self.not_modified_response(request, validators) if validators.last_modified else None
+        if not_modified is not None:
+            return not_modified
+
+        def compute():
+            data = super(MatchViewSet, self).retrieve(request, *args, **kwargs).data
+            return data, board_ttl([data["status"]])
+
+        response = Response(self.cached_payload(request, validators, compute, self.vary()))
+        return self.set_conditional_headers(request, response, obj_qs, validators)
     
     @action(detail=True, methods=["get"], url_path="metrics")
     def metrics(self, request, pk=None):
         """GET /api/v1/matches/{id}/metrics?period=FT"""
         period = request.query_params.get("period", "FT")
-        qs = (MatchMetric.objects
-              .select_related("metric_type")
-              .filter(match_id=pk, period=period)
-              .order_by("team_id", "metric_type__key"))
-        return Response(MatchMetricSerializer(qs, many=True).data)
+        match_qs = Match.objects.filter(pk=self._match_pk())
+        validators = self.conditional_validators(request, match_qs, self.version_scopes())
+
+        def compute():
+            qs = (MatchMetric.objects
+                  .select_related("metric_type")
+                  .filter(match_id=pk, period=period)
+                  .order_by("team_id", "metric_type__key"))
+            data = fastpath.metric_rows(qs) if settings.API_FAST_PATH else MatchMetricSerializer(qs, many=True).data
+            return data, board_ttl(match_qs.values_list("status", flat=True))
+
+        return Response(self.cached_payload(request, validators, compute, self.vary()))
+
+
+class BoardView(BinaryRenderersMixin, APIView, ConditionalHeadersMixin, CachedPayloadMixin):
+    """
+    GET /api/v1/board?date=YYYY-MM-DD[&tz=][&metrics=corners,cards_total][&period=FT]
+                     [&competition=][&status=]
+
+    The day's matches with the selected metrics pivoted into home/away columns, in
+    one SQL statement (see matches.board) and returned column-wise:
+        {"date", "tz", "period", "metrics", "count", "columns": {"id": [...], ...,
+         "corners_home": [...], "corners_away": [...]}}
+    Without ?metrics= the caller's UserProfile.default_metric_keys are used.
+    """
+    payload_cache_prefix = "board"
+    payload_set_params = ("status",)
+
+    def metric_keys(self, request):
+        param = request.query_params.get("metrics")
+        if param is not None:
+            keys = [k.strip() for k in param.split(",") if k.strip()]
+        else:
+            keys = []
+            if request.user.is_authenticated:
+                try:
+                    keys = list(request.user.profile.default_metric_keys or [])
+                except ObjectDoesNotExist:
+                    pass
+        # keep the first occurrence of each key; the column order follows the request
+        keys = list(dict.fromkeys(keys))
+        if len(keys) > MAX_BOARD_METRICS:
+            raise ValidationError({"metrics": f"At most {MAX_BOARD_METRICS} metric keys."})
+        return keys
+
+    def get(self, request):
+        date = request.query_params.get("date")
+        if not date:
+            raise ValidationError({"date": "This parameter is required."})
+        tz = request_timezone(request)
+        start, end = day_range(date, tz)
+        keys = self.metric_keys(request)
+        period = request.query_params.get("period", "FT")
+        status = request.query_params.get("status")
+        statuses = [s.strip() for s in status.split(",") if s.strip()] if status else None
+        qs = board_queryset(start, end, keys, period, request.query_params.get("competition"), statuses)
+
+        # the zone and profile metrics shape the board without showing in the URL
+        vary = f"{tz}|{','.join(keys)}"
+        validators = self.conditional_validators(
+            request, Match.objects.filter(utc_kickoff__gte=start, utc_kickoff__lt=end), date_scopes(start, end), vary,
+        )
+        not_modified = self.not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        def compute():
+            columns = columnar(qs, keys)
+            payload = {
+                "date": date, "tz": str(tz), "period": period, "metrics": keys,
+                "count": len(columns["id"]), "columns": columns,
+            }
+            return payload, board_ttl(columns["status"])
+
+        response = Response(self.cached_payload(request, validators, compute, vary))
+        return self.set_conditional_headers(request, response, None, validators)
+
+
+def board_ttl(statuses):
+    """
+    Response-cache TTL (settings.RESPONSE_CACHE_TTLS) for a payload holding matches in
+    `statuses`: the shortest that applies, so one live match keeps a page short-lived.
+    """
+    ttls = settings.RESPONSE_CACHE_TTLS
+    statuses = set(statuses)
+    if statuses & set(IN_PLAY_STATUSES):
+        return ttls["live"]
+    if statuses and statuses <= set(FINISHED_STATUSES):
+        return ttls["finished"]
+    return ttls["scheduled"]
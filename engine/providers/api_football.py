@@ -1,29 +1,41 @@
 import os
-import time
+import math
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from django.conf import settings
 
-from .base import ProviderAdapter, RateLimitError, ProviderError
+from .base import CircuitOpenError, ProviderAdapter, RateLimitError, ProviderError
+from .archive import RawArchive
+from .breaker import ProviderCircuitBreaker
+from .cache import ResponseCache
+from .ratelimit import ProviderRateLimiter
+from .stream import iter_raw_items, loads
 
 logger = logging.getLogger(__name__)
 
 API_FOOTBALL_KEY = os.getenv("API_FOOTBALL_KEY")
 API_FOOTBALL_BASE = os.getenv("API_FOOTBALL_BASE", "https://v3.football.api-sports.io")
+# bytes read per step when streaming a response body
+STREAM_CHUNK_SIZE = 64 * 1024
 
-def _build_session(retries=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504)):
+def _build_session(retries=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504), pool_maxsize=10):
     s = requests.Session()
     retry = Retry(
         total=retries,
         backoff_factor=backoff_factor,
+        # no 429: a retry here would bypass the shared token bucket and sleep in the
+        # worker; _send turns it into limiter.backoff + RateLimitError for a countdown retry
         status_forcelist=status_forcelist,
         allowed_methods=frozenset(["GET", "POST"]),
         raise_on_status=False,
-        respect_retry_after_header=False  # we'll handle 429 Retry-After manually
+        respect_retry_after_header=False
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(max_retries=retry, pool_maxsize=pool_maxsize)
     s.mount("https://", adapter)
     s.mount("http://", adapter)
     return s
@@ -31,24 +43,102 @@ def _build_session(retries=3, backoff_factor=0.5, status_forcelist=(429, 500, 50
 class APIFootballAdapter(ProviderAdapter):
     name = "api_football"
 
-    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, pool_maxsize: int = 10):
         super().__init__(api_key or API_FOOTBALL_KEY, base_url or API_FOOTBALL_BASE)
         if not self.api_key:
             raise ProviderError("API_FOOTBALL_KEY not configured")
-        self.session = _build_session()
+        # one pooled connection per concurrent caller (see tasks.hydrate_matches_stats)
+        self.session = _build_session(pool_maxsize=pool_maxsize)
+        self.limiter = ProviderRateLimiter(self.name)
+        self.breaker = ProviderCircuitBreaker(self.name)
+        self.response_cache = ResponseCache(self.name)
+        # provider-reported budget from the last network response (see _track_quota)
+        self.quota: Dict[str, Optional[int]] = {}
+        archive_root = getattr(settings, "PROVIDER_ARCHIVE_ROOT", None)
+        self.archive = RawArchive(archive_root, self.name) if archive_root else None
         # Headers for RapidAPI or native API; adjust if using vendor endpoint
         self.session.headers.update({
             "x-apisports-key": self.api_key,
             "Accept": "application/json",
         })
 
-    def _request(self, path: str, params: Dict[str, Any] = None, timeout: int = 10):
+    @staticmethod
+    def _validators(cached: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Conditional request headers revalidating a stale cache entry, when it has validators."""
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def _request(self, path: str, params: Dict[str, Any] = None, timeout: int = 10, cache_as: str = None):
+        """
+        GET `path` and unwrap the provider envelope. `cache_as` picks the response-cache
+        TTL class (defaults to the path); fresh hits never reach the network or the limiter,
+        and a stale copy is served while the endpoint's circuit is open.
+        """
         url = f"{self.base_url.rstrip('/')}/{path.lstrip('/')}"
+        cache_as = cache_as or path.strip("/")
+        cache_key = self.response_cache.key(path, params)
+        cached = self.response_cache.get(cache_key)
+        if cached and self.response_cache.is_fresh(cached):
+            self.response_cache.record(cache_as, "hit")
+            return cached["data"]
+
+        # revalidate a stale copy when we hold validators for it
+        headers = self._validators(cached)
+
+        try:
+            resp = self._send(path, url, params, timeout, headers)
+        except CircuitOpenError:
+            # provider is down: a stale copy beats no answer
+            if not cached:
+                raise
+            self.response_cache.record(cache_as, "stale")
+            return cached["data"]
+
+        if resp.status_code == 304 and cached:
+            self.response_cache.record(cache_as, "revalidated")
+            self.response_cache.store(cache_key, cache_as, cached["data"], cached.get("etag"), cached.get("last_modified"))
+            return cached["data"]
+
+        data = resp.json()
+        # provider-specific envelope: often {"response": [...]}
+        data = data.get("response", data)
+        self._archive(path, params, data)
+        self.response_cache.record(cache_as, "miss")
+        self.response_cache.store(
+            cache_key, cache_as, data, resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+        )
+        return data
+
+    def _send(self, path: str, url: str, params: Dict[str, Any], timeout: int, headers: Dict[str, str] = None,
+              stream: bool = False) -> requests.Response:
+        """
+        Rate-limited GET behind the endpoint's circuit breaker; raises CircuitOpenError while
+        the circuit is open, RateLimitError on a local or upstream limit and ProviderError
+        on failures. Network errors, 5xx responses and slow calls count against the circuit.
+        """
+        wait = self.breaker.allow(path)
+        if wait:
+            raise CircuitOpenError(f"API-Football {path.strip('/')} circuit open", retry_after=math.ceil(wait))
+
+        # take a token from the shared bucket; never sleep in the worker
+        wait = self.limiter.acquire(path)
+        if wait:
+            raise RateLimitError("Local API-Football budget exhausted", retry_after=math.ceil(wait))
+
+        started = time.monotonic()
         try:
-            resp = self.session.get(url, params=params, timeout=timeout)
+            resp = self.session.get(url, params=params, timeout=timeout, headers=headers or None, stream=stream)
         except requests.RequestException as e:
+            self.breaker.record(path, ok=False)
             logger.exception("Network error talking to API-Football")
             raise ProviderError(str(e))
+        self.breaker.record(path, ok=resp.status_code < 500, elapsed=time.monotonic() - started)
+
+        self._track_quota(resp.headers)
 
         # handle 429 specially using Retry-After if present
         if resp.status_code == 429:
@@ -60,33 +150,135 @@ class APIFootballAdapter(ProviderAdapter):
                     sleep = 5
             else:
                 sleep = 5
-            logger.warning("API-Football rate limited; sleeping %s seconds", sleep)
-            time.sleep(sleep)
-            raise RateLimitError("Rate limited by API-Football")
+            logger.warning("API-Football rate limited; backing off %s seconds", sleep)
+            self.limiter.backoff(path, sleep)
+            raise RateLimitError("Rate limited by API-Football", retry_after=sleep)
 
         if not resp.ok:
             logger.error("API-Football returned %s: %s", resp.status_code, resp.text[:500])
             raise ProviderError(f"status {resp.status_code}")
+        return resp
 
-        data = resp.json()
-        # provider-specific envelope: often {"response": [...]}
-        return data.get("response", data)
+    def _stream(self, path: str, params: Dict[str, Any] = None, timeout: int = 30, cache_as: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        Like _request for list endpoints, but the body is read in chunks and the
+        `response` array is yielded one decoded item at a time, so memory stays flat
+        however large the response. Caching works as in _request (fresh hits, stale copies
+        revalidated with their validators or served while the circuit is open); a body is
+        stored in the response cache once it has been read to the end, so only responses
+        of a cached class are kept in memory. The request itself (and any rate-limit
+        error) happens before this returns.
+        """
+        url = f"{self.base_url.rstrip('/')}/{path.lstrip('/')}"
+        cache_as = cache_as or path.strip("/")
+        cache_key = self.response_cache.key(path, params)
+        cached = self.response_cache.get(cache_key)
+        if cached and self.response_cache.is_fresh(cached):
+            self.response_cache.record(cache_as, "hit")
+            return iter(cached["data"] if isinstance(cached["data"], list) else [])
+
+        try:
+            resp = self._send(path, url, params, timeout, self._validators(cached), stream=True)
+        except CircuitOpenError:
+            if not cached:
+                raise
+            self.response_cache.record(cache_as, "stale")
+            return iter(cached["data"] if isinstance(cached["data"], list) else [])
+
+        if resp.status_code == 304 and cached:
+            resp.close()
+            self.response_cache.record(cache_as, "revalidated")
+            self.response_cache.store(cache_key, cache_as, cached["data"], cached.get("etag"), cached.get("last_modified"))
+            return iter(cached["data"] if isinstance(cached["data"], list) else [])
+
+        self.response_cache.record(cache_as, "miss")
+        return self._iter_body(resp, path, params, cache_key, cache_as)
+
+    def _iter_body(self, resp: requests.Response, path: str, params: Dict[str, Any],
+                   cache_key: str, cache_as: str) -> Iterator[Dict[str, Any]]:
+        record = self.archive.open_record(path, params) if self.archive else None
+        items = [] if self.response_cache.stores(cache_as) else None
+        try:
+            for raw in iter_raw_items(resp.iter_content(chunk_size=STREAM_CHUNK_SIZE)):
+                if record:
+                    record.add(raw)
+                item = loads(raw)
+                if items is not None:
+                    items.append(item)
+                yield item
+        except (requests.RequestException, ValueError) as e:
+            # ValueError: truncated body or an item that does not decode
+            logger.error("API-Football stream for %s broke: %s", path, e)
+            raise ProviderError(str(e))
+        finally:
+            resp.close()
+        if record:
+            try:
+                record.close()
+            except OSError:
+                logger.exception("Could not archive API-Football response for %s", path)
+        # only a complete body is cached; a consumer that stops early leaves nothing behind
+        if items is not None:
+            self.response_cache.store(
+                cache_key, cache_as, items, resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+            )
 
-    def fetch_fixtures(self, competition_provider_id: str, date_from: str = None, date_to: str = None) -> List[Dict[str, Any]]:
+    def _track_quota(self, headers) -> None:
+        def as_int(name):
+            try:
+                return int(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        self.quota = {
+            "daily_limit": as_int("x-ratelimit-requests-limit"),
+            "daily_remaining": as_int("x-ratelimit-requests-remaining"),
+            "minute_remaining": as_int("X-RateLimit-Remaining"),
+        }
+
+    def _archive(self, path: str, params: Dict[str, Any], data: Any) -> None:
+        # keep the raw payload for offline re-normalization; never fail a sync over it
+        if self.archive is None:
+            return
+        try:
+            self.archive.append(path, params, data)
+        except OSError:
+            logger.exception("Could not archive API-Football response for %s", path)
+
+    def _fixtures_query(self, competition_provider_id, date_from=None, date_to=None, season=None):
         params = {"league": competition_provider_id}
+        if season:
+            params["season"] = season
         if date_from:
             params["from"] = date_from
         if date_to:
             params["to"] = date_to
-        return self._request("fixtures", params=params)
+        # a window or season that ended before today no longer changes
+        today = date.today()
+        past = (bool(date_to) and str(date_to) < today.isoformat()) or (bool(season) and int(season) < today.year - 1)
+        return params, "fixtures:past" if past else "fixtures"
+
+    def fetch_fixtures(self, competition_provider_id: str, date_from: str = None, date_to: str = None,
+                       season: int = None) -> List[Dict[str, Any]]:
+        params, cache_as = self._fixtures_query(competition_provider_id, date_from, date_to, season)
+        return self._request("fixtures", params=params, cache_as=cache_as)
+
+    def iter_fixtures(self, competition_provider_id: str, date_from: str = None, date_to: str = None,
+                      season: int = None) -> Iterator[Dict[str, Any]]:
+        """Streaming fetch_fixtures: fixtures are decoded one at a time as the body arrives."""
+        params, cache_as = self._fixtures_query(competition_provider_id, date_from, date_to, season)
+        return self._stream("fixtures", params=params, cache_as=cache_as)
 
     def fetch_live(self) -> List[Dict[str, Any]]:
-        return self._request("fixtures", params={"live": "all"})
+        return self._request("fixtures", params={"live": "all"}, cache_as="fixtures:live")
 
-    def fetch_match_stats(self, match_provider_id: str) -> Dict[str, Any]:
+    def fetch_match_stats(self, match_provider_id: str, final: bool = False) -> Dict[str, Any]:
         # many APIs expose "statistics" or "events" endpoints; adjust accordingly
         # example: GET /fixtures/statistics?fixture=match_provider_id
-        return self._request("fixtures/statistics", params={"fixture": match_provider_id})
+        return self._request(
+            "fixtures/statistics", params={"fixture": match_provider_id},
+            cache_as="fixtures/statistics:final" if final else "fixtures/statistics",
+        )
     
     def fetch_fixtures_by_status(self, league: str, season: int, statuses: str) -> List[dict]:
         # e.g. statuses = "FT-AET-PEN-1H-HT-2H-ET-BT-P"
@@ -96,8 +288,12 @@ class APIFootballAdapter(ProviderAdapter):
         out = []
         for i in range(0, len(ids), 20):
             chunk = ids[i:i+20]
-            resp = self._request("fixtures", params={"ids": "-".join(map(str, chunk))})
+            resp = self._request("fixtures", params={"ids": "-".join(map(str, chunk))}, cache_as="fixtures:ids")
             out.extend(resp if isinstance(resp, list) else [])
-            time.sleep(1)  # be nice on free tier
         return out
 
+    def iter_fixtures_by_ids(self, ids: List[int]) -> Iterator[Dict[str, Any]]:
+        """Streaming fetch_fixtures_by_ids; each batch of 20 is requested when the previous one is consumed."""
+        for i in range(0, len(ids), 20):
+            chunk = ids[i:i+20]
+            yield from self._stream("fixtures", params={"ids": "-".join(map(str, chunk))}, cache_as="fixtures:ids")
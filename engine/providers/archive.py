@@ -0,0 +1,172 @@
+import gzip
+import io
+import json
+import logging
+import os
+from datetime import date, datetime, timezone as dt_timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_ENDPOINTS = {"fixtures"}
+STATS_ENDPOINTS = {"fixtures/statistics"}
+
+
+class RawArchive:
+    """
+    Append-only archive of raw provider responses:
+      <root>/<provider>/<YYYY-MM-DD>.jsonl.gz   (UTC fetch date)
+    one JSON record per line: {"endpoint", "params", "fetched_at", "response"}.
+
+    Each record is written as its own gzip member in a single O_APPEND write, so
+    concurrent workers can share a partition and `gzip.open` still reads it as one stream.
+    """
+
+    def __init__(self, root, provider: str):
+        self.root = Path(root)
+        self.provider = provider
+
+    def partition(self, day: date) -> Path:
+        return self.root / self.provider / f"{day.isoformat()}.jsonl.gz"
+
+    def append(self, endpoint: str, params: Optional[Dict[str, Any]], response: Any, fetched_at: datetime = None) -> None:
+        fetched_at = fetched_at or datetime.now(dt_timezone.utc)
+        record = {
+            "endpoint": endpoint.strip("/"),
+            "params": params or {},
+            "fetched_at": fetched_at.isoformat(),
+            "response": response,
+        }
+        blob = gzip.compress((json.dumps(record, separators=(",", ":"), default=str) + "\n").encode())
+        self._write(fetched_at.date(), blob)
+
+    def open_record(self, endpoint: str, params: Optional[Dict[str, Any]], fetched_at: datetime = None) -> "StreamedRecord":
+        """Start a record whose response array is added item by item (see StreamedRecord)."""
+        return StreamedRecord(self, endpoint, params, fetched_at or datetime.now(dt_timezone.utc))
+
+    def _write(self, day: date, blob: bytes) -> None:
+        path = self.partition(day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, blob)
+        finally:
+            os.close(fd)
+
+    def partitions(self, date_from: date = None, date_to: date = None) -> List[Path]:
+        """Partition files in date order, optionally limited to [date_from, date_to]."""
+        out = []
+        for path in sorted((self.root / self.provider).glob("*.jsonl.gz")):
+            day = date.fromisoformat(path.name.split(".")[0])
+            if (date_from and day < date_from) or (date_to and day > date_to):
+                continue
+            out.append(path)
+        return out
+
+
+class StreamedRecord:
+    """
+    Archive record for a streamed response: raw item bytes are compressed as they
+    arrive, and close() appends the finished gzip member in one write like append().
+    A record that is never closed (the stream broke) leaves nothing behind.
+    """
+
+    def __init__(self, archive: RawArchive, endpoint: str, params: Optional[Dict[str, Any]], fetched_at: datetime):
+        self.archive = archive
+        self.day = fetched_at.date()
+        self.out = io.BytesIO()
+        self.gz = gzip.GzipFile(fileobj=self.out, mode="wb")
+        head = {"endpoint": endpoint.strip("/"), "params": params or {}, "fetched_at": fetched_at.isoformat()}
+        self.gz.write(json.dumps(head, separators=(",", ":"), default=str)[:-1].encode() + b',"response":[')
+        self.first = True
+
+    def add(self, raw: bytes) -> None:
+        if not self.first:
+            self.gz.write(b",")
+        # JSON strings cannot hold raw newlines, so these are only whitespace
+        self.gz.write(raw.replace(b"\n", b" ").replace(b"\r", b" "))
+        self.first = False
+
+    def close(self) -> None:
+        self.gz.write(b"]}\n")
+        self.gz.close()
+        self.archive._write(self.day, self.out.getvalue())
+
+
+def read_partition(path) -> Iterator[Dict[str, Any]]:
+    with gzip.open(path, "rt") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def decode_partition(path, phase: str) -> Tuple[int, Dict[str, Any]]:
+    """
+    (records read, {provider fixture id: latest snapshot}) for one archive partition,
+    normalized: fixture dicts for phase "fixtures", statistics rows for phase "stats".
+    No database access, so partitions can be decoded in parallel; see write_partition.
+    """
+    from .mapper import normalize_fixture_api_football, normalize_stats_api_football
+
+    endpoints = FIXTURE_ENDPOINTS if phase == "fixtures" else STATS_ENDPOINTS
+    records, latest = 0, {}
+    for record in read_partition(path):
+        if record["endpoint"] not in endpoints:
+            continue
+        if phase == "fixtures" and not isinstance(record["response"], list):
+            continue
+        records += 1
+        fetched_at = record.get("fetched_at") or ""
+        if phase == "fixtures":
+            snapshots = [(str((fx.get("fixture") or {}).get("id")), fx) for fx in record["response"]]
+        else:
+            snapshots = [(str(record["params"].get("fixture")), record["response"])]
+        # a fixture fetched several times in a day: the last fetch wins, whatever the append order
+        for fid, payload in snapshots:
+            if fid not in latest or latest[fid][0] <= fetched_at:
+                latest[fid] = (fetched_at, payload)
+
+    normalize = normalize_fixture_api_football if phase == "fixtures" else normalize_stats_api_football
+    return records, {fid: normalize(payload) for fid, (_, payload) in latest.items()}
+
+
+def write_partition(decoded: Tuple[int, Dict[str, Any]], provider: str, phase: str,
+                    batch_size: int = 500) -> Dict[str, int]:
+    """
+    Write what decode_partition returned with the bulk writers. Partitions must be
+    written one at a time in date order, so a fixture's newest snapshot is the one
+    that stays. Phase "stats" expects the fixtures phase to have run (every match exists).
+    """
+    from core.models import ProviderRef, ProviderRefKind
+    from .ingest import upsert_fixtures, upsert_match_metrics
+
+    records, latest = decoded
+    totals: Dict[str, int] = {"records": records}
+
+    def add(result):
+        for k, v in result.items():
+            totals[k] = totals.get(k, 0) + v
+
+    if phase == "fixtures":
+        batch = list(latest.values())
+        for i in range(0, len(batch), batch_size):
+            add(upsert_fixtures(provider, batch[i:i + batch_size]))
+
+    elif phase == "stats":
+        matches = ProviderRef.objects.resolve(provider, ProviderRefKind.MATCH, latest.keys())
+        rows_by_match = {matches[fid]: rows for fid, rows in latest.items() if fid in matches}
+        totals["unknown_fixtures"] = len(latest) - len(rows_by_match)
+        if rows_by_match:
+            add(upsert_match_metrics(provider, rows_by_match))
+
+    return totals
+
+
+def replay_partition(path, provider: str, phase: str, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Re-normalize one archive partition and write it with the bulk writers.
+    phase "fixtures" replays fixture lists, phase "stats" replays statistics
+    (run it after fixtures so every match already exists).
+    """
+    return write_partition(decode_partition(path, phase), provider, phase, batch_size)
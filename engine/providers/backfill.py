@@ -0,0 +1,169 @@
+import logging
+import time
+from typing import Any, Dict, Iterable, List
+from django.conf import settings
+from django.utils import timezone
+
+from core.models import BackfillCheckpoint, ProviderRef, ProviderRefKind
+from matches.models import Match, FINISHED_STATUSES
+from .base import ProviderError, RateLimitError, get_adapter
+from .ingest import upsert_fixtures_stream, upsert_match_metrics
+from .mapper import normalize_fixture_api_football, normalize_stats_api_football
+
+logger = logging.getLogger(__name__)
+
+Phase = BackfillCheckpoint.Phase
+Status = BackfillCheckpoint.Status
+
+# give up on a chunk after waiting this many times for the rate budget (the Celery task
+# retries that many times instead of waiting)
+MAX_RATE_WAITS = 20
+
+
+def plan_fixtures(provider: str, leagues: Iterable, seasons: Iterable[int]) -> int:
+    """One fixtures checkpoint per (league, season); existing checkpoints are kept. Returns how many are new."""
+    wanted = [
+        BackfillCheckpoint(provider=provider, league=str(league), season=int(season), phase=Phase.FIXTURES)
+        for league in leagues for season in seasons
+    ]
+    before = BackfillCheckpoint.objects.filter(provider=provider, phase=Phase.FIXTURES).count()
+    BackfillCheckpoint.objects.bulk_create(wanted, ignore_conflicts=True)
+    return BackfillCheckpoint.objects.filter(provider=provider, phase=Phase.FIXTURES).count() - before
+
+
+def plan_stats(provider: str, league: str, season: int, chunk_size: int) -> int:
+    """
+    Split the finished matches of a league season into stats checkpoints of `chunk_size`
+    matches. Planned once, after the season's fixtures are in; matches that finish later
+    are picked up by the regular hydration tasks.
+    """
+    existing = BackfillCheckpoint.objects.filter(
+        provider=provider, league=league, season=season, phase=Phase.STATS,
+    )
+    if existing.exists():
+        return 0
+
+    competition_id = ProviderRef.objects.resolve(provider, ProviderRefKind.COMPETITION, [league]).get(league)
+    if competition_id is None:
+        return 0
+    match_ids = [
+        str(mid) for mid in Match.objects.filter(
+            competition_id=competition_id, season__name=str(season), status__in=FINISHED_STATUSES,
+        ).order_by("utc_kickoff", "id").values_list("id", flat=True)
+    ]
+    chunks = [
+        BackfillCheckpoint(
+            provider=provider, league=league, season=season, phase=Phase.STATS,
+            chunk=i, items=match_ids[start:start + chunk_size],
+        )
+        for i, start in enumerate(range(0, len(match_ids), chunk_size))
+    ]
+    BackfillCheckpoint.objects.bulk_create(chunks, ignore_conflicts=True)
+    return len(chunks)
+
+
+def _call(fetch, *args, wait_for_budget=True, **kwargs):
+    """
+    Call the provider, waiting out the shared rate budget instead of failing the chunk.
+    With wait_for_budget=False a RateLimitError goes straight to the caller.
+    """
+    if not wait_for_budget:
+        return fetch(*args, **kwargs)
+    for _ in range(MAX_RATE_WAITS):
+        try:
+            return fetch(*args, **kwargs)
+        except RateLimitError as e:
+            wait = e.retry_after or 30
+            logger.info("Backfill waiting %ss for the provider rate budget", wait)
+            time.sleep(wait)
+    raise RateLimitError("rate budget exhausted while backfilling")
+
+
+def _fixtures(adapter, cp: BackfillCheckpoint, wait_for_budget: bool = True) -> Dict[str, int]:
+    seen = 0
+
+    def normalized(fixtures):
+        nonlocal seen
+        for fx in fixtures:
+            seen += 1
+            yield normalize_fixture_api_football(fx)
+
+    fixtures = _call(adapter.iter_fixtures, cp.league, season=cp.season, wait_for_budget=wait_for_budget)
+    result = upsert_fixtures_stream(adapter.name, normalized(fixtures))
+    result["items"] = seen
+    return result
+
+
+def _stats(adapter, cp: BackfillCheckpoint, wait_for_budget: bool = True) -> Dict[str, int]:
+    rows_by_match, failed = {}, []
+    for mid, refs in Match.objects.filter(id__in=cp.items).values_list("id", "provider_refs"):
+        fixture_id = ((refs or {}).get(adapter.name) or {}).get("fixture_id")
+        if not fixture_id:
+            continue
+        try:
+            rows_by_match[mid] = normalize_stats_api_football(
+                _call(adapter.fetch_match_stats, fixture_id, final=True, wait_for_budget=wait_for_budget)
+            )
+        except ProviderError as e:
+            if isinstance(e, RateLimitError) and not wait_for_budget:
+                # the whole chunk is retried; stats fetched so far come back from the response cache
+                raise
+            logger.warning("Backfill could not fetch stats for %s: %s", mid, e)
+            failed.append(str(mid))
+    result = upsert_match_metrics(adapter.name, rows_by_match)
+    result["items"] = len(cp.items)
+    result["failed"] = len(failed)
+    return result
+
+
+def run_chunk(checkpoint_id, wait_for_budget: bool = True) -> Dict[str, Any]:
+    """
+    Run one checkpoint and record the outcome on it. Safe to call from a worker process.
+    The result carries "quota_low" when the provider's daily quota dropped below
+    BACKFILL_QUOTA_RESERVE, so the caller can stop handing out work.
+    With wait_for_budget=False (Celery, see tasks.backfill_chunk) an exhausted rate
+    budget puts the checkpoint back to pending and raises RateLimitError, so the task
+    can retry with a countdown instead of sleeping in the worker.
+    """
+    cp = BackfillCheckpoint.objects.get(id=checkpoint_id)
+    if cp.status == Status.DONE:
+        return {"phase": cp.phase, "status": cp.status, **cp.result}
+
+    cp.status = Status.RUNNING
+    cp.attempts += 1
+    cp.save(update_fields=["status", "attempts", "updated_at"])
+
+    adapter = get_adapter()
+    try:
+        run = _fixtures if cp.phase == Phase.FIXTURES else _stats
+        result = run(adapter, cp, wait_for_budget)
+    except ProviderError as e:
+        if isinstance(e, RateLimitError) and not wait_for_budget:
+            cp.status, cp.error = Status.PENDING, "waiting for the provider rate budget"
+            cp.save(update_fields=["status", "error", "updated_at"])
+            raise
+        cp.status, cp.error, result = Status.FAILED, str(e) or e.__class__.__name__, {"items": 0}
+    else:
+        # a chunk with failed fetches stays failed so the next run retries it
+        cp.status = Status.FAILED if result.get("failed") else Status.DONE
+        cp.error = f"{result['failed']} fetches failed" if result.get("failed") else ""
+        cp.result = result
+    cp.finished_at = timezone.now()
+    cp.save(update_fields=["status", "error", "result", "finished_at", "updated_at"])
+
+    remaining = adapter.quota.get("daily_remaining")
+    reserve = getattr(settings, "BACKFILL_QUOTA_RESERVE", 0)
+    return {
+        "phase": cp.phase, "status": cp.status, **result,
+        "quota_low": remaining is not None and remaining < reserve,
+    }
+
+
+def pending(provider: str, phase: str, leagues: Iterable, seasons: Iterable[int]) -> List:
+    """Ids of the checkpoints of a phase that still need running (pending, failed, or interrupted)."""
+    return list(
+        BackfillCheckpoint.objects.filter(
+            provider=provider, phase=phase,
+            league__in=[str(league) for league in leagues], season__in=list(seasons),
+        ).exclude(status=Status.DONE).order_by("season", "league", "chunk").values_list("id", flat=True)
+    )
@@ -1,11 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
+from django.conf import settings
+from django.utils.module_loading import import_string
 
 class ProviderError(Exception):
     pass
 
 class RateLimitError(ProviderError):
-    pass
+    def __init__(self, message: str = "", retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after  # seconds until a retry may succeed, if known
+
+class CircuitOpenError(RateLimitError):
+    """
+    The provider endpoint's circuit breaker is open: the call was not made. Callers back
+    off for `retry_after` exactly as they do for a rate limit.
+    """
 
 class ProviderAdapter(ABC):
     """
@@ -20,13 +30,28 @@ class ProviderAdapter(ABC):
         self.base_url = base_url
 
     @abstractmethod
-    def fetch_fixtures(self, competition_provider_id: str, date_from: str = None, date_to: str = None) -> List[Dict[str, Any]]:
-        """Return a list of fixture payloads (raw provider JSON)."""
+    def fetch_fixtures(self, competition_provider_id: str, date_from: str = None, date_to: str = None,
+                       season: int = None) -> List[Dict[str, Any]]:
+        """Return a list of fixture payloads (raw provider JSON), optionally limited to one season."""
+
+    def iter_fixtures(self, competition_provider_id: str, date_from: str = None, date_to: str = None,
+                      season: int = None) -> Iterator[Dict[str, Any]]:
+        """Fixture payloads one at a time; adapters that can parse incrementally override this."""
+        return iter(self.fetch_fixtures(competition_provider_id, date_from=date_from, date_to=date_to, season=season))
 
     @abstractmethod
     def fetch_live(self) -> List[Dict[str, Any]]:
         """Return a list of live match payloads."""
 
     @abstractmethod
-    def fetch_match_stats(self, match_provider_id: str) -> Dict[str, Any]:
-        """Return stats for a single match (raw provider JSON)."""
+    def fetch_match_stats(self, match_provider_id: str, final: bool = False) -> Dict[str, Any]:
+        """Return stats for a single match (raw provider JSON). `final` marks a finished match."""
+
+
+def adapter_class():
+    """settings.PROVIDER_ADAPTER: API-Football, or a local stand-in such as providers.replay.ReplayAdapter."""
+    return import_string(getattr(settings, "PROVIDER_ADAPTER", "providers.api_football.APIFootballAdapter"))
+
+
+def get_adapter(**kwargs) -> ProviderAdapter:
+    return adapter_class()(**kwargs)
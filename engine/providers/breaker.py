@@ -0,0 +1,85 @@
+import time
+from typing import Any, Dict, Optional
+from django.conf import settings
+from django.core.cache import caches
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+DEFAULTS = {
+    "failure_threshold": 5,     # consecutive failed or slow calls that open the circuit
+    "slow_call_seconds": 5.0,   # a call taking at least this long counts as a failure
+    "open_seconds": 30,         # how long an open circuit fails fast before a trial call
+}
+
+
+class ProviderCircuitBreaker:
+    """
+    Circuit breakers per provider endpoint, with state in a Django cache so every worker
+    sees the same circuit. Configured by settings.PROVIDER_CIRCUIT_BREAKERS, e.g.
+      {"api_football": {"failure_threshold": 5, "slow_call_seconds": 5, "open_seconds": 30}}
+
+    closed    -> calls go through; consecutive failures are counted
+    open      -> calls fail fast for `open_seconds`
+    half_open -> cool-down over: one trial call is let through; success closes the
+                 circuit, failure opens it again
+    """
+
+    def __init__(self, provider: str, config: Optional[Dict[str, Any]] = None, cache=None, clock=time.time):
+        if config is None:
+            config = getattr(settings, "PROVIDER_CIRCUIT_BREAKERS", {}).get(provider, {})
+        self.provider = provider
+        self.config = {**DEFAULTS, **config}
+        self.cache = cache if cache is not None else caches["shared"]
+        self.clock = clock
+
+    def _key(self, endpoint: str) -> str:
+        return f"breaker:{self.provider}:{endpoint.strip('/')}"
+
+    def _get(self, endpoint: str) -> Dict[str, Any]:
+        return self.cache.get(self._key(endpoint)) or {"state": CLOSED, "failures": 0, "opened_at": None}
+
+    def allow(self, endpoint: str) -> float:
+        """0 when a call may go ahead (possibly as the half-open trial), else seconds to wait."""
+        entry = self._get(endpoint)
+        if entry["state"] == CLOSED:
+            return 0.0
+        remaining = entry["opened_at"] + self.config["open_seconds"] - self.clock()
+        if remaining > 0:
+            return remaining
+        # one trial call at a time; a trial that never reports back expires with its lock
+        if self.cache.add(f"{self._key(endpoint)}:trial", 1, timeout=self.config["open_seconds"]):
+            return 0.0
+        return float(self.config["slow_call_seconds"])
+
+    def record(self, endpoint: str, ok: bool, elapsed: float = 0.0) -> None:
+        """Report the outcome of a call that allow() let through."""
+        key = self._key(endpoint)
+        failed = not ok or elapsed >= self.config["slow_call_seconds"]
+        entry = self._get(endpoint)
+        if entry["state"] == OPEN:
+            # this was the trial call
+            self.cache.delete(f"{key}:trial")
+            if failed:
+                self.cache.set(key, {**entry, "opened_at": self.clock()}, timeout=None)
+            else:
+                self.cache.delete(key)
+        elif failed:
+            failures = entry["failures"] + 1
+            if failures >= self.config["failure_threshold"]:
+                self.cache.set(key, {"state": OPEN, "failures": failures, "opened_at": self.clock()}, timeout=None)
+            else:
+                self.cache.set(key, {**entry, "failures": failures}, timeout=None)
+        elif entry["failures"]:
+            self.cache.delete(key)
+
+    def status(self, endpoint: str) -> Dict[str, Any]:
+        """{"state": closed|open|half_open, "failures": n, "retry_after": seconds} for schedulers and reports."""
+        entry = self._get(endpoint)
+        if entry["state"] == CLOSED:
+            return {"state": CLOSED, "failures": entry["failures"], "retry_after": 0.0}
+        remaining = max(0.0, entry["opened_at"] + self.config["open_seconds"] - self.clock())
+        return {"state": OPEN if remaining else HALF_OPEN, "failures": entry["failures"], "retry_after": remaining}
+
+    def is_open(self, endpoint: str) -> bool:
+        """True while calls to `endpoint` would fail fast (a half-open circuit accepts a trial)."""
+        return self.status(endpoint)["state"] == OPEN
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import time
+from typing import Any, Dict, Optional
+from django.conf import settings
+from django.core.cache import caches
+
+# how long an expired entry is kept around so it can still be revalidated
+STALE_GRACE = 24 * 3600
+NO_TTL = object()
+OUTCOMES = ("hit", "miss", "revalidated", "stale")
+
+
+class ResponseCache:
+    """
+    Cache of provider responses in the "provider" Django cache, keyed by endpoint plus
+    canonicalized params. TTLs come from settings.PROVIDER_CACHE_TTLS per "cache class"
+    (an endpoint, optionally with a ":variant" suffix such as "fixtures:live");
+    a TTL of None keeps the entry forever, a missing class is not cached at all.
+    """
+
+    def __init__(self, provider: str, ttls: Optional[Dict[str, Any]] = None, cache=None, clock=time.time):
+        self.provider = provider
+        self.ttls = ttls if ttls is not None else getattr(settings, "PROVIDER_CACHE_TTLS", {}).get(provider, {})
+        self.cache = cache if cache is not None else caches["provider"]
+        self.clock = clock
+
+    def ttl(self, cache_class: str):
+        return self.ttls.get(cache_class, NO_TTL)
+
+    def key(self, path: str, params: Optional[Dict[str, Any]]) -> str:
+        canonical = json.dumps({str(k): str(v) for k, v in (params or {}).items()}, sort_keys=True)
+        digest = hashlib.sha1(f"{path.strip('/')}?{canonical}".encode()).hexdigest()
+        return f"provider:{self.provider}:{digest}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Stored entry ({"data", "etag", "last_modified", "fresh_until"}) or None."""
+        return self.cache.get(key)
+
+    def stores(self, cache_class: str) -> bool:
+        """Whether responses of `cache_class` are kept at all (store() is a no-op otherwise)."""
+        ttl = self.ttl(cache_class)
+        return ttl is not NO_TTL and ttl != 0
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return entry["fresh_until"] is None or entry["fresh_until"] > self.clock()
+
+    def store(self, key: str, cache_class: str, data: Any, etag: str = None, last_modified: str = None) -> None:
+        if not self.stores(cache_class):
+            return
+        ttl = self.ttl(cache_class)
+        entry = {
+            "data": data,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh_until": None if ttl is None else self.clock() + ttl,
+        }
+        self.cache.set(key, entry, timeout=None if ttl is None else ttl + STALE_GRACE)
+
+    # ---- hit-ratio counters (in the same cache, so the report covers every worker) ----
+
+    def _stat_key(self, cache_class: str, outcome: str) -> str:
+        return f"providerstats:{self.provider}:{cache_class}:{outcome}"
+
+    def record(self, cache_class: str, outcome: str) -> None:
+        """
+        outcome: "hit", "miss", "revalidated" (a 304 that reused the stored body) or
+        "stale" (an expired entry served because the provider's circuit is open).
+        """
+        key = self._stat_key(cache_class, outcome)
+        if not self.cache.add(key, 1, timeout=None):
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                # expired between add() and incr()
+                self.cache.add(key, 1, timeout=None)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        for cache_class in self.ttls:
+            counts = {o: self.cache.get(self._stat_key(cache_class, o), 0) for o in OUTCOMES}
+            total = sum(counts.values())
+            counts["hit_ratio"] = round((counts["hit"] + counts["revalidated"] + counts["stale"]) / total, 4) if total else 0.0
+            out[cache_class] = counts
+        return out
+
+    def reset_stats(self) -> None:
+        self.cache.delete_many(
+            [self._stat_key(c, o) for c in self.ttls for o in OUTCOMES]
+        )
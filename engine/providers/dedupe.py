@@ -0,0 +1,62 @@
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Optional, Set
+from django.conf import settings
+from django.core.cache import caches
+
+from core.locks import LockTimeout, cache_lock
+
+# seconds a worker may hold a pending-set lock
+LOCK_TTL = 5
+
+
+def task_key(name: str, args=(), kwargs: Optional[Dict[str, Any]] = None) -> str:
+    canonical = json.dumps([list(args), kwargs or {}], sort_keys=True, default=str)
+    return f"dedupe:{name}:{hashlib.sha1(canonical.encode()).hexdigest()}"
+
+
+def enqueue_once(task, args=(), kwargs: Optional[Dict[str, Any]] = None, window: int = None, cache=None, **options):
+    """
+    apply_async unless the same task with the same arguments was enqueued in the last
+    `window` seconds (settings.TASK_DEDUPE_WINDOW by default). Returns the AsyncResult,
+    or None for a dropped duplicate.
+    """
+    cache = cache if cache is not None else caches["shared"]
+    window = window if window is not None else settings.TASK_DEDUPE_WINDOW
+    if not cache.add(task_key(task.name, args, kwargs), 1, timeout=window):
+        return None
+    return task.apply_async(args=args, kwargs=kwargs, **options)
+
+
+class PendingSet:
+    """
+    Set of ids waiting for one batched task, kept in the shared cache. add() reports
+    whether the caller should schedule the flush (nobody has yet in this round);
+    pop() takes every pending id and opens the next round. Both raise LockTimeout
+    rather than touch the set without its lock.
+    """
+
+    def __init__(self, name: str, cache=None):
+        self.name = name
+        self.key = f"pending:{name}"
+        self.scheduled_key = f"pending:{name}:scheduled"
+        self.cache = cache if cache is not None else caches["shared"]
+
+    def add(self, ids: Iterable, flush_within: float) -> bool:
+        ids = {str(i) for i in ids}
+        if not ids:
+            return False
+        with cache_lock(self.key, LOCK_TTL, self.cache) as held:
+            if not held:
+                raise LockTimeout(f"pending set {self.name} is locked")
+            self.cache.set(self.key, (self.cache.get(self.key) or set()) | ids, timeout=None)
+        # the marker outlives a lost flush by a minute, then the next add() schedules again
+        return self.cache.add(self.scheduled_key, 1, timeout=flush_within + 60)
+
+    def pop(self) -> Set[str]:
+        with cache_lock(self.key, LOCK_TTL, self.cache) as held:
+            if not held:
+                raise LockTimeout(f"pending set {self.name} is locked")
+            ids = self.cache.get(self.key) or set()
+            self.cache.delete_many([self.key, self.scheduled_key])
+        return ids
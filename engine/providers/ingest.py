@@ -0,0 +1,384 @@
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from matches.models import Match, MatchStatus
+from teams.models import Team
+from competitions.models import Competition, Season
+from core.models import ProviderRef, ProviderRefKind
+from core import events
+from core.versions import bump, match_scopes
+from metrics.models import MatchMetric, MetricType
+from .resolver import identities
+
+logger = logging.getLogger(__name__)
+
+# columns rewritten when an already-known fixture is upserted again
+MATCH_UPDATE_FIELDS = [
+    "competition", "season", "utc_kickoff", "home", "away",
+    "venue", "status", "minute", "provider_refs", "fingerprint", "updated_at",
+]
+
+
+# fixtures per INSERT when ingesting a stream (see upsert_fixtures_stream)
+FIXTURE_BATCH_SIZE = 500
+
+# provider_refs JSON key carried by each kind of entity
+REF_KEYS = {
+    ProviderRefKind.COMPETITION: "league_id",
+    ProviderRefKind.TEAM: "team_id",
+    ProviderRefKind.MATCH: "fixture_id",
+}
+
+
+def _remember(mapping: Dict[Any, Any]) -> None:
+    # only cache ids once they are committed; a rolled-back placeholder must not linger
+    if mapping:
+        transaction.on_commit(lambda: identities.set_many(mapping))
+
+
+def _ref_value(obj, provider: str, ref_key: str = "fixture_id"):
+    value = ((obj.provider_refs or {}).get(provider) or {}).get(ref_key)
+    return str(value) if value is not None else None
+
+
+def _resolve_or_create(model, provider: str, kind: str, ids: Iterable[str], build) -> Dict[str, Any]:
+    """
+    Resolve provider ids to our UUIDs through ProviderRef, bulk-creating placeholders
+    (via `build`) for unknown ids and registering their refs.
+    Rows that lost a concurrent insert are picked up by the re-read.
+    """
+    ids = set(ids)
+    cached = identities.get_many((provider, kind, i) for i in ids)
+    found = {key[2]: pk for key, pk in cached.items()}
+
+    unknown = ids - found.keys()
+    fetched = ProviderRef.objects.resolve(provider, kind, unknown) if unknown else {}
+    missing = sorted(unknown - fetched.keys())
+    if missing:
+        built = {i: build(i) for i in missing}
+        model.objects.bulk_create(built.values(), ignore_conflicts=True)
+        stored = set(model.objects.filter(id__in=[o.id for o in built.values()]).values_list("id", flat=True))
+        ProviderRef.objects.bulk_create(
+            [ProviderRef(provider=provider, kind=kind, external_id=i, object_id=o.id)
+             for i, o in built.items() if o.id in stored],
+            ignore_conflicts=True,
+        )
+        fetched.update(ProviderRef.objects.resolve(provider, kind, missing))
+
+    _remember({(provider, kind, i): pk for i, pk in fetched.items()})
+    found.update(fetched)
+    return found
+
+
+def resolve_teams(provider: str, team_ids: Iterable[str]) -> Dict[str, Any]:
+    """Provider team id -> Team UUID, creating "team-<id>" placeholders for unknown teams."""
+    return _resolve_or_create(
+        Team, provider, ProviderRefKind.TEAM, team_ids,
+        lambda i: Team(name=f"team-{i}", provider_refs={provider: {"team_id": i}}),
+    )
+
+
+def _resolve_seasons(pairs: Iterable[tuple]) -> Dict[tuple, Any]:
+    """(competition_id, season name) -> Season id, creating the missing ones in bulk."""
+    pairs = set(pairs)
+    cached = identities.get_many(("season",) + p for p in pairs)
+    found = {key[1:]: pk for key, pk in cached.items()}
+
+    def fetch(keys):
+        qs = Season.objects.filter(
+            competition_id__in={c for c, _ in keys},
+            name__in={n for _, n in keys},
+        ).values_list("competition_id", "name", "id")
+        return {(c, n): pk for c, n, pk in qs if (c, n) in keys}
+
+    unknown = pairs - found.keys()
+    if unknown:
+        fetched = fetch(unknown)
+        missing = unknown - fetched.keys()
+        if missing:
+            Season.objects.bulk_create(
+                [Season(competition_id=c, name=n, year_start=0, year_end=0) for c, n in missing],
+                ignore_conflicts=True,
+            )
+            fetched.update(fetch(missing))
+        _remember({("season",) + p: pk for p, pk in fetched.items()})
+        found.update(fetched)
+    return found
+
+
+def resolve_metric_types(keys: Iterable[str]) -> Dict[str, Any]:
+    """Metric key -> MetricType id, registering unknown keys with default display metadata."""
+    keys = set(keys)
+    cached = identities.get_many(("metric", k) for k in keys)
+    found = {key[1]: pk for key, pk in cached.items()}
+
+    unknown = keys - found.keys()
+    if unknown:
+        fetched = dict(MetricType.objects.filter(key__in=unknown).values_list("key", "id"))
+        missing = unknown - fetched.keys()
+        if missing:
+            MetricType.objects.bulk_create(
+                [MetricType(key=k, display_name=k, unit="count") for k in missing],
+                ignore_conflicts=True,
+            )
+            fetched.update(MetricType.objects.filter(key__in=missing).values_list("key", "id"))
+        _remember({("metric", k): pk for k, pk in fetched.items()})
+        found.update(fetched)
+    return found
+
+
+def fingerprint(values: Dict[str, Any]) -> str:
+    """Stable content hash of the column values ingestion writes for one row."""
+    canonical = json.dumps(values, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.md5(canonical.encode()).hexdigest()
+
+
+def _kickoff(value):
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if value is not None and timezone.is_naive(value):
+        # same interpretation Django applies when a naive value is saved
+        value = timezone.make_aware(value)
+    return value
+
+
+def upsert_fixtures(provider: str, fixtures: Iterable[Dict[str, Any]], changed: Optional[set] = None) -> Dict[str, int]:
+    """
+    Set-based ingestion of normalized fixtures (see mapper.normalize_fixture_*).
+
+    Competitions, seasons and teams are resolved with one query per entity type,
+    missing ones are bulk-created as placeholders, and all matches are written with
+    a single INSERT ... ON CONFLICT statement.
+    Fixtures whose content fingerprint (everything but the live minute) and minute
+    match the stored ones are not rewritten; the data versions (core.versions) of
+    every rewritten match are bumped. When `changed` is given, the ids of
+    matches whose content (status, score, ...) changed are added to it. Status and
+    minute changes of live matches go to the live feed (core.events).
+    Returns {"inserted": n, "updated": n, "unchanged": n, "skipped": n}.
+    """
+    result = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+
+    # normalize + dedupe the whole batch first (last payload for a fixture wins)
+    batch: Dict[str, Dict[str, Any]] = {}
+    for norm in fixtures:
+        pid = norm.get("provider_id")
+        kick = _kickoff(norm.get("utc_kickoff"))
+        if not pid or pid == "None" or kick is None:
+            result["skipped"] += 1
+            continue
+        if pid in batch:
+            result["skipped"] += 1
+        batch[pid] = {**norm, "utc_kickoff": kick}
+
+    if not batch:
+        return result
+
+    with transaction.atomic():
+        comps = _resolve_or_create(
+            Competition, provider, ProviderRefKind.COMPETITION,
+            {n["competition_provider_id"] for n in batch.values()},
+            lambda i: Competition(name=i, provider_refs={provider: {"league_id": i}}),
+        )
+        seasons = _resolve_seasons(
+            (comps[n["competition_provider_id"]], str(n.get("season_name") or ""))
+            for n in batch.values() if n["competition_provider_id"] in comps
+        )
+        teams = resolve_teams(
+            provider,
+            {n["home_provider_id"] for n in batch.values()} | {n["away_provider_id"] for n in batch.values()},
+        )
+
+        match_ids = ProviderRef.objects.resolve(provider, ProviderRefKind.MATCH, batch.keys())
+        by_id = (Match.objects.only("id", "provider_refs", "fingerprint", "status", "minute", "utc_kickoff",
+                                    "competition_id")
+                 .in_bulk(match_ids.values()))
+        existing = {pid: by_id[mid] for pid, mid in match_ids.items() if mid in by_id}
+
+        rows: Dict[str, Dict[str, Any]] = {}
+        scores: Dict[str, Any] = {}
+        for pid, norm in batch.items():
+            comp = comps.get(norm["competition_provider_id"])
+            home = teams.get(norm["home_provider_id"])
+            away = teams.get(norm["away_provider_id"])
+            season = comp and seasons.get((comp, str(norm.get("season_name") or "")))
+            if not (comp and season and home and away):
+                logger.warning("Skipping fixture %s: unresolved references", pid)
+                result["skipped"] += 1
+                continue
+            rows[pid] = {
+                "competition_id": comp, "season_id": season, "home_id": home, "away_id": away,
+                "utc_kickoff": norm["utc_kickoff"], "venue": norm.get("venue") or "",
+                "status": norm.get("status_text") or MatchStatus.SCHEDULED,
+                "minute": norm.get("minute") or 0,
+            }
+            scores[pid] = norm.get("score")
+
+        # fixtures we have never stamped may still exist under their natural key
+        unstamped = [pid for pid in rows if pid not in existing]
+        if unstamped:
+            natural = {
+                (r["season_id"], r["home_id"], r["away_id"], r["utc_kickoff"]): pid
+                for pid, r in ((p, rows[p]) for p in unstamped)
+            }
+            candidates = Match.objects.filter(
+                season_id__in={k[0] for k in natural},
+                home_id__in={k[1] for k in natural},
+                utc_kickoff__in={k[3] for k in natural},
+            )
+            for m in candidates:
+                pid = natural.get((m.season_id, m.home_id, m.away_id, m.utc_kickoff))
+                if pid:
+                    existing[pid] = m
+
+        objs: List[Match] = []
+        seen = set()
+        scopes = set()
+        live_events = []
+        now = timezone.now()
+        for pid, r in rows.items():
+            current = existing.get(pid)
+            key = (r["season_id"], r["home_id"], r["away_id"], r["utc_kickoff"])
+            if key in seen or (current and current.id in seen):
+                # two provider fixtures colliding on one row / natural key
+                result["skipped"] += 1
+                continue
+            seen.update((key, current.id) if current else (key,))
+
+            # the minute ticks on every poll; it is compared separately so it never counts as a change
+            fp = fingerprint({**{k: v for k, v in r.items() if k != "minute"}, "score": scores[pid]})
+            content_changed = not current or current.fingerprint != fp
+            if not content_changed and current.minute == r["minute"] and _ref_value(current, provider) == pid:
+                result["unchanged"] += 1
+                continue
+            refs = dict(current.provider_refs or {}) if current else {}
+            refs[provider] = {**(refs.get(provider) or {}), "fixture_id": pid}
+            obj = Match(provider_refs=refs, fingerprint=fp, **r)
+            if current:
+                obj.id = current.id
+                result["updated"] += 1
+            else:
+                result["inserted"] += 1
+            if content_changed and changed is not None:
+                changed.add(obj.id)
+            objs.append(obj)
+            if (events.is_live(obj.status, obj.utc_kickoff, now)
+                    and (not current or (current.status, current.minute) != (obj.status, obj.minute))):
+                live_events.append(events.match_event(obj.id, obj.competition_id, obj.status, obj.minute))
+            scopes |= match_scopes(obj.id, r["utc_kickoff"], r["competition_id"])
+            if current:
+                # a rescheduled or moved match leaves its old date and competition too
+                scopes |= match_scopes(current.id, current.utc_kickoff, current.competition_id)
+
+        Match.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=MATCH_UPDATE_FIELDS,
+        )
+        # keep the indexed ref table in step with provider_refs
+        refs = {o.provider_refs[provider]["fixture_id"]: o.id for o in objs}
+        ProviderRef.objects.register(
+            provider, ProviderRefKind.MATCH,
+            {pid: oid for pid, oid in refs.items() if match_ids.get(pid) != oid},
+        )
+        # last, so the counter rows stay locked for as short as possible
+        bump(scopes)
+        events.publish(live_events)
+
+    return result
+
+
+def upsert_fixtures_stream(provider: str, fixtures: Iterable[Dict[str, Any]], batch_size: int = FIXTURE_BATCH_SIZE,
+                           changed: Optional[set] = None) -> Dict[str, int]:
+    """
+    upsert_fixtures over a (possibly lazy) iterable, `batch_size` fixtures at a time, so
+    a streamed season is never held in memory as a whole. Returns the summed counts.
+    """
+    totals = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+    batch = []
+    for norm in fixtures:
+        batch.append(norm)
+        if len(batch) >= batch_size:
+            for k, v in upsert_fixtures(provider, batch, changed=changed).items():
+                totals[k] += v
+            batch = []
+    if batch:
+        for k, v in upsert_fixtures(provider, batch, changed=changed).items():
+            totals[k] += v
+    return totals
+
+
+def upsert_match_metrics(provider: str, rows_by_match: Dict[Any, List[Dict[str, Any]]]) -> Dict[str, int]:
+    """
+    Write normalized stats rows (see mapper.normalize_stats_*) for many matches with a
+    single INSERT ... ON CONFLICT on (match, team, metric_type, period), then stamp
+    freshness_ts on every hydrated match in one UPDATE. A metric row whose (value,
+    source, confidence) fingerprint matches the stored row is not rewritten, so its
+    updated_at and indexes stay untouched, and only matches with rewritten rows get
+    their data versions bumped and their new values sent to the live feed (core.events).
+    Returns {"matches": n, "metrics": n (rows written), "unchanged": n, "skipped": n}.
+    """
+    result = {"matches": 0, "metrics": 0, "unchanged": 0, "skipped": 0}
+    if not rows_by_match:
+        return result
+    all_rows = [r for rows in rows_by_match.values() for r in rows]
+
+    with transaction.atomic():
+        teams = resolve_teams(provider, {r["team_provider_id"] for r in all_rows})
+        metric_types = resolve_metric_types({r["metric_key"] for r in all_rows})
+
+        objs = {}
+        for match_id, rows in rows_by_match.items():
+            for r in rows:
+                team_id = teams.get(r["team_provider_id"])
+                if not team_id:
+                    result["skipped"] += 1
+                    continue
+                key = (match_id, team_id, metric_types[r["metric_key"]], r.get("period", "FT"))
+                objs[key] = MatchMetric(
+                    match_id=key[0], team_id=key[1], metric_type_id=key[2], period=key[3],
+                    value=r["value"], source=provider, confidence=1.0,
+                )
+
+        stored = {
+            (m, t, mt, p): (v, src, conf)
+            for m, t, mt, p, v, src, conf in MatchMetric.objects
+            .filter(match_id__in=list(rows_by_match))
+            .values_list("match_id", "team_id", "metric_type_id", "period", "value", "source", "confidence")
+        }
+        changed = [o for key, o in objs.items() if stored.get(key) != (o.value, o.source, o.confidence)]
+        result["unchanged"] = len(objs) - len(changed)
+
+        MatchMetric.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=["match", "team", "metric_type", "period"],
+            update_fields=["value", "source", "confidence", "updated_at"],
+        )
+        Match.objects.filter(id__in=list(rows_by_match)).update(freshness_ts=timezone.now())
+        deltas: Dict[Any, List[Dict[str, Any]]] = {}
+        keys = {type_id: key for key, type_id in metric_types.items()}
+        for o in changed:
+            deltas.setdefault(o.match_id, []).append(
+                {"metric_key": keys[o.metric_type_id], "team": str(o.team_id), "period": o.period, "value": o.value}
+            )
+        scopes = set()
+        live_events = []
+        now = timezone.now()
+        # a hydration that changed nothing leaves cached responses and ETags valid
+        touched = (Match.objects.filter(id__in=list(deltas))
+                   .values_list("id", "utc_kickoff", "competition_id", "status")) if deltas else []
+        for match_id, kickoff, competition_id, status in touched:
+            scopes |= match_scopes(match_id, kickoff, competition_id)
+            if events.is_live(status, kickoff, now):
+                live_events.append(events.metrics_event(match_id, competition_id, status, deltas[match_id]))
+        bump(scopes)
+        events.publish(live_events)
+
+    result["matches"] = len(rows_by_match)
+    result["metrics"] = len(changed)
+    return result
@@ -0,0 +1,36 @@
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Optional
+from django.conf import settings
+
+
+def next_poll_interval(live_count: int, quota: Optional[Dict[str, Optional[int]]] = None, now: datetime = None) -> int:
+    """
+    Seconds until the next live tick.
+
+    Idle when nothing is live. Otherwise each tick costs one fetch_live call plus the
+    stats hydrations it triggers (~ live_count * LIVE_POLL_CHANGE_RATE), and the
+    interval is stretched so the provider's remaining daily quota lasts until UTC
+    midnight. A nearly spent per-minute quota waits for the next minute.
+    Always clamped to [LIVE_POLL_MIN_INTERVAL, LIVE_POLL_MAX_INTERVAL].
+    """
+    if live_count <= 0:
+        return settings.LIVE_POLL_IDLE_INTERVAL
+
+    quota = quota or {}
+    low, high = settings.LIVE_POLL_MIN_INTERVAL, settings.LIVE_POLL_MAX_INTERVAL
+    calls_per_tick = 1 + live_count * settings.LIVE_POLL_CHANGE_RATE
+    interval = float(low)
+
+    remaining = quota.get("daily_remaining")
+    if remaining is not None:
+        if remaining <= calls_per_tick:
+            return high
+        now = now or datetime.now(dt_timezone.utc)
+        seconds_left = 86400 - (now.hour * 3600 + now.minute * 60 + now.second)
+        interval = max(interval, seconds_left * calls_per_tick / remaining)
+
+    minute_remaining = quota.get("minute_remaining")
+    if minute_remaining is not None and minute_remaining < calls_per_tick:
+        interval = max(interval, 60)
+
+    return int(min(high, max(low, interval)))
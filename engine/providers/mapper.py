@@ -1,15 +1,21 @@
 from typing import Dict, Any, List
 from datetime import datetime
 
+# API-Football short status -> MatchStatus. Extra time (ET), its break (BT) and a running
+# shoot-out (P) are still in play; AET and PEN are the finished forms. A suspended or
+# interrupted match is neither live nor finished.
 STATUS_MAP = {
-    "NS":"SCHED","1H":"LIVE","HT":"HT","2H":"LIVE","ET":"AET","FT":"FT",
-    "P":"PEN","AET":"AET","PST":"PPD","CANC":"CANC","ABD":"ABD",
+    "NS":"SCHED","1H":"LIVE","HT":"HT","2H":"LIVE","ET":"LIVE","FT":"FT",
+    "P":"LIVE","AET":"AET","PEN":"PEN","PST":"PPD","CANC":"CANC","ABD":"ABD",
+    "TBD":"SCHED","BT":"HT","LIVE":"LIVE","INT":"SUSP","SUSP":"SUSP","AWD":"FT","WO":"FT",
 }
 
 def normalize_fixture_api_football(fx: Dict[str, Any]) -> Dict[str, Any]:
     fixture = fx.get("fixture", {})
     league = fx.get("league", {})
     teams = fx.get("teams", {})
+    goals = fx.get("goals") or {}
+    status = fixture.get("status") or {}
     ts = fixture.get("timestamp")
     return {
         "provider_id": str(fixture.get("id")),
@@ -19,7 +25,9 @@ def normalize_fixture_api_football(fx: Dict[str, Any]) -> Dict[str, Any]:
         "home_provider_id": str(teams.get("home", {}).get("id")),
         "away_provider_id": str(teams.get("away", {}).get("id")),
         "venue": (fixture.get("venue") or {}).get("name") or "",
-        "status_text": STATUS_MAP.get((fixture.get("status") or {}).get("short", ""), "SCHED"),
+        "status_text": STATUS_MAP.get(status.get("short", ""), "SCHED"),
+        "minute": status.get("elapsed") or 0,
+        "score": [goals.get("home"), goals.get("away")],
     }
 
 def normalize_stats_api_football(stats_payload: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
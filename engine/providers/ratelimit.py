@@ -0,0 +1,117 @@
+import time
+from typing import Any, Dict, Optional
+from django.conf import settings
+from django.core.cache import caches
+
+# seconds a worker may hold a bucket lock; bounds the damage of a crashed holder
+LOCK_TTL = 2
+LOCK_SPINS = 20
+
+
+class TokenBucket:
+    """
+    Token bucket whose state lives in a Django cache, so every worker sharing that
+    cache draws from the same budget.
+    `rate` is tokens per second, `capacity` the burst size. `clock` is injectable for tests.
+    """
+
+    def __init__(self, key: str, rate: float, capacity: float, cache=None, clock=time.time):
+        self.key = f"ratelimit:{key}"
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.cache = cache if cache is not None else caches["shared"]
+        self.clock = clock
+
+    def _lock(self) -> bool:
+        for _ in range(LOCK_SPINS):
+            if self.cache.add(f"{self.key}:lock", 1, timeout=LOCK_TTL):
+                return True
+            time.sleep(0.005)
+        return False
+
+    def _unlock(self) -> None:
+        self.cache.delete(f"{self.key}:lock")
+
+    def _refill(self, now: float):
+        tokens, ts = self.cache.get(self.key) or (self.capacity, now)
+        return min(self.capacity, tokens + max(0.0, now - ts) * self.rate)
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Take `tokens` if available and return 0. Otherwise take nothing and return
+        the number of seconds until they will be (callers reschedule, never sleep).
+        """
+        if not self._lock():
+            return 1.0 / self.rate if self.rate else 1.0
+        try:
+            now = self.clock()
+            available = self._refill(now)
+            if available >= tokens:
+                self.cache.set(self.key, (available - tokens, now), timeout=None)
+                return 0.0
+            self.cache.set(self.key, (available, now), timeout=None)
+            return (tokens - available) / self.rate if self.rate else float("inf")
+        finally:
+            self._unlock()
+
+    def refund(self, tokens: float = 1) -> None:
+        """Give back `tokens` taken by acquire() for a call that did not go ahead."""
+        if not self._lock():
+            return
+        try:
+            now = self.clock()
+            self.cache.set(self.key, (min(self.capacity, self._refill(now) + tokens), now), timeout=None)
+        finally:
+            self._unlock()
+
+    def drain(self, seconds: float) -> None:
+        """Empty the bucket so no worker gets a token for `seconds` (e.g. after an upstream 429)."""
+        if not self._lock():
+            return
+        try:
+            # a negative balance takes `seconds` to refill back to zero
+            self.cache.set(self.key, (-seconds * self.rate, self.clock()), timeout=None)
+        finally:
+            self._unlock()
+
+
+class ProviderRateLimiter:
+    """
+    Per-provider limiter built from settings.PROVIDER_RATE_LIMITS, e.g.
+      {"api_football": {
+          "default": {"per_minute": 300, "burst": 10},        # every call
+          "fixtures/statistics": {"per_minute": 120, "burst": 5},  # additionally, this endpoint
+      }}
+    """
+
+    def __init__(self, provider: str, config: Optional[Dict[str, Any]] = None, cache=None, clock=time.time):
+        if config is None:
+            config = getattr(settings, "PROVIDER_RATE_LIMITS", {}).get(provider, {})
+        self.buckets = {
+            endpoint: TokenBucket(
+                f"{provider}:{endpoint}", rate=conf["per_minute"] / 60.0, capacity=conf.get("burst", 1),
+                cache=cache, clock=clock,
+            )
+            for endpoint, conf in config.items()
+        }
+
+    def acquire(self, endpoint: str) -> float:
+        """0 when the call may go ahead, else seconds to wait before retrying (nothing is spent then)."""
+        taken = []
+        for key in (endpoint.strip("/"), "default"):
+            bucket = self.buckets.get(key)
+            if bucket:
+                wait = bucket.acquire()
+                if wait:
+                    # the call does not happen, so the endpoint token goes back
+                    for spent in taken:
+                        spent.refund()
+                    return wait
+                taken.append(bucket)
+        return 0.0
+
+    def backoff(self, endpoint: str, seconds: float) -> None:
+        """Provider told us to slow down: stop every worker for `seconds`."""
+        bucket = self.buckets.get(endpoint.strip("/")) or self.buckets.get("default")
+        if bucket:
+            bucket.drain(seconds)
@@ -0,0 +1,239 @@
+import functools
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, Iterator, List, Optional
+from django.conf import settings
+
+from .archive import FIXTURE_ENDPOINTS, STATS_ENDPOINTS, RawArchive, read_partition
+from .base import ProviderAdapter, ProviderError, RateLimitError
+
+# synthetic league ids start here so generated data never collides with real provider ids
+SYNTHETIC_LEAGUE_BASE = 900000
+
+
+class SyntheticSource:
+    """
+    Deterministic API-Football-shaped data: `leagues` leagues of `teams` teams playing a
+    double round robin, one round a week from `start`. Fixtures before `now` are
+    finished, the `live` earliest unfinished ones are in play, the rest are scheduled.
+    """
+
+    def __init__(self, leagues: int = 2, teams: int = 20, season: int = 2024, live: int = 10,
+                 start: datetime = None, now: datetime = None, seed: int = 0):
+        self.seed = seed
+        self.season = season
+        self.now = now or datetime.now(dt_timezone.utc)
+        start = start or self.now - timedelta(weeks=teams - 1)
+        self.fixtures: Dict[str, Dict[str, Any]] = {}
+        self.by_league: Dict[str, List[str]] = {}
+        for n in range(leagues):
+            league = SYNTHETIC_LEAGUE_BASE + n
+            ids = self.by_league.setdefault(str(league), [])
+            for rnd, pairs in enumerate(_round_robin(teams)):
+                kickoff = start + timedelta(weeks=rnd)
+                for i, (h, a) in enumerate(pairs):
+                    fid = league * 10000 + rnd * 100 + i
+                    self.fixtures[str(fid)] = self._fixture(fid, league, league * 100 + h, league * 100 + a, kickoff)
+                    ids.append(str(fid))
+
+        upcoming = sorted(
+            (fx for fx in self.fixtures.values() if fx["fixture"]["status"]["short"] == "NS"),
+            key=lambda fx: (fx["fixture"]["timestamp"], fx["fixture"]["id"]),
+        )
+        rng = random.Random(seed)
+        for fx in upcoming[:live]:
+            fx["fixture"]["status"] = {"short": rng.choice(["1H", "HT", "2H"]), "elapsed": rng.randint(1, 90)}
+            fx["goals"] = {"home": rng.randint(0, 2), "away": rng.randint(0, 2)}
+        self.live_ids = [str(fx["fixture"]["id"]) for fx in upcoming[:live]]
+
+    def _fixture(self, fid, league, home, away, kickoff):
+        rng = random.Random(f"{self.seed}:{fid}")
+        played = kickoff + timedelta(hours=2) < self.now
+        return {
+            "fixture": {
+                "id": fid,
+                "timestamp": int(kickoff.timestamp()),
+                "venue": {"name": f"Stadium {home}"},
+                "status": {"short": "FT", "elapsed": 90} if played else {"short": "NS", "elapsed": None},
+            },
+            "league": {"id": league, "season": self.season},
+            "teams": {"home": {"id": home}, "away": {"id": away}},
+            "goals": {"home": rng.randint(0, 4), "away": rng.randint(0, 4)} if played else {"home": None, "away": None},
+        }
+
+    def fixtures_for(self, league, season=None, date_from=None, date_to=None) -> List[Dict[str, Any]]:
+        if season and int(season) != self.season:
+            return []
+        out = []
+        for fid in self.by_league.get(str(league), []):
+            fx = self.fixtures[fid]
+            day = datetime.fromtimestamp(fx["fixture"]["timestamp"], dt_timezone.utc).date().isoformat()
+            if (date_from and day < str(date_from)) or (date_to and day > str(date_to)):
+                continue
+            out.append(fx)
+        return out
+
+    def fixtures_by_ids(self, ids) -> List[Dict[str, Any]]:
+        return [self.fixtures[str(i)] for i in ids if str(i) in self.fixtures]
+
+    def live(self) -> List[Dict[str, Any]]:
+        return [self.fixtures[fid] for fid in self.live_ids]
+
+    def stats(self, fixture_id) -> List[Dict[str, Any]]:
+        fx = self.fixtures.get(str(fixture_id))
+        if not fx or fx["fixture"]["status"]["short"] == "NS":
+            return []
+        rng = random.Random(f"{self.seed}:stats:{fixture_id}")
+        return [
+            {"team": fx["teams"][side], "statistics": [
+                {"type": "Corner Kicks", "value": rng.randint(0, 12)},
+                {"type": "Shots on Goal", "value": rng.randint(0, 10)},
+                {"type": "Yellow Cards", "value": rng.randint(0, 5)},
+                {"type": "Red Cards", "value": rng.choice([0, 0, 0, 1])},
+            ]}
+            for side in ("home", "away")
+        ]
+
+
+class ArchiveSource:
+    """Serves what RawArchive recorded; the latest record for a request wins, live lists are replayed in order."""
+
+    def __init__(self, root, provider: str = "api_football"):
+        self.fixture_lists: Dict[tuple, List[Dict[str, Any]]] = {}
+        self.fixtures: Dict[str, Dict[str, Any]] = {}
+        self.live_lists: List[List[Dict[str, Any]]] = []
+        self.statistics: Dict[str, Any] = {}
+        self._live_lock = threading.Lock()
+        self._live_pos = 0
+        for path in RawArchive(root, provider).partitions():
+            for record in read_partition(path):
+                params, response = record["params"], record["response"]
+                if record["endpoint"] in STATS_ENDPOINTS:
+                    self.statistics[str(params.get("fixture"))] = response
+                elif record["endpoint"] in FIXTURE_ENDPOINTS and isinstance(response, list):
+                    for fx in response:
+                        self.fixtures[str((fx.get("fixture") or {}).get("id"))] = fx
+                    if params.get("live"):
+                        self.live_lists.append(response)
+                    elif params.get("league"):
+                        self.fixture_lists[(str(params["league"]), str(params.get("season") or ""))] = response
+
+    def fixtures_for(self, league, season=None, date_from=None, date_to=None) -> List[Dict[str, Any]]:
+        return self.fixture_lists.get((str(league), str(season or "")), [])
+
+    def fixtures_by_ids(self, ids) -> List[Dict[str, Any]]:
+        return [self.fixtures[str(i)] for i in ids if str(i) in self.fixtures]
+
+    def live(self) -> List[Dict[str, Any]]:
+        if not self.live_lists:
+            return []
+        with self._live_lock:
+            response = self.live_lists[self._live_pos % len(self.live_lists)]
+            self._live_pos += 1
+        return response
+
+    def stats(self, fixture_id) -> Any:
+        return self.statistics.get(str(fixture_id), [])
+
+
+class Faults:
+    """Injected latency (seconds, +/- jitter) and the share of calls answered with a 429 or a 5xx."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, rate_limit_rate: float = 0.0,
+                 error_rate: float = 0.0, retry_after: int = 1, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> Optional[str]:
+        """Sleep for the configured latency, then return "rate_limit", "error" or None."""
+        with self._lock:
+            roll = self._rng.random()
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+        if delay:
+            time.sleep(delay)
+        if roll < self.rate_limit_rate:
+            return "rate_limit"
+        if roll < self.rate_limit_rate + self.error_rate:
+            return "error"
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_source(source: str, options: tuple):
+    return build_source(source, cache=False, **dict(options))
+
+
+def build_source(source: str = "synthetic", cache: bool = True, **options):
+    """A SyntheticSource or ArchiveSource; identical configurations share one instance per process."""
+    if cache:
+        return _cached_source(source, tuple(sorted(options.items())))
+    if source == "archive":
+        return ArchiveSource(options.get("root") or settings.PROVIDER_ARCHIVE_ROOT, options.get("provider", "api_football"))
+    if source == "synthetic":
+        keys = ("leagues", "teams", "season", "live", "seed")
+        return SyntheticSource(**{k: options[k] for k in keys if k in options})
+    raise ValueError(f"Unknown replay source: {source}")
+
+
+class ReplayAdapter(ProviderAdapter):
+    """
+    Offline stand-in for APIFootballAdapter: serves a SyntheticSource or ArchiveSource
+    through the same interface, with the latency, 429s and errors of `faults`.
+    Configure it with settings.PROVIDER_REPLAY and select it with
+    PROVIDER_ADAPTER = "providers.replay.ReplayAdapter".
+    """
+
+    name = "api_football"
+
+    def __init__(self, source=None, faults: Faults = None, **kwargs):
+        super().__init__()
+        config = dict(getattr(settings, "PROVIDER_REPLAY", {}))
+        self.source = source or build_source(**config.get("source", {}))
+        self.faults = faults or Faults(**config.get("faults", {}))
+        self.quota: Dict[str, Optional[int]] = {}
+        self.calls = 0
+
+    def _call(self, fetch, *args, **kwargs):
+        self.calls += 1
+        fault = self.faults.draw()
+        if fault == "rate_limit":
+            raise RateLimitError("Injected rate limit", retry_after=self.faults.retry_after)
+        if fault == "error":
+            raise ProviderError("Injected provider error")
+        return fetch(*args, **kwargs)
+
+    def fetch_fixtures(self, competition_provider_id: str, date_from: str = None, date_to: str = None,
+                       season: int = None) -> List[Dict[str, Any]]:
+        return self._call(self.source.fixtures_for, competition_provider_id, season, date_from, date_to)
+
+    def fetch_live(self) -> List[Dict[str, Any]]:
+        return self._call(self.source.live)
+
+    def fetch_match_stats(self, match_provider_id: str, final: bool = False) -> Dict[str, Any]:
+        return self._call(self.source.stats, match_provider_id)
+
+    def fetch_fixtures_by_ids(self, ids: List[int]) -> List[dict]:
+        out = []
+        for i in range(0, len(ids), 20):
+            out.extend(self._call(self.source.fixtures_by_ids, ids[i:i + 20]))
+        return out
+
+    def iter_fixtures_by_ids(self, ids: List[int]) -> Iterator[Dict[str, Any]]:
+        return iter(self.fetch_fixtures_by_ids(ids))
+
+
+def _round_robin(n: int):
+    """Circle-method double round robin over teams 0..n-1 (n even): a list of rounds of (home, away)."""
+    teams = list(range(n))
+    rounds = []
+    for _ in range(n - 1):
+        rounds.append([(teams[i], teams[n - 1 - i]) for i in range(n // 2)])
+        teams = [teams[0]] + [teams[-1]] + teams[1:-1]
+    return rounds + [[(a, h) for h, a in rnd] for rnd in rounds]
@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+
+from competitions.models import Competition, Season
+from metrics.models import MetricType
+from teams.models import Team
+
+
+class IdentityMap:
+    """
+    Process-local LRU + TTL map of lookup keys to primary keys, e.g.
+      ("api_football", "team", "33")  -> Team.id
+      ("season", <competition id>, "2024") -> Season.id
+      ("metric", "corners")           -> MetricType.id
+    Each worker process has its own copy; TTL bounds staleness across processes.
+    """
+
+    def __init__(self, max_size: int = 50000, ttl: float = 900, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._data: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Return {key: value} for the keys present and fresh; the rest count as misses."""
+        now = self.clock()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is not None and entry[1] > now:
+                    self._data.move_to_end(key)
+                    found[key] = entry[0]
+                    self.hits += 1
+                else:
+                    if entry is not None:
+                        del self._data[key]
+                        self.evictions += 1
+                    self.misses += 1
+        return found
+
+    def get(self, key: Hashable, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def set_many(self, mapping: Dict[Hashable, Any]) -> None:
+        expires = self.clock() + self.ttl
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = (value, expires)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.set_many({key: value})
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def invalidate_value(self, value: Any) -> None:
+        """Drop every key pointing at `value` (e.g. a team pk that was renamed or deleted)."""
+        with self._lock:
+            for key in [k for k, (v, _) in self._data.items() if v == value]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "size": len(self._data),
+        }
+
+
+identities = IdentityMap(
+    max_size=getattr(settings, "IDENTITY_MAP_MAX_SIZE", 50000),
+    ttl=getattr(settings, "IDENTITY_MAP_TTL", 900),
+)
+
+
+def _invalidate_instance(sender, instance, **kwargs):
+    identities.invalidate_value(instance.pk)
+
+
+# a renamed/deleted row drops out of this process' map; other workers rely on the TTL
+for _model in (Team, Competition, Season, MetricType):
+    post_save.connect(_invalidate_instance, sender=_model, dispatch_uid=f"identity-map-save-{_model.__name__}")
+    post_delete.connect(_invalidate_instance, sender=_model, dispatch_uid=f"identity-map-delete-{_model.__name__}")
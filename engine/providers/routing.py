@@ -0,0 +1,50 @@
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+
+from matches.models import Match, FINISHED_STATUSES, IN_PLAY_STATUSES
+
+LIVE, HYDRATION, BACKFILL = "live", "hydration", "backfill"
+
+LIVE_TASKS = {"providers.tasks.poll_live", "providers.tasks.flush_hydrations"}
+BACKFILL_TASKS = {"providers.tasks.backfill_chunk"}
+HYDRATION_TASKS = {"providers.tasks.hydrate_match_stats", "providers.tasks.hydrate_matches_stats"}
+
+
+def _any_live(match_ids) -> bool:
+    """True when one of the matches is in play, or finished after kicking off within the last LIVE_ROUTING_WINDOW seconds."""
+    if isinstance(match_ids, (str, bytes)) or not hasattr(match_ids, "__iter__"):
+        match_ids = [match_ids]
+    recent = timezone.now() - timedelta(seconds=settings.LIVE_ROUTING_WINDOW)
+    try:
+        return Match.objects.filter(id__in=list(match_ids)).filter(
+            Q(status__in=IN_PLAY_STATUSES) | Q(status__in=FINISHED_STATUSES, utc_kickoff__gte=recent)
+        ).exists()
+    except (ValidationError, ValueError):
+        return False
+
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """
+    Celery router (settings.CELERY_TASK_ROUTES):
+      - the live loop and hydration flushes go to "live";
+      - stats hydration goes to "live" when a match is in play or just finished, else "hydration";
+      - a fixture sync for a window that ended before today, and backfill chunks, go to "backfill";
+      - everything else falls through to CELERY_TASK_DEFAULT_QUEUE.
+    An explicit queue= passed to apply_async always wins.
+    """
+    args, kwargs = args or (), kwargs or {}
+    if name in LIVE_TASKS:
+        return {"queue": LIVE}
+    if name in BACKFILL_TASKS:
+        return {"queue": BACKFILL}
+    if name in HYDRATION_TASKS:
+        ids = args[0] if args else kwargs.get("match_id", kwargs.get("match_ids"))
+        return {"queue": LIVE if ids and _any_live(ids) else HYDRATION}
+    if name == "providers.tasks.sync_fixtures_for_league":
+        date_to = args[2] if len(args) > 2 else kwargs.get("date_to")
+        past = bool(date_to) and str(date_to) < date.today().isoformat()
+        return {"queue": BACKFILL if past else HYDRATION}
+    return None
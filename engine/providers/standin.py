@@ -0,0 +1,121 @@
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from django.conf import settings
+from django.core.cache import caches
+
+from .api_football import APIFootballAdapter
+from .breaker import ProviderCircuitBreaker
+from .cache import ResponseCache
+from .ratelimit import ProviderRateLimiter
+from .replay import Faults
+
+logger = logging.getLogger(__name__)
+
+
+class StandInServer:
+    """
+    Local HTTP stand-in for the API-Football endpoints the adapter uses (/fixtures and
+    /fixtures/statistics), serving a replay source in the provider's envelope with
+    injected latency, 429s (with Retry-After) and 500s. Point the real adapter at it:
+        APIFootballAdapter(api_key="local", base_url=server.url)
+    """
+
+    def __init__(self, source, faults: Faults = None, host: str = "127.0.0.1", port: int = 0, daily_quota: int = 75000):
+        self.source = source
+        self.faults = faults or Faults()
+        self.remaining = daily_quota
+        self.daily_quota = daily_quota
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="provider-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self.httpd.serve_forever()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def respond(self, path: str, params: dict):
+        """(status, headers, body) for one request."""
+        with self._lock:
+            self.remaining = max(0, self.remaining - 1)
+            headers = {
+                "x-ratelimit-requests-limit": str(self.daily_quota),
+                "x-ratelimit-requests-remaining": str(self.remaining),
+            }
+        fault = self.faults.draw()
+        if fault == "rate_limit":
+            return 429, {**headers, "Retry-After": str(self.faults.retry_after)}, {"message": "Too many requests"}
+        if fault == "error":
+            return 500, headers, {"message": "Injected error"}
+
+        endpoint = path.strip("/")
+        if endpoint == "fixtures/statistics":
+            response = self.source.stats(params.get("fixture"))
+        elif endpoint == "fixtures" and params.get("live"):
+            response = self.source.live()
+        elif endpoint == "fixtures" and params.get("ids"):
+            response = self.source.fixtures_by_ids(params["ids"].split("-"))
+        elif endpoint == "fixtures" and params.get("league"):
+            response = self.source.fixtures_for(params["league"], params.get("season"), params.get("from"), params.get("to"))
+        else:
+            return 404, headers, {"message": f"Unknown endpoint {endpoint}"}
+        return 200, headers, {
+            "get": endpoint, "parameters": params, "errors": [],
+            "results": len(response), "paging": {"current": 1, "total": 1}, "response": response,
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                status, headers, body = server.respond(url.path, params)
+                blob = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(blob)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(blob)
+
+            def log_message(self, fmt, *args):
+                logger.debug("stand-in: " + fmt, *args)
+
+        return Handler
+
+
+class StandInAdapter(APIFootballAdapter):
+    """
+    The real API-Football adapter (HTTP, streaming, quota tracking) pointed at a
+    StandInServer at settings.PROVIDER_STANDIN_URL. The local limiter, response cache
+    and archive are off, so every call reaches the stand-in and its injected faults;
+    the circuit breaker keeps its state in this process only.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(api_key="stand-in", base_url=settings.PROVIDER_STANDIN_URL, **kwargs)
+        self.limiter = ProviderRateLimiter(self.name, config={})
+        self.response_cache = ResponseCache(self.name, ttls={}, cache=caches["default"])
+        self.breaker = ProviderCircuitBreaker(self.name, cache=caches["default"])
+        self.archive = None
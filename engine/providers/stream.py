@@ -0,0 +1,123 @@
+import json
+import re
+from typing import Iterable, Iterator, List
+
+try:  # optional fast decoder
+    import orjson
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - depends on the environment
+    loads = json.loads
+
+# the only bytes that change the parser state; everything else is skipped by the regex
+_TOKENS = re.compile(rb'[\\"\[\]{}]')
+_QUOTE, _BACKSLASH = ord('"'), ord("\\")
+_OPEN = {ord("["), ord("{")}
+
+SEEK, ARRAY, DONE = "seek", "array", "done"
+
+
+class ResponseArrayParser:
+    """
+    Incremental splitter for a provider envelope such as
+      {"get": "fixtures", ..., "response": [{...}, {...}, ...]}
+    Feed it raw body chunks; it returns the raw bytes of each complete object of the
+    top-level `key` array as soon as its closing brace arrives, and only ever buffers
+    the item being read. Non-object array members are ignored.
+    """
+
+    def __init__(self, key: str = "response"):
+        self.key = key.encode()
+        self.buf = bytearray()
+        self.pos = 0           # next offset to scan
+        self.skip_to = 0       # byte after a backslash escape
+        self.depth = 0
+        self.in_string = False
+        self.str_start = 0
+        self.last_string = None
+        self.last_string_end = 0
+        self.item_start = None
+        self.state = SEEK
+
+    @property
+    def done(self) -> bool:
+        return self.state == DONE
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        if self.state == DONE:
+            return []
+        self.buf += chunk
+        buf, out = self.buf, []
+        self.pos = len(buf)
+        for m in _TOKENS.finditer(buf, self.pos - len(chunk)):
+            i = m.start()
+            if i < self.skip_to:
+                continue
+            c = buf[i]
+            if self.in_string:
+                if c == _BACKSLASH:
+                    self.skip_to = i + 2
+                elif c == _QUOTE:
+                    self.in_string = False
+                    if self.state == SEEK and self.depth == 1:
+                        self.last_string = bytes(buf[self.str_start + 1:i])
+                        self.last_string_end = i + 1
+                continue
+            if c == _QUOTE:
+                self.in_string, self.str_start = True, i
+            elif c in _OPEN:
+                self.depth += 1
+                if self.state == ARRAY:
+                    if self.depth == 3 and c != ord("[") and self.item_start is None:
+                        self.item_start = i
+                elif (self.depth == 2 and c == ord("[") and self.last_string == self.key
+                      and buf[self.last_string_end:i].strip() == b":"):
+                    self.state = ARRAY
+            elif c != _BACKSLASH:
+                self.depth -= 1
+                if self.state == ARRAY:
+                    if self.depth == 2 and self.item_start is not None:
+                        out.append(bytes(buf[self.item_start:i + 1]))
+                        self.item_start = None
+                    elif self.depth == 1:
+                        self.state = DONE
+                        break
+        self._trim()
+        return out
+
+    def _trim(self) -> None:
+        # the envelope before the array is tiny; inside it keep only the current item
+        if self.state != ARRAY:
+            return
+        keep = self.item_start if self.item_start is not None else self.pos
+        if keep:
+            del self.buf[:keep]
+            self.pos -= keep
+            self.skip_to = max(0, self.skip_to - keep)
+            self.str_start -= keep
+            if self.item_start is not None:
+                self.item_start = 0
+
+
+class IncompleteResponse(ValueError):
+    """The body ended before the array was closed (dropped connection, truncated proxy response)."""
+
+
+def iter_raw_items(chunks: Iterable[bytes], key: str = "response") -> Iterator[bytes]:
+    """
+    Raw bytes of each object in the envelope's `key` array, read from an iterable of
+    body chunks. An envelope without that array yields nothing; a truncated one raises
+    IncompleteResponse after the complete items.
+    """
+    parser = ResponseArrayParser(key)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+    if parser.state == ARRAY:
+        raise IncompleteResponse(f"body ended inside the {key!r} array")
+
+
+def iter_items(chunks: Iterable[bytes], key: str = "response") -> Iterator[dict]:
+    """Decoded objects of the envelope's `key` array (orjson when installed)."""
+    for raw in iter_raw_items(chunks, key):
+        yield loads(raw)
@@ -1,62 +1,60 @@
 import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from celery import shared_task
-from django.db import transaction
-from django.utils.dateparse import parse_datetime
-from .api_football import APIFootballAdapter, RateLimitError, ProviderError
+from django.conf import settings
+from django.core.cache import caches
+from .backfill import MAX_RATE_WAITS, pending, plan_stats, run_chunk
+from .base import ProviderError, RateLimitError, adapter_class, get_adapter
+from .breaker import ProviderCircuitBreaker
+from .dedupe import PendingSet, enqueue_once
 from .mapper import normalize_fixture_api_football, normalize_stats_api_football
-from matches.models import Match, MatchStatus
-from metrics.models import MatchMetric, MetricType
-from teams.models import Team
-from competitions.models import Competition, Season
+from .ingest import upsert_fixtures, upsert_fixtures_stream, upsert_match_metrics
+from .live import next_poll_interval
+from .resolver import identities
+from core import events
+from core.locks import LockTimeout, cache_lock
+from core.models import BackfillCheckpoint
+from matches.models import Match, FINISHED_STATUSES, IN_PLAY_STATUSES
 
 logger = logging.getLogger(__name__)
 
+# seconds between checks of a sync waiting for another window of its league to finish
+SYNC_WAIT_INTERVAL = 30
+
 @shared_task(bind=True, max_retries=5, default_retry_delay=10)
 def sync_fixtures_for_league(self, competition_provider_id, date_from=None, date_to=None):
-    adapter = APIFootballAdapter()
-    try:
-        fixtures = adapter.fetch_fixtures(competition_provider_id, date_from=date_from, date_to=date_to)
-    except RateLimitError as e:
-        logger.warning("Rate limited; retrying: %s", e)
-        raise self.retry(exc=e, countdown=30)
-    except ProviderError as e:
-        logger.error("Provider error: %s", e)
-        return
-
-    for fx in fixtures:
-        norm = normalize_fixture_api_football(fx)
-        with transaction.atomic():
-            # find or create competition/season by provider refs
-            comp, _ = Competition.objects.get_or_create(
-                provider_refs__contains={adapter.name: {"league_id": norm["competition_provider_id"]}},
-                defaults={"name": str(norm.get("competition_provider_id"))}
+    # at most one sync per league at a time: the same window again is redundant, another
+    # window waits for the running one (the shared cache records which window that is)
+    cache = caches["shared"]
+    window_key, window = f"sync:{competition_provider_id}:window", [date_from, date_to]
+    with cache_lock(f"sync:{competition_provider_id}", settings.SYNC_LOCK_TTL, wait=False) as held:
+        if not held:
+            if cache.get(window_key) == window:
+                logger.info("Sync for league %s already running; skipped", competition_provider_id)
+                return {"status": "already running"}
+            logger.info("Another sync for league %s is running; retrying", competition_provider_id)
+            raise self.retry(
+                countdown=SYNC_WAIT_INTERVAL, max_retries=settings.SYNC_LOCK_TTL // SYNC_WAIT_INTERVAL,
             )
-            season, _ = Season.objects.get_or_create(competition=comp, name=str(norm.get("season_name") or ""), defaults={"year_start": 0, "year_end": 0})
-            # map teams by provider id (create placeholders if unknown)
-            home_team, _ = Team.objects.get_or_create(provider_refs__contains={adapter.name: {"team_id": norm["home_provider_id"]}}, defaults={"name": f"team-{norm['home_provider_id']}"})
-            away_team, _ = Team.objects.get_or_create(provider_refs__contains={adapter.name: {"team_id": norm["away_provider_id"]}}, defaults={"name": f"team-{norm['away_provider_id']}"})
-
-            kick = norm["utc_kickoff"]
-            if isinstance(kick, str):
-                kick = parse_datetime(kick)
-
-            match, _ = Match.objects.update_or_create(
-                provider_refs__contains={adapter.name: {"fixture_id": norm["provider_id"]}},
-                defaults={
-                    "competition": comp,
-                    "season": season,
-                    "utc_kickoff": kick,
-                    "home": home_team,
-                    "away": away_team,
-                    "venue": norm.get("venue") or "",
-                    "status": MatchStatus.SCHEDULED,
-                }
-            )
-            # stamp provider id in provider_refs (ensure provider_refs dict)
-            refs = match.provider_refs or {}
-            refs.setdefault(adapter.name, {})["fixture_id"] = norm["provider_id"]
-            match.provider_refs = refs
-            match.save(update_fields=["provider_refs"])
+
+        cache.set(window_key, window, timeout=settings.SYNC_LOCK_TTL)
+        adapter = get_adapter()
+        try:
+            fixtures = adapter.iter_fixtures(competition_provider_id, date_from=date_from, date_to=date_to)
+            # fixtures are decoded, normalized and written in batches as the body streams in
+            result = upsert_fixtures_stream(adapter.name, (normalize_fixture_api_football(fx) for fx in fixtures))
+        except RateLimitError as e:
+            logger.warning("Rate limited; retrying: %s", e)
+            raise self.retry(exc=e, countdown=e.retry_after or 30)
+        except ProviderError as e:
+            logger.error("Provider error: %s", e)
+            return
+        finally:
+            cache.delete(window_key)
+
+    logger.info("Synced league %s: %s (identity map %s)", competition_provider_id, result, identities.stats())
+    return result
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=5)
 def hydrate_match_stats(self, match_id):
@@ -64,7 +62,7 @@ def hydrate_match_stats(self, match_id):
     Given our Match.id, look up provider fixture id and call provider stats,
     then write MatchMetric rows.
     """
-    adapter = APIFootballAdapter()
+    adapter = get_adapter()
     try:
         match = Match.objects.get(id=match_id)
     except Match.DoesNotExist:
@@ -78,35 +76,192 @@ def hydrate_match_stats(self, match_id):
         return
 
     try:
-        raw_stats = adapter.fetch_match_stats(fixture_id)
+        raw_stats = adapter.fetch_match_stats(fixture_id, final=match.status in FINISHED_STATUSES)
     except RateLimitError as e:
-        raise self.retry(exc=e, countdown=30)
+        raise self.retry(exc=e, countdown=e.retry_after or 30)
     except ProviderError as e:
         logger.error("Provider error fetching stats for %s: %s", match_id, e)
         return
 
     rows = normalize_stats_api_football(raw_stats)
+    return upsert_match_metrics(adapter.name, {match.id: rows})
 
-    # Bulk upsert metrics
-    with transaction.atomic():
-        for r in rows:
-            # Map team_provider_id -> Team object
-            team_q = Team.objects.filter(provider_refs__contains={adapter.name: {"team_id": r["team_provider_id"]}})
-            team = team_q.first()
-            if not team:
-                # Create placeholder
-                team = Team.objects.create(name=f"team-{r['team_provider_id']}", provider_refs={adapter.name: {"team_id": r["team_provider_id"]}})
-
-            # Get metric_type by key (create if unknown)
-            mtype, _ = MetricType.objects.get_or_create(key=r["metric_key"], defaults={"display_name": r["metric_key"], "unit": "count"})
-            MatchMetric.objects.update_or_create(
-                match=match,
-                team=team,
-                metric_type=mtype,
-                period=r.get("period", "FT"),
-                defaults={"value": r["value"], "source": adapter.name, "confidence": 1.0}
-            )
+@shared_task(bind=True)
+def hydrate_matches_stats(self, match_ids):
+    """
+    Batch variant of hydrate_match_stats: fetch statistics for many matches concurrently
+    (at most PROVIDER_MAX_IN_FLIGHT requests at a time) and write them in one bulk upsert.
+    A match whose fetch fails is re-queued on its own via hydrate_match_stats.
+    """
+    max_in_flight = getattr(settings, "PROVIDER_MAX_IN_FLIGHT", 8)
+    adapter = get_adapter(pool_maxsize=max_in_flight)
+
+    fixtures = {}
+    for mid, refs, status in Match.objects.filter(id__in=match_ids).values_list("id", "provider_refs", "status"):
+        fixture_id = ((refs or {}).get(adapter.name) or {}).get("fixture_id")
+        if fixture_id:
+            fixtures[mid] = (fixture_id, status in FINISHED_STATUSES)
+        else:
+            logger.warning("No fixture id for match %s in provider %s", mid, adapter.name)
+
+    rows_by_match, failed = {}, []
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        futures = {pool.submit(adapter.fetch_match_stats, fid, final=final): mid for mid, (fid, final) in fixtures.items()}
+        for fut in as_completed(futures):
+            mid = futures[fut]
+            try:
+                rows_by_match[mid] = normalize_stats_api_football(fut.result())
+            except RateLimitError as e:
+                logger.warning("Rate limited fetching stats for %s; re-queued: %s", mid, e)
+                hydrate_match_stats.apply_async((str(mid),), countdown=e.retry_after or 30)
+                failed.append(mid)
+            except ProviderError as e:
+                logger.error("Provider error fetching stats for %s; re-queued: %s", mid, e)
+                hydrate_match_stats.apply_async((str(mid),), countdown=5)
+                failed.append(mid)
+
+    result = upsert_match_metrics(adapter.name, rows_by_match)
+    result["failed"] = len(failed)
+    return result
+
+LIVE_LEASE_KEY = "live-poll:lease"
+
+@shared_task(bind=True)
+def poll_live(self, loop_id=None):
+    """
+    One tick of the live loop: a single fetch_live call, one bulk upsert of status and
+    minute for every in-play match, stats hydration only for matches whose score or
+    state changed, then reschedule itself with an interval adapted to the number of
+    live matches and the remaining provider quota.
+    Starting a second loop while one holds the lease is a no-op.
+    """
+    cache = caches["shared"]
+    loop_id = loop_id or uuid.uuid4().hex
+    owner = cache.get(LIVE_LEASE_KEY)
+    if owner is None:
+        if not cache.add(LIVE_LEASE_KEY, loop_id, timeout=settings.LIVE_POLL_IDLE_INTERVAL + 60):
+            return {"status": "another live loop is running"}
+    elif owner != loop_id:
+        return {"status": "another live loop is running"}
+
+    def reschedule(countdown):
+        cache.set(LIVE_LEASE_KEY, loop_id, timeout=countdown + 60)
+        poll_live.apply_async(kwargs={"loop_id": loop_id}, countdown=countdown)
+
+    adapter = get_adapter()
+    try:
+        live = adapter.fetch_live()
+    except RateLimitError as e:
+        reschedule(e.retry_after or settings.LIVE_POLL_MAX_INTERVAL)
+        return {"status": "rate limited"}
+    except ProviderError as e:
+        logger.error("Provider error polling live fixtures: %s", e)
+        reschedule(settings.LIVE_POLL_MAX_INTERVAL)
+        return {"status": "provider error"}
+
+    normalized = [normalize_fixture_api_football(fx) for fx in (live or [])]
+
+    # matches we still think are in play but that dropped off the live list have just
+    # finished (or been suspended): refresh them by id so they do not stay LIVE forever
+    live_ids = {n["provider_id"] for n in normalized}
+    dropped = [
+        fid for fid in (
+            ((refs or {}).get(adapter.name) or {}).get("fixture_id")
+            for refs in Match.objects.filter(status__in=IN_PLAY_STATUSES).values_list("provider_refs", flat=True)
+        )
+        if fid and str(fid) not in live_ids
+    ]
+    if dropped:
+        try:
+            normalized += [normalize_fixture_api_football(fx) for fx in adapter.fetch_fixtures_by_ids(dropped)]
+        except ProviderError as e:
+            logger.warning("Could not refresh %s fixtures that left the live list: %s", len(dropped), e)
+
+    changed = set()
+    result = upsert_fixtures(adapter.name, normalized, changed=changed)
+    request_hydration(changed)
+    # the loop holds the lease, so exactly one worker trims the live feed
+    events.prune()
+
+    interval = next_poll_interval(len(live_ids), adapter.quota)
+    reschedule(interval)
+    return {**result, "live": len(live_ids), "hydrating": len(changed), "next_in": interval}
+
+hydration_queue = PendingSet("hydrate_matches_stats")
+
+
+def provider_breaker() -> ProviderCircuitBreaker:
+    """The shared circuit breakers of the configured provider, for schedulers deciding what to enqueue."""
+    return ProviderCircuitBreaker(adapter_class().name)
+
+
+def request_sync(competition_provider_id, date_from=None, date_to=None, **options):
+    """
+    Enqueue sync_fixtures_for_league unless the same league and window were enqueued
+    within TASK_DEDUPE_WINDOW, or the provider's fixtures circuit is open.
+    """
+    if provider_breaker().is_open("fixtures"):
+        logger.info("Fixtures circuit open; sync for league %s not enqueued", competition_provider_id)
+        return None
+    return enqueue_once(
+        sync_fixtures_for_league, args=(str(competition_provider_id), date_from, date_to), **options,
+    )
+
+
+def request_hydration(match_ids) -> bool:
+    """
+    Ask for stats hydration of `match_ids`. Requests arriving within
+    HYDRATION_COALESCE_DELAY seconds are merged, so duplicates cost nothing and the
+    whole set is fetched by one batched hydrate_matches_stats. True when this call
+    scheduled the flush.
+    """
+    # while the stats circuit is open, collect requests until it is due a trial call
+    delay = max(settings.HYDRATION_COALESCE_DELAY, provider_breaker().status("fixtures/statistics")["retry_after"])
+    try:
+        scheduled = hydration_queue.add(match_ids, flush_within=delay)
+    except LockTimeout:
+        # the set is stuck behind its lock: hydrate these on their own rather than drop them
+        logger.warning("Hydration queue locked; enqueueing %s matches uncoalesced", len(match_ids))
+        hydrate_matches_stats.apply_async(args=(sorted(str(i) for i in match_ids),), countdown=delay)
+        return False
+    if not scheduled:
+        return False
+    flush_hydrations.apply_async(countdown=delay)
+    return True
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=1)
+def flush_hydrations(self):
+    """Turn the pending hydration requests into batched hydrate_matches_stats tasks."""
+    try:
+        ids = sorted(hydration_queue.pop())
+    except LockTimeout as e:
+        raise self.retry(exc=e)
+    size = settings.HYDRATION_BATCH_MAX
+    for i in range(0, len(ids), size):
+        hydrate_matches_stats.delay(ids[i:i + size])
+    return len(ids)
+
+@shared_task(bind=True, acks_late=True, max_retries=MAX_RATE_WAITS)
+def backfill_chunk(self, checkpoint_id, chunk_size=50):
+    """
+    Celery counterpart of `manage.py backfill` for one checkpoint. A finished fixtures
+    chunk plans its season's stats chunks and enqueues them. Out of rate budget, the
+    chunk is retried after the limiter's retry_after rather than waited for in the worker.
+    """
+    try:
+        result = run_chunk(checkpoint_id, wait_for_budget=False)
+    except RateLimitError as e:
+        logger.info("Backfill chunk %s rate limited; retrying: %s", checkpoint_id, e)
+        raise self.retry(exc=e, countdown=e.retry_after or 30)
+    if result["phase"] == BackfillCheckpoint.Phase.FIXTURES and result["status"] == BackfillCheckpoint.Status.DONE:
+        cp = BackfillCheckpoint.objects.get(id=checkpoint_id)
+        plan_stats(cp.provider, cp.league, cp.season, chunk_size)
+        for stats_id in pending(cp.provider, BackfillCheckpoint.Phase.STATS, [cp.league], [cp.season]):
+            enqueue_once(backfill_chunk, args=(str(stats_id), chunk_size))
+    return result
 
-    # finally, mark freshness_ts on match
-    match.freshness_ts = match.updated_at
-    match.save(update_fields=["freshness_ts"])
+@shared_task
+def identity_map_stats():
+    """Hit/miss counters of the resolver cache in the worker process that runs this task."""
+    return identities.stats()
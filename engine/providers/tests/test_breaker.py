@@ -0,0 +1,123 @@
+from unittest import mock
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..api_football import APIFootballAdapter
+from ..base import CircuitOpenError, ProviderError, RateLimitError
+from ..breaker import CLOSED, HALF_OPEN, OPEN, ProviderCircuitBreaker
+from ..cache import ResponseCache
+from ..ratelimit import ProviderRateLimiter
+from ..tasks import request_sync, sync_fixtures_for_league
+from core.tests.helpers import FakeClock, local_cache
+
+
+CONFIG = {"failure_threshold": 3, "slow_call_seconds": 2, "open_seconds": 30}
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = ProviderCircuitBreaker("api_football", config=CONFIG, cache=local_cache(), clock=self.clock)
+
+    def fail(self, times, endpoint="fixtures"):
+        for _ in range(times):
+            self.breaker.record(endpoint, ok=False)
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail(2)
+        self.breaker.record("fixtures", ok=True)
+        self.fail(2)
+        self.assertEqual(self.breaker.allow("fixtures"), 0.0)
+        self.fail(1)
+        self.assertEqual(self.breaker.allow("fixtures"), 30.0)
+        self.assertEqual(self.breaker.status("fixtures")["state"], OPEN)
+        # other endpoints keep their own circuit
+        self.assertEqual(self.breaker.allow("fixtures/statistics"), 0.0)
+
+    def test_slow_calls_count_as_failures(self):
+        for _ in range(3):
+            self.breaker.record("fixtures", ok=True, elapsed=2.5)
+        self.assertTrue(self.breaker.is_open("fixtures"))
+
+    def test_half_open_lets_one_trial_through(self):
+        self.fail(3)
+        self.clock.now += 10
+        self.assertEqual(self.breaker.allow("fixtures"), 20.0)
+        self.clock.now += 20
+        self.assertEqual(self.breaker.status("fixtures")["state"], HALF_OPEN)
+        self.assertEqual(self.breaker.allow("fixtures"), 0.0)
+        self.assertGreater(self.breaker.allow("fixtures"), 0.0)
+
+        self.breaker.record("fixtures", ok=True)
+        self.assertEqual(self.breaker.status("fixtures"), {"state": CLOSED, "failures": 0, "retry_after": 0.0})
+
+    def test_failed_trial_reopens(self):
+        self.fail(3)
+        self.clock.now += 30
+        self.assertEqual(self.breaker.allow("fixtures"), 0.0)
+        self.breaker.record("fixtures", ok=False)
+        self.assertEqual(self.breaker.allow("fixtures"), 30.0)
+
+
+class AdapterCircuitTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.adapter = APIFootballAdapter(api_key="test", base_url="http://provider.test")
+        self.adapter.archive = None
+        self.adapter.limiter = mock.Mock(spec=ProviderRateLimiter, acquire=mock.Mock(return_value=0.0))
+        self.adapter.breaker = ProviderCircuitBreaker(self.adapter.name, config=CONFIG, cache=local_cache(), clock=self.clock)
+        self.adapter.response_cache = ResponseCache(
+            self.adapter.name, ttls={"fixtures": 60}, cache=local_cache(), clock=self.clock,
+        )
+
+    def test_open_circuit_fails_fast(self):
+        error = mock.Mock(status_code=503, ok=False, headers={}, text="down")
+        with mock.patch.object(self.adapter.session, "get", return_value=error) as get:
+            for _ in range(3):
+                with self.assertRaises(ProviderError):
+                    self.adapter.fetch_live()
+            with self.assertRaises(CircuitOpenError) as ctx:
+                self.adapter.fetch_live()
+        self.assertEqual(get.call_count, 3)
+        self.assertEqual(ctx.exception.retry_after, 30)
+
+    def test_rate_limits_do_not_open_the_circuit(self):
+        limited = mock.Mock(status_code=429, ok=False, headers={"Retry-After": "1"}, text="")
+        with mock.patch.object(self.adapter.session, "get", return_value=limited):
+            for _ in range(5):
+                with self.assertRaises(RateLimitError):
+                    self.adapter.fetch_live()
+        self.assertFalse(self.adapter.breaker.is_open("fixtures"))
+
+    def test_stale_entry_is_served_while_open(self):
+        ok = mock.Mock(status_code=200, ok=True, headers={}, json=lambda: {"response": [{"id": 1}]})
+        with mock.patch.object(self.adapter.session, "get", return_value=ok):
+            fresh = self.adapter.fetch_fixtures("39", date_from="2030-01-01", date_to="2030-01-31")
+
+        self.clock.now += 120
+        for _ in range(3):
+            self.adapter.breaker.record("fixtures", ok=False)
+        with mock.patch.object(self.adapter.session, "get") as get:
+            stale = self.adapter.fetch_fixtures("39", date_from="2030-01-01", date_to="2030-01-31")
+            streamed = list(self.adapter.iter_fixtures("39", date_from="2030-01-01", date_to="2030-01-31"))
+        get.assert_not_called()
+        self.assertEqual(stale, fresh)
+        self.assertEqual(streamed, fresh)
+        self.assertEqual(self.adapter.response_cache.stats()["fixtures"]["stale"], 2)
+
+
+class SchedulerCircuitTests(TestCase):
+    def setUp(self):
+        caches["shared"].clear()
+
+    def tearDown(self):
+        caches["shared"].clear()
+
+    @override_settings(PROVIDER_ADAPTER="providers.api_football.APIFootballAdapter")
+    def test_sync_is_not_enqueued_while_fixtures_circuit_is_open(self):
+        breaker = ProviderCircuitBreaker("api_football")
+        for _ in range(breaker.config["failure_threshold"]):
+            breaker.record("fixtures", ok=False)
+        with mock.patch.object(sync_fixtures_for_league, "apply_async") as sync:
+            self.assertIsNone(request_sync(39))
+        sync.assert_not_called()
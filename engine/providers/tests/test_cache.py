@@ -0,0 +1,81 @@
+from unittest import mock
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+
+from ..api_football import APIFootballAdapter
+from ..breaker import ProviderCircuitBreaker
+from ..cache import ResponseCache
+from ..ratelimit import ProviderRateLimiter
+from core.tests.helpers import FakeClock, local_cache
+
+
+def response(status=200, body=None, headers=None):
+    return mock.Mock(status_code=status, ok=status < 400, headers=headers or {}, json=lambda: {"response": body})
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        cache = local_cache("providercache")
+        self.adapter = APIFootballAdapter(api_key="test", base_url="http://provider.test")
+        self.adapter.archive = None
+        self.adapter.limiter = mock.Mock(spec=ProviderRateLimiter, acquire=mock.Mock(return_value=0.0))
+        self.adapter.breaker = ProviderCircuitBreaker(self.adapter.name, cache=cache)
+        self.adapter.response_cache = ResponseCache(
+            self.adapter.name,
+            ttls={"fixtures": 60, "fixtures:live": 5, "fixtures/statistics:final": None},
+            cache=cache, clock=self.clock,
+        )
+
+    def test_hit_skips_network_and_limiter(self):
+        with mock.patch.object(self.adapter.session, "get", return_value=response(body=[{"id": 1}])) as get:
+            first = self.adapter.fetch_fixtures("39", date_from="2030-01-01", date_to="2030-01-31")
+            second = self.adapter.fetch_fixtures("39", date_to="2030-01-31", date_from="2030-01-01")
+        self.assertEqual(first, second)
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(self.adapter.limiter.acquire.call_count, 1)
+        stats = self.adapter.response_cache.stats()["fixtures"]
+        self.assertEqual((stats["hit"], stats["miss"], stats["hit_ratio"]), (1, 1, 0.5))
+
+    def test_live_list_expires_after_its_ttl(self):
+        with mock.patch.object(self.adapter.session, "get", return_value=response(body=[])) as get:
+            self.adapter.fetch_live()
+            self.clock.now += 6
+            self.adapter.fetch_live()
+        self.assertEqual(get.call_count, 2)
+
+    def test_final_stats_are_kept_indefinitely(self):
+        with mock.patch.object(self.adapter.session, "get", return_value=response(body=[{"team": {}}])) as get:
+            self.adapter.fetch_match_stats("100", final=True)
+            self.clock.now += 10 ** 7
+            self.adapter.fetch_match_stats("100", final=True)
+            # uncached class: always goes out
+            self.adapter.fetch_match_stats("101")
+        self.assertEqual(get.call_count, 2)
+
+    def test_stale_entry_is_revalidated_with_stored_validators(self):
+        fresh = response(body=[{"id": 1}], headers={"ETag": '"v1"'})
+        with mock.patch.object(self.adapter.session, "get", side_effect=[fresh, response(status=304)]) as get:
+            self.adapter.fetch_fixtures("39")
+            self.clock.now += 61
+            data = self.adapter.fetch_fixtures("39")
+
+        self.assertEqual(data, [{"id": 1}])
+        self.assertEqual(get.call_args.kwargs["headers"], {"If-None-Match": '"v1"'})
+        self.assertEqual(self.adapter.response_cache.stats()["fixtures"]["revalidated"], 1)
+
+
+class ProviderCacheIsolationTests(TestCase):
+    def tearDown(self):
+        caches["provider"].clear()
+        caches["shared"].clear()
+
+    def test_filling_the_response_cache_keeps_coordination_state(self):
+        caches["shared"].set("live-poll:lease", "loop-1", timeout=600)
+        store = ResponseCache("api_football", ttls={"fixtures/statistics:final": None})
+        for i in range(310):
+            store.store(store.key("fixtures/statistics", {"fixture": i}), "fixtures/statistics:final", [i])
+        self.assertEqual(caches["shared"].get("live-poll:lease"), "loop-1")
+        self.assertEqual(store.get(store.key("fixtures/statistics", {"fixture": 309})), {
+            "data": [309], "etag": None, "last_modified": None, "fresh_until": None,
+        })
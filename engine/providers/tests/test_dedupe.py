@@ -0,0 +1,100 @@
+from unittest import mock
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..dedupe import PendingSet, enqueue_once
+from ..tasks import (
+    flush_hydrations, hydrate_matches_stats, hydration_queue, request_hydration, request_sync,
+    sync_fixtures_for_league,
+)
+from core.locks import LockTimeout, cache_lock
+from core.tests.helpers import local_cache
+
+
+class DedupeTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = local_cache("dedupe")
+        self.task = mock.Mock()
+        self.task.name = "providers.tasks.sync_fixtures_for_league"
+
+    def test_duplicate_within_window_is_dropped(self):
+        first = enqueue_once(self.task, args=("39", None, None), window=30, cache=self.cache)
+        second = enqueue_once(self.task, args=("39", None, None), window=30, cache=self.cache)
+        other = enqueue_once(self.task, args=("39", "2025-01-01", None), window=30, cache=self.cache)
+        self.assertIsNotNone(first)
+        self.assertIsNone(second)
+        self.assertIsNotNone(other)
+        self.assertEqual(self.task.apply_async.call_count, 2)
+
+    def test_pending_set_merges_until_popped(self):
+        pending = PendingSet("hydrate", cache=self.cache)
+        self.assertTrue(pending.add(["a", "b"], flush_within=5))
+        self.assertFalse(pending.add(["b", "c"], flush_within=5))
+        self.assertEqual(pending.pop(), {"a", "b", "c"})
+        self.assertTrue(pending.add(["d"], flush_within=5))
+
+    @mock.patch("core.locks.LOCK_SPINS", 1)
+    def test_pending_set_is_never_written_without_its_lock(self):
+        pending = PendingSet("hydrate", cache=self.cache)
+        pending.add(["a"], flush_within=5)
+        with cache_lock(pending.key, 10, self.cache):
+            with self.assertRaises(LockTimeout):
+                pending.add(["b"], flush_within=5)
+            with self.assertRaises(LockTimeout):
+                pending.pop()
+        self.assertEqual(pending.pop(), {"a"})
+
+
+@override_settings(HYDRATION_COALESCE_DELAY=5, HYDRATION_BATCH_MAX=2, TASK_DEDUPE_WINDOW=30)
+class CoalescingTaskTests(TestCase):
+    def setUp(self):
+        caches["shared"].clear()
+
+    def tearDown(self):
+        caches["shared"].clear()
+
+    def test_hydration_requests_are_merged_into_batches(self):
+        with mock.patch.object(flush_hydrations, "apply_async") as flush:
+            request_hydration(["m1", "m2"])
+            request_hydration(["m2", "m3"])
+            request_hydration([])
+        flush.assert_called_once_with(countdown=5)
+
+        with mock.patch.object(hydrate_matches_stats, "delay") as hydrate:
+            self.assertEqual(flush_hydrations(), 3)
+        self.assertEqual([c.args[0] for c in hydrate.call_args_list], [["m1", "m2"], ["m3"]])
+        self.assertEqual(hydration_queue.pop(), set())
+
+    @mock.patch("core.locks.LOCK_SPINS", 1)
+    def test_locked_hydration_queue_enqueues_directly(self):
+        with cache_lock(hydration_queue.key, 10), \
+                mock.patch.object(flush_hydrations, "apply_async") as flush, \
+                mock.patch.object(hydrate_matches_stats, "apply_async") as hydrate:
+            self.assertFalse(request_hydration(["m2", "m1"]))
+        flush.assert_not_called()
+        hydrate.assert_called_once_with(args=(["m1", "m2"],), countdown=5)
+        self.assertEqual(hydration_queue.pop(), set())
+
+    def test_sync_requests_are_deduplicated(self):
+        with mock.patch.object(sync_fixtures_for_league, "apply_async") as sync:
+            request_sync(39)
+            request_sync("39")
+            request_sync(39, date_from="2025-01-01")
+        self.assertEqual(sync.call_count, 2)
+
+    def test_only_one_sync_per_league_runs(self):
+        caches["shared"].set("sync:39:window", [None, None])
+        with cache_lock("sync:39", 60):
+            with mock.patch("providers.tasks.get_adapter") as get_adapter:
+                self.assertEqual(sync_fixtures_for_league("39"), {"status": "already running"})
+        get_adapter.assert_not_called()
+
+    def test_sync_of_another_window_waits_for_the_running_one(self):
+        caches["shared"].set("sync:39:window", [None, None])
+        with cache_lock("sync:39", 60), \
+                mock.patch("providers.tasks.get_adapter") as get_adapter, \
+                mock.patch.object(sync_fixtures_for_league, "retry", side_effect=RuntimeError("retry")) as retry:
+            with self.assertRaisesMessage(RuntimeError, "retry"):
+                sync_fixtures_for_league("39", "2025-01-01", "2025-01-07")
+        get_adapter.assert_not_called()
+        self.assertEqual(retry.call_args.kwargs["countdown"], 30)
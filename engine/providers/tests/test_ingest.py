@@ -0,0 +1,98 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..ingest import upsert_fixtures
+from ..mapper import normalize_fixture_api_football
+from matches.models import Match
+from teams.models import Team
+from competitions.models import Competition, Season
+from core.models import ProviderRef, ProviderRefKind
+from core.versions import ALL_MATCHES, read
+
+
+def fixture(fid, home, away, ts=1725634800, league=39, season=2024, venue="Stadium", status="NS", elapsed=None, goals=(None, None)):
+    return {
+        "fixture": {"id": fid, "timestamp": ts, "venue": {"name": venue}, "status": {"short": status, "elapsed": elapsed}},
+        "league": {"id": league, "season": season},
+        "teams": {"home": {"id": home}, "away": {"id": away}},
+        "goals": {"home": goals[0], "away": goals[1]},
+    }
+
+
+class UpsertFixturesTests(TestCase):
+    def norm(self, *fixtures):
+        return [normalize_fixture_api_football(fx) for fx in fixtures]
+
+    def test_creates_references_and_matches(self):
+        result = upsert_fixtures("api_football", self.norm(
+            fixture(1, 10, 11), fixture(2, 12, 13), fixture(3, 10, 12, ts=1725721200),
+        ))
+        self.assertEqual(result, {"inserted": 3, "updated": 0, "unchanged": 0, "skipped": 0})
+
+        comp = Competition.objects.get()
+        self.assertEqual(comp.provider_refs, {"api_football": {"league_id": "39"}})
+        self.assertEqual(Season.objects.get().name, "2024")
+        self.assertEqual(Team.objects.count(), 4)
+        m = Match.objects.get(provider_refs__api_football__fixture_id="1")
+        self.assertEqual(m.home.provider_refs, {"api_football": {"team_id": "10"}})
+        self.assertEqual(m.venue, "Stadium")
+        self.assertEqual(
+            ProviderRef.objects.resolve("api_football", ProviderRefKind.MATCH, ["1", "2", "3"]).get("1"), m.id
+        )
+        self.assertEqual(ProviderRef.objects.filter(kind=ProviderRefKind.TEAM).count(), 4)
+
+    def test_second_run_updates_in_place(self):
+        upsert_fixtures("api_football", self.norm(fixture(1, 10, 11)))
+        before = Match.objects.get()
+
+        result = upsert_fixtures("api_football", self.norm(fixture(1, 10, 11, venue="New Ground")))
+        self.assertEqual(result, {"inserted": 0, "updated": 1, "unchanged": 0, "skipped": 0})
+
+        after = Match.objects.get()
+        self.assertEqual(after.id, before.id)
+        self.assertEqual(after.created_at, before.created_at)
+        self.assertEqual(after.venue, "New Ground")
+
+    def test_unchanged_fixture_is_not_rewritten(self):
+        upsert_fixtures("api_football", self.norm(fixture(1, 10, 11)))
+        before = Match.objects.get()
+
+        result = upsert_fixtures("api_football", self.norm(fixture(1, 10, 11)))
+        self.assertEqual(result, {"inserted": 0, "updated": 0, "unchanged": 1, "skipped": 0})
+        self.assertEqual(Match.objects.get().updated_at, before.updated_at)
+
+    def test_writes_bump_data_versions(self):
+        upsert_fixtures("api_football", self.norm(fixture(1, 10, 11)))
+        m = Match.objects.get()
+        scopes = {ALL_MATCHES, f"match:{m.id}", f"competition:{m.competition_id}"}
+        first, _ = read(scopes)
+
+        upsert_fixtures("api_football", self.norm(fixture(1, 10, 11)))
+        self.assertEqual(read(scopes)[0], first)
+
+        upsert_fixtures("api_football", self.norm(fixture(1, 10, 11, venue="V2")))
+        self.assertEqual(read(scopes)[0], {scope: v + 1 for scope, v in first.items()})
+
+    def test_adopts_existing_match_by_natural_key(self):
+        upsert_fixtures("api_football", self.norm(fixture(1, 10, 11)))
+        m = Match.objects.get()
+        Match.objects.filter(id=m.id).update(provider_refs={})
+
+        result = upsert_fixtures("api_football", self.norm(fixture(1, 10, 11)))
+        self.assertEqual(result["updated"], 1)
+        m.refresh_from_db()
+        self.assertEqual(m.provider_refs, {"api_football": {"fixture_id": "1"}})
+
+    def test_skips_invalid_and_duplicate_fixtures(self):
+        broken = fixture(None, 10, 11)
+        result = upsert_fixtures("api_football", self.norm(fixture(1, 10, 11), fixture(1, 10, 11), broken))
+        self.assertEqual(result, {"inserted": 1, "updated": 0, "unchanged": 0, "skipped": 2})
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        upsert_fixtures("api_football", self.norm(fixture(1, 10, 11)))
+        batch = self.norm(*[fixture(i, 10, 11, ts=1725634800 + i * 86400, venue="V2") for i in range(1, 60)])
+        with CaptureQueriesContext(connection) as ctx:
+            upsert_fixtures("api_football", batch)
+        # constant: resolution, one upsert, ref registration and one data-version bump
+        self.assertLessEqual(len(ctx.captured_queries), 11)
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+from unittest import mock
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..live import next_poll_interval
+from ..mapper import normalize_fixture_api_football
+from ..resolver import identities
+from ..tasks import LIVE_LEASE_KEY, poll_live
+from .test_ingest import fixture
+from matches.models import Match, MatchStatus
+
+
+@override_settings(LIVE_POLL_MIN_INTERVAL=15, LIVE_POLL_MAX_INTERVAL=120, LIVE_POLL_IDLE_INTERVAL=300, LIVE_POLL_CHANGE_RATE=0.1)
+class NextPollIntervalTests(SimpleTestCase):
+    noon = datetime(2025, 9, 6, 12, tzinfo=timezone.utc)
+
+    def test_idle_when_nothing_is_live(self):
+        self.assertEqual(next_poll_interval(0), 300)
+
+    def test_fastest_with_ample_quota(self):
+        self.assertEqual(next_poll_interval(5, {"daily_remaining": 70000}, now=self.noon), 15)
+
+    def test_more_live_matches_or_less_quota_slow_down(self):
+        few = next_poll_interval(5, {"daily_remaining": 3000}, now=self.noon)
+        many = next_poll_interval(40, {"daily_remaining": 3000}, now=self.noon)
+        scarce = next_poll_interval(5, {"daily_remaining": 1500}, now=self.noon)
+        self.assertLess(few, many)
+        self.assertLess(few, scarce)
+        self.assertEqual(next_poll_interval(5, {"daily_remaining": 1}, now=self.noon), 120)
+
+    def test_waits_for_next_minute_when_minute_quota_is_spent(self):
+        self.assertEqual(next_poll_interval(5, {"minute_remaining": 0}), 60)
+
+
+class FakeLiveAdapter:
+    name = "api_football"
+
+    def __init__(self, live, by_id=()):
+        self.live = live
+        self.by_id = list(by_id)
+        self.quota = {"daily_remaining": 70000}
+
+    def fetch_live(self):
+        return self.live
+
+    def fetch_fixtures_by_ids(self, ids):
+        return [fx for fx in self.by_id if str(fx["fixture"]["id"]) in ids]
+
+
+class PollLiveTests(TestCase):
+    def setUp(self):
+        identities.clear()
+        caches["shared"].delete(LIVE_LEASE_KEY)
+
+    def tearDown(self):
+        identities.clear()
+        caches["shared"].delete(LIVE_LEASE_KEY)
+
+    def tick(self, adapter, loop_id="loop-1"):
+        with mock.patch("providers.tasks.get_adapter", return_value=adapter), \
+                mock.patch("providers.tasks.request_hydration") as hydrate, \
+                mock.patch.object(poll_live, "apply_async") as reschedule:
+            result = poll_live(loop_id=loop_id)
+        return result, hydrate, reschedule
+
+    def test_updates_status_and_minute_and_hydrates_only_changed(self):
+        from ..ingest import upsert_fixtures
+        upsert_fixtures("api_football", [normalize_fixture_api_football(fixture(1, 10, 11)),
+                                         normalize_fixture_api_football(fixture(2, 12, 13))])
+
+        live = [fixture(1, 10, 11, status="1H", elapsed=12, goals=(0, 0)),
+                fixture(2, 12, 13, status="1H", elapsed=12, goals=(0, 0))]
+        result, hydrate, reschedule = self.tick(FakeLiveAdapter(live))
+        self.assertEqual((result["live"], result["hydrating"]), (2, 2))
+        m1 = Match.objects.get(provider_refs__api_football__fixture_id="1")
+        self.assertEqual((m1.status, m1.minute), (MatchStatus.LIVE, 12))
+        reschedule.assert_called_once_with(kwargs={"loop_id": "loop-1"}, countdown=result["next_in"])
+
+        # next tick: only the minute moves for #2, #1 scores
+        live = [fixture(1, 10, 11, status="1H", elapsed=14, goals=(1, 0)),
+                fixture(2, 12, 13, status="1H", elapsed=14, goals=(0, 0))]
+        result, hydrate, _ = self.tick(FakeLiveAdapter(live))
+        hydrate.assert_called_once_with({m1.id})
+        self.assertEqual(Match.objects.get(provider_refs__api_football__fixture_id="2").minute, 14)
+
+    def test_match_leaving_the_live_list_is_refreshed_by_id(self):
+        from ..ingest import upsert_fixtures
+        upsert_fixtures("api_football", [normalize_fixture_api_football(fixture(1, 10, 11, status="2H", elapsed=88))])
+
+        finished = fixture(1, 10, 11, status="FT", elapsed=90, goals=(2, 1))
+        result, hydrate, _ = self.tick(FakeLiveAdapter([], by_id=[finished]))
+        self.assertEqual(Match.objects.get().status, MatchStatus.FT)
+        self.assertEqual(result["hydrating"], 1)
+        self.assertEqual(result["next_in"], 300)
+
+    def test_second_loop_is_a_noop(self):
+        self.tick(FakeLiveAdapter([]), loop_id="loop-1")
+        result, _, reschedule = self.tick(FakeLiveAdapter([]), loop_id="loop-2")
+        self.assertEqual(result, {"status": "another live loop is running"})
+        reschedule.assert_not_called()
@@ -0,0 +1,28 @@
+from django.test import SimpleTestCase
+
+from ..mapper import normalize_fixture_api_football
+from .test_ingest import fixture
+from matches.models import FINISHED_STATUSES, IN_PLAY_STATUSES, MatchStatus
+
+
+class FixtureStatusTests(SimpleTestCase):
+    def status(self, short):
+        return normalize_fixture_api_football(fixture(1, 10, 11, status=short))["status_text"]
+
+    def test_extra_time_and_shootout_are_in_play(self):
+        for short in ("ET", "BT", "P"):
+            with self.subTest(short=short):
+                self.assertIn(self.status(short), IN_PLAY_STATUSES)
+
+    def test_finished_forms(self):
+        self.assertEqual(self.status("AET"), MatchStatus.AET)
+        self.assertEqual(self.status("PEN"), MatchStatus.PEN)
+        self.assertIn(self.status("PEN"), FINISHED_STATUSES)
+
+    def test_suspended_and_interrupted_are_neither_live_nor_finished(self):
+        for short in ("SUSP", "INT"):
+            with self.subTest(short=short):
+                status = self.status(short)
+                self.assertEqual(status, MatchStatus.SUSPENDED)
+                self.assertNotIn(status, IN_PLAY_STATUSES)
+                self.assertNotIn(status, FINISHED_STATUSES)
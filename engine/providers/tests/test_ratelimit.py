@@ -0,0 +1,107 @@
+from unittest import mock
+from django.test import SimpleTestCase
+
+from ..api_football import APIFootballAdapter
+from ..base import RateLimitError
+from ..breaker import ProviderCircuitBreaker
+from ..cache import ResponseCache
+from ..ratelimit import ProviderRateLimiter, TokenBucket
+from core.tests.helpers import FakeClock, local_cache
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket("t", rate=1, capacity=3, cache=local_cache(), clock=clock)
+
+        self.assertEqual([bucket.acquire() for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(bucket.acquire(), 1.0)
+
+        clock.now += 2
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertAlmostEqual(bucket.acquire(), 1.0)
+
+    def test_buckets_sharing_a_cache_share_the_budget(self):
+        clock, cache = FakeClock(), local_cache()
+        worker_a = TokenBucket("shared", rate=1, capacity=2, cache=cache, clock=clock)
+        worker_b = TokenBucket("shared", rate=1, capacity=2, cache=cache, clock=clock)
+
+        self.assertEqual(worker_a.acquire(), 0.0)
+        self.assertEqual(worker_b.acquire(), 0.0)
+        self.assertGreater(worker_a.acquire(), 0)
+
+    def test_drain_blocks_for_given_seconds(self):
+        clock = FakeClock()
+        bucket = TokenBucket("t", rate=2, capacity=5, cache=local_cache(), clock=clock)
+        bucket.drain(10)
+        self.assertAlmostEqual(bucket.acquire(), 10.5)
+        clock.now += 10.5
+        self.assertEqual(bucket.acquire(), 0.0)
+
+
+class ProviderRateLimiterTests(SimpleTestCase):
+    def test_endpoint_bucket_and_provider_default(self):
+        clock = FakeClock()
+        limiter = ProviderRateLimiter(
+            "api_football",
+            config={"default": {"per_minute": 600, "burst": 3}, "fixtures/statistics": {"per_minute": 60, "burst": 1}},
+            cache=local_cache(), clock=clock,
+        )
+        self.assertEqual(limiter.acquire("fixtures/statistics"), 0.0)
+        self.assertAlmostEqual(limiter.acquire("/fixtures/statistics"), 60 / 60.0)
+        # other endpoints still have provider-wide budget left
+        self.assertEqual(limiter.acquire("fixtures"), 0.0)
+
+
+    def test_refused_call_keeps_its_endpoint_token(self):
+        clock = FakeClock()
+        limiter = ProviderRateLimiter(
+            "api_football",
+            config={"default": {"per_minute": 60, "burst": 1}, "fixtures/statistics": {"per_minute": 6, "burst": 1}},
+            cache=local_cache(), clock=clock,
+        )
+        self.assertEqual(limiter.acquire("fixtures"), 0.0)
+        # the provider-wide bucket refuses; the endpoint bucket must not be charged
+        self.assertGreater(limiter.acquire("fixtures/statistics"), 0)
+        clock.now += 1
+        self.assertEqual(limiter.acquire("fixtures/statistics"), 0.0)
+
+
+class AdapterRateLimitTests(SimpleTestCase):
+    def make_adapter(self, clock):
+        adapter = APIFootballAdapter(api_key="test", base_url="http://provider.test")
+        adapter.archive = None
+        adapter.limiter = ProviderRateLimiter(
+            adapter.name, config={"default": {"per_minute": 60, "burst": 1}}, cache=local_cache(), clock=clock,
+        )
+        adapter.response_cache = ResponseCache(adapter.name, ttls={}, cache=local_cache())
+        adapter.breaker = ProviderCircuitBreaker(adapter.name, cache=local_cache())
+        return adapter
+
+    def test_exhausted_budget_raises_without_network_or_sleep(self):
+        adapter = self.make_adapter(FakeClock())
+        ok = mock.Mock(status_code=200, ok=True, json=lambda: {"response": []})
+        with mock.patch.object(adapter.session, "get", return_value=ok) as get, mock.patch("time.sleep") as sleep:
+            adapter.fetch_live()
+            with self.assertRaises(RateLimitError) as ctx:
+                adapter.fetch_live()
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(ctx.exception.retry_after, 1)
+        sleep.assert_not_called()
+
+    def test_transport_never_retries_a_429_itself(self):
+        adapter = self.make_adapter(FakeClock())
+        retry = adapter.session.get_adapter("https://provider.test").max_retries
+        self.assertNotIn(429, retry.status_forcelist)
+        self.assertIn(503, retry.status_forcelist)
+
+    def test_upstream_429_backs_off_every_worker(self):
+        clock = FakeClock()
+        adapter = self.make_adapter(clock)
+        limited = mock.Mock(status_code=429, ok=False, headers={"Retry-After": "7"})
+        with mock.patch.object(adapter.session, "get", return_value=limited):
+            with self.assertRaises(RateLimitError) as ctx:
+                adapter.fetch_live()
+        self.assertEqual(ctx.exception.retry_after, 7)
+        self.assertGreaterEqual(adapter.limiter.acquire("fixtures"), 7)
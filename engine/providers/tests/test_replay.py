@@ -0,0 +1,72 @@
+from django.test import SimpleTestCase, override_settings
+
+from ..base import ProviderError, RateLimitError, get_adapter
+from ..mapper import normalize_fixture_api_football, normalize_stats_api_football
+from ..replay import Faults, ReplayAdapter, SyntheticSource
+from ..standin import StandInAdapter, StandInServer
+
+
+class SyntheticSourceTests(SimpleTestCase):
+    def setUp(self):
+        self.source = SyntheticSource(leagues=2, teams=6, live=3, seed=1)
+
+    def test_double_round_robin_per_league(self):
+        fixtures = self.source.fixtures_for("900000")
+        self.assertEqual(len(fixtures), 6 * 5)
+        pairs = {(fx["teams"]["home"]["id"], fx["teams"]["away"]["id"]) for fx in fixtures}
+        self.assertEqual(len(pairs), 30)
+        self.assertEqual(self.source.fixtures_for("900000", season=2023), [])
+
+    def test_payloads_normalize(self):
+        statuses = {normalize_fixture_api_football(fx)["status_text"] for fx in self.source.fixtures.values()}
+        self.assertTrue({"FT", "SCHED"} <= statuses <= {"FT", "SCHED", "LIVE", "HT"})
+        self.assertEqual(len(self.source.live()), 3)
+        finished = next(fid for fid, fx in self.source.fixtures.items() if fx["fixture"]["status"]["short"] == "FT")
+        self.assertEqual(len(normalize_stats_api_football(self.source.stats(finished))), 6)
+        self.assertEqual(self.source.stats(finished), SyntheticSource(leagues=2, teams=6, seed=1).stats(finished))
+
+
+class ReplayAdapterTests(SimpleTestCase):
+    def test_injected_faults(self):
+        source = SyntheticSource(leagues=1, teams=4)
+        with self.assertRaises(RateLimitError) as ctx:
+            ReplayAdapter(source=source, faults=Faults(rate_limit_rate=1.0, retry_after=3)).fetch_live()
+        self.assertEqual(ctx.exception.retry_after, 3)
+        with self.assertRaises(ProviderError):
+            ReplayAdapter(source=source, faults=Faults(error_rate=1.0)).fetch_match_stats("1")
+        adapter = ReplayAdapter(source=source, faults=Faults())
+        self.assertEqual(len(list(adapter.iter_fixtures("900000"))), 12)
+        self.assertEqual(adapter.calls, 1)
+
+    @override_settings(PROVIDER_ADAPTER="providers.replay.ReplayAdapter",
+                       PROVIDER_REPLAY={"source": {"source": "synthetic", "teams": 4}})
+    def test_selected_by_setting(self):
+        adapter = get_adapter(pool_maxsize=4)
+        self.assertIsInstance(adapter, ReplayAdapter)
+        self.assertEqual(len(adapter.fetch_fixtures("900000")), 12)
+
+
+class StandInServerTests(SimpleTestCase):
+    def setUp(self):
+        self.source = SyntheticSource(leagues=1, teams=4, live=2)
+        self.server = StandInServer(self.source, daily_quota=100).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def adapter(self):
+        with override_settings(PROVIDER_STANDIN_URL=self.server.url):
+            return StandInAdapter()
+
+    def test_real_adapter_reads_the_stand_in(self):
+        adapter = self.adapter()
+        self.assertEqual(list(adapter.iter_fixtures("900000")), self.source.fixtures_for("900000"))
+        self.assertEqual(adapter.fetch_live(), self.source.live())
+        self.assertEqual(adapter.fetch_match_stats("9000000000"), self.source.stats("9000000000"))
+        self.assertEqual(adapter.quota["daily_remaining"], 97)
+
+    def test_injected_429_reaches_the_adapter(self):
+        self.server.faults = Faults(rate_limit_rate=1.0, retry_after=2)
+        with self.assertRaises(RateLimitError) as ctx:
+            self.adapter().fetch_live()
+        self.assertEqual(ctx.exception.retry_after, 2)
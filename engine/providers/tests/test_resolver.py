@@ -0,0 +1,67 @@
+from django.test import SimpleTestCase, TestCase
+
+from ..ingest import resolve_metric_types, resolve_teams
+from ..resolver import IdentityMap, identities
+from core.tests.helpers import FakeClock
+from metrics.models import MetricType
+from teams.models import Team
+
+
+class IdentityMapTests(SimpleTestCase):
+    def test_hits_misses_and_ttl(self):
+        clock = FakeClock(0.0)
+        m = IdentityMap(max_size=10, ttl=60, clock=clock)
+        m.set("a", 1)
+        self.assertEqual(m.get("a"), 1)
+        self.assertIsNone(m.get("b"))
+
+        clock.now = 61
+        self.assertIsNone(m.get("a"))
+        self.assertEqual(m.stats()["hits"], 1)
+        self.assertEqual(m.stats()["misses"], 2)
+        self.assertEqual(m.stats()["size"], 0)
+
+    def test_bounded_size_evicts_least_recently_used(self):
+        m = IdentityMap(max_size=2, ttl=60)
+        m.set("a", 1)
+        m.set("b", 2)
+        m.get("a")
+        m.set("c", 3)
+        self.assertEqual(m.get_many(["a", "b", "c"]), {"a": 1, "c": 3})
+
+    def test_invalidate_value(self):
+        m = IdentityMap()
+        m.set_many({("p", "team", "1"): "uuid-1", ("p", "team", "2"): "uuid-2"})
+        m.invalidate_value("uuid-1")
+        self.assertEqual(m.get_many([("p", "team", "1"), ("p", "team", "2")]), {("p", "team", "2"): "uuid-2"})
+
+
+class ResolverCacheTests(TestCase):
+    def setUp(self):
+        identities.clear()
+
+    def tearDown(self):
+        identities.clear()
+
+    def test_second_resolution_hits_the_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = resolve_teams("api_football", {"33"})
+            metric = resolve_metric_types({"corners"})
+        self.assertEqual(MetricType.objects.get(key="corners").id, metric["corners"])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_teams("api_football", {"33"}), first)
+            self.assertEqual(resolve_metric_types({"corners"}), metric)
+
+    def test_renaming_a_team_invalidates_its_entry(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            team_id = resolve_teams("api_football", {"33"})["33"]
+
+        team = Team.objects.get(id=team_id)
+        team.name = "Manchester United"
+        team.save()
+        self.assertIsNone(identities.get(("api_football", "team", "33")))
+
+    def test_uncommitted_placeholders_are_not_cached(self):
+        resolve_teams("api_football", {"34"})
+        self.assertIsNone(identities.get(("api_football", "team", "34")))
@@ -0,0 +1,59 @@
+from datetime import timedelta
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from ..tasks import flush_hydrations, hydrate_match_stats, hydrate_matches_stats, poll_live, sync_fixtures_for_league
+from competitions.models import Competition, Season
+from engine import celery_app
+from engine.celery import apply_queue_profile, queue_profile
+from matches.models import Match, MatchStatus
+from teams.models import Team
+
+
+def queue_for(task, args=(), kwargs=None, **options):
+    return celery_app.amqp.router.route(options, task.name, args, kwargs or {})["queue"].name
+
+
+class RoutingTests(TestCase):
+    def setUp(self):
+        comp = Competition.objects.create(name="EPL", country="England")
+        season = Season.objects.create(competition=comp, name="2024", year_start=2024, year_end=2025)
+        home = Team.objects.create(name="Arsenal")
+        away = Team.objects.create(name="Chelsea")
+        now = timezone.now()
+
+        def match(status, kickoff):
+            return Match.objects.create(competition=comp, season=season, home=home, away=away,
+                                        status=status, utc_kickoff=kickoff)
+
+        self.live = match(MatchStatus.LIVE, now - timedelta(minutes=30))
+        self.just_finished = match(MatchStatus.FT, now - timedelta(hours=2))
+        self.old = match(MatchStatus.FT, now - timedelta(days=30))
+
+    def test_task_types(self):
+        self.assertEqual(queue_for(poll_live), "live")
+        self.assertEqual(queue_for(flush_hydrations), "live")
+        self.assertEqual(queue_for(sync_fixtures_for_league, ("39",)), "hydration")
+        self.assertEqual(queue_for(sync_fixtures_for_league, ("39", "2020-01-01", "2020-06-30")), "backfill")
+        self.assertEqual(queue_for(sync_fixtures_for_league, ("39",), queue="live"), "live")
+
+    def test_hydration_follows_match_status(self):
+        self.assertEqual(queue_for(hydrate_match_stats, (str(self.live.id),)), "live")
+        self.assertEqual(queue_for(hydrate_match_stats, (str(self.just_finished.id),)), "live")
+        self.assertEqual(queue_for(hydrate_match_stats, (str(self.old.id),)), "hydration")
+        self.assertEqual(queue_for(hydrate_matches_stats, ([str(self.old.id), str(self.live.id)],)), "live")
+        self.assertEqual(queue_for(hydrate_matches_stats, ([str(self.old.id)],)), "hydration")
+        self.assertEqual(queue_for(hydrate_matches_stats, (["not-a-uuid"],)), "hydration")
+
+
+@override_settings(TASK_QUEUE_PROFILES={"live": {"concurrency": 3, "prefetch_multiplier": 1, "time_limit": 30}})
+class QueueProfileTests(SimpleTestCase):
+    def test_single_queue_worker_gets_its_profile(self):
+        conf = {}
+        apply_queue_profile(conf=conf, options={"queues": "live"})
+        self.assertEqual(conf, {"worker_concurrency": 3, "worker_prefetch_multiplier": 1, "task_time_limit": 30})
+
+    def test_mixed_or_unknown_queues_keep_defaults(self):
+        self.assertEqual(queue_profile(["live", "backfill"]), {})
+        self.assertEqual(queue_profile(None), {})
+        self.assertEqual(queue_profile("other"), {})
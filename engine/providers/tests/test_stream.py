@@ -0,0 +1,130 @@
+import json
+import tempfile
+from unittest import mock
+from django.test import SimpleTestCase
+
+from ..api_football import APIFootballAdapter
+from ..archive import RawArchive, read_partition
+from ..breaker import ProviderCircuitBreaker
+from ..cache import ResponseCache
+from ..ratelimit import ProviderRateLimiter
+from ..stream import IncompleteResponse, ResponseArrayParser, iter_items
+from .test_ingest import fixture
+from core.tests.helpers import local_cache
+
+
+def chunked(body: bytes, size: int):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class ResponseArrayParserTests(SimpleTestCase):
+    def test_items_match_a_full_decode_for_any_chunking(self):
+        body = json.dumps({
+            "get": "fixtures",
+            "parameters": {"league": "39", "note": "a [tricky] {one}"},
+            "errors": [],
+            "results": 3,
+            "response": [
+                {"id": 1, "name": 'quote " and backslash \\ and ] } [ {', "nested": {"list": [1, [2, {"x": 3}]]}},
+                {"id": 2, "name": "héllo wörld", "escaped": "\\\""},
+                {"id": 3, "response": [{"id": "inner"}]},
+            ],
+            "paging": {"current": 1, "total": 1},
+        }, indent=1).encode()
+        expected = json.loads(body)["response"]
+        for size in (1, 2, 3, 7, 64, len(body)):
+            self.assertEqual(list(iter_items(chunked(body, size))), expected, size)
+
+    def test_truncated_array_raises_after_complete_items(self):
+        items = iter_items([b'{"response": [{"id": 1}, {"id": 2}, {"id"'])
+        self.assertEqual(next(items), {"id": 1})
+        self.assertEqual(next(items), {"id": 2})
+        with self.assertRaises(IncompleteResponse):
+            next(items)
+
+    def test_missing_or_empty_response_yields_nothing(self):
+        self.assertEqual(list(iter_items([b'{"errors": {"token": "bad"}, "response": []}'])), [])
+        self.assertEqual(list(iter_items([b'{"errors": ["x"], "results": 0}'])), [])
+
+    def test_buffer_stays_bounded_by_one_item(self):
+        item = json.dumps(fixture(1, 2, 3)).encode()
+        body = b'{"results": 5000, "response": [' + b",".join([item] * 5000) + b"]}"
+        parser, count, peak = ResponseArrayParser(), 0, 0
+        for chunk in chunked(body, 4096):
+            count += len(parser.feed(chunk))
+            peak = max(peak, len(parser.buf))
+        self.assertEqual(count, 5000)
+        self.assertLess(peak, len(item) + 4096)
+
+
+def streamed(items, status=200, headers=None):
+    body = json.dumps({"get": "fixtures", "response": items}).encode()
+    resp = mock.Mock(status_code=status, ok=status < 400, headers=headers or {}, text="")
+    resp.iter_content.side_effect = lambda chunk_size: iter(chunked(body, 100))
+    return resp
+
+
+class StreamingAdapterTests(SimpleTestCase):
+    def setUp(self):
+        self.adapter = APIFootballAdapter(api_key="test", base_url="http://provider.test")
+        self.adapter.limiter = mock.Mock(spec=ProviderRateLimiter, acquire=mock.Mock(return_value=0.0))
+        self.adapter.breaker = ProviderCircuitBreaker(self.adapter.name, cache=local_cache("stream-breaker"))
+        self.adapter.response_cache = ResponseCache(
+            self.adapter.name, ttls={"fixtures": 60}, cache=local_cache("stream"),
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+        self.adapter.archive = RawArchive(self.tmp.name, self.adapter.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_iter_fixtures_streams_and_archives_the_body(self):
+        items = [fixture(i, 10, 11) for i in range(1, 40)]
+        with mock.patch.object(self.adapter.session, "get", return_value=streamed(items)) as get:
+            fixtures = self.adapter.iter_fixtures("39", season=2024)
+            self.assertEqual(list(fixtures), items)
+        self.assertTrue(get.call_args.kwargs["stream"])
+        self.assertEqual(get.call_args.kwargs["params"], {"league": "39", "season": 2024})
+
+        records = list(read_partition(self.adapter.archive.partitions()[0]))
+        self.assertEqual(records[0]["response"], items)
+        self.assertEqual(records[0]["params"], {"league": "39", "season": 2024})
+
+    def test_streamed_body_fills_the_response_cache(self):
+        items = [fixture(i, 10, 11) for i in range(1, 5)]
+        with mock.patch.object(self.adapter.session, "get", return_value=streamed(items, headers={"ETag": '"v1"'})):
+            self.assertEqual(list(self.adapter.iter_fixtures("39")), items)
+        with mock.patch.object(self.adapter.session, "get") as get:
+            self.assertEqual(list(self.adapter.iter_fixtures("39")), items)
+            self.assertEqual(self.adapter.fetch_fixtures("39"), items)
+        get.assert_not_called()
+        stats = self.adapter.response_cache.stats()["fixtures"]
+        self.assertEqual((stats["miss"], stats["hit"]), (1, 2))
+
+    def test_stale_entry_is_revalidated(self):
+        items = [fixture(1, 10, 11)]
+        cache = self.adapter.response_cache
+        key = cache.key("fixtures", {"league": "39"})
+        cache.cache.set(key, {"data": items, "etag": '"v1"', "last_modified": None, "fresh_until": 0})
+        with mock.patch.object(self.adapter.session, "get", return_value=streamed([], status=304)) as get:
+            self.assertEqual(list(self.adapter.iter_fixtures("39")), items)
+        self.assertEqual(get.call_args.kwargs["headers"], {"If-None-Match": '"v1"'})
+        self.assertTrue(cache.is_fresh(cache.get(key)))
+        self.assertEqual(cache.stats()["fixtures"]["revalidated"], 1)
+
+    def test_errors_surface_before_iteration(self):
+        from ..base import ProviderError
+        with mock.patch.object(self.adapter.session, "get", return_value=streamed([], status=500)):
+            with self.assertRaises(ProviderError):
+                self.adapter.iter_fixtures("39")
+
+    def test_truncated_stream_fails_and_is_not_archived(self):
+        from ..base import ProviderError
+        resp = streamed([])
+        resp.iter_content.side_effect = lambda chunk_size: iter([b'{"response": [{"id": 1}, {"fixture": '])
+        with mock.patch.object(self.adapter.session, "get", return_value=resp):
+            fixtures = self.adapter.iter_fixtures("39")
+            self.assertEqual(next(fixtures), {"id": 1})
+            with self.assertRaises(ProviderError):
+                next(fixtures)
+        self.assertEqual(self.adapter.archive.partitions(), [])
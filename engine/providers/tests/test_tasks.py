@@ -0,0 +1,109 @@
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+
+from ..base import ProviderError
+from ..resolver import identities
+from ..tasks import hydrate_match_stats, hydrate_matches_stats
+from competitions.models import Competition, Season
+from core.models import ProviderRef, ProviderRefKind
+from core.versions import match_scopes, read
+from matches.models import Match, MatchStatus
+from metrics.models import MatchMetric
+from teams.models import Team
+
+
+def stats_payload(home_tid, away_tid, corners=(5, 3)):
+    return [
+        {"team": {"id": home_tid}, "statistics": [{"type": "Corner Kicks", "value": corners[0]}, {"type": "Yellow Cards", "value": 2}]},
+        {"team": {"id": away_tid}, "statistics": [{"type": "Corner Kicks", "value": corners[1]}, {"type": "Red Cards", "value": 1}]},
+    ]
+
+
+class FakeAdapter:
+    name = "api_football"
+
+    def __init__(self, payloads, **kwargs):
+        self.payloads = payloads
+
+    def fetch_match_stats(self, fixture_id, final=False):
+        payload = self.payloads[fixture_id]
+        if isinstance(payload, Exception):
+            raise payload
+        return payload
+
+
+class HydrationTaskTests(TestCase):
+    def setUp(self):
+        identities.clear()
+        comp = Competition.objects.create(name="EPL", country="England")
+        season = Season.objects.create(competition=comp, name="2024", year_start=2024, year_end=2025)
+        home = Team.objects.create(name="Arsenal", provider_refs={"api_football": {"team_id": "42"}})
+        away = Team.objects.create(name="Chelsea", provider_refs={"api_football": {"team_id": "49"}})
+        ProviderRef.objects.register("api_football", ProviderRefKind.TEAM, {"42": home.id, "49": away.id})
+        kick = timezone.now().replace(microsecond=0)
+        self.matches = [
+            Match.objects.create(
+                competition=comp, season=season, home=home, away=away, status=MatchStatus.FT,
+                utc_kickoff=kick + timezone.timedelta(days=i),
+                provider_refs={"api_football": {"fixture_id": str(100 + i)}},
+            )
+            for i in range(3)
+        ]
+
+    def tearDown(self):
+        identities.clear()
+
+    def patch_adapter(self, payloads):
+        return mock.patch("providers.tasks.get_adapter", lambda **kw: FakeAdapter(payloads, **kw))
+
+    def test_single_match_hydration(self):
+        with self.patch_adapter({"100": stats_payload(42, 49)}):
+            result = hydrate_match_stats(str(self.matches[0].id))
+
+        self.assertEqual(result["metrics"], 4)
+        m = self.matches[0]
+        m.refresh_from_db()
+        self.assertIsNotNone(m.freshness_ts)
+        self.assertEqual(MatchMetric.objects.get(match=m, metric_type__key="corners", team__name="Arsenal").value, 5)
+
+    def test_batch_hydration_isolates_failures(self):
+        payloads = {
+            "100": stats_payload(42, 49),
+            "101": ProviderError("status 500"),
+            "102": stats_payload(42, 49, corners=(7, 1)),
+        }
+        with self.patch_adapter(payloads), mock.patch.object(hydrate_match_stats, "apply_async") as requeue:
+            result = hydrate_matches_stats([str(m.id) for m in self.matches])
+
+        self.assertEqual(result, {"matches": 2, "metrics": 8, "unchanged": 0, "skipped": 0, "failed": 1})
+        requeue.assert_called_once_with((str(self.matches[1].id),), countdown=5)
+        self.assertFalse(MatchMetric.objects.filter(match=self.matches[1]).exists())
+        self.assertEqual(
+            MatchMetric.objects.get(match=self.matches[2], metric_type__key="corners", team__name="Arsenal").value, 7
+        )
+
+    def test_rehydration_updates_values_in_place(self):
+        with self.patch_adapter({"100": stats_payload(42, 49)}):
+            hydrate_matches_stats([str(self.matches[0].id)])
+        with self.patch_adapter({"100": stats_payload(42, 49, corners=(9, 3))}):
+            result = hydrate_matches_stats([str(self.matches[0].id)])
+
+        # only the changed corners row is rewritten
+        self.assertEqual((result["metrics"], result["unchanged"]), (1, 3))
+
+        self.assertEqual(MatchMetric.objects.filter(match=self.matches[0]).count(), 4)
+        self.assertEqual(
+            MatchMetric.objects.get(match=self.matches[0], metric_type__key="corners", team__name="Arsenal").value, 9
+        )
+
+    def test_identical_rehydration_keeps_data_versions(self):
+        m = self.matches[0]
+        scopes = match_scopes(m.id, m.utc_kickoff, m.competition_id)
+        with self.patch_adapter({"100": stats_payload(42, 49)}):
+            hydrate_matches_stats([str(m.id)])
+            first = read(scopes)[0]
+            result = hydrate_matches_stats([str(m.id)])
+
+        self.assertEqual((result["metrics"], result["unchanged"]), (0, 4))
+        self.assertEqual(read(scopes)[0], first)